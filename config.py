@@ -14,6 +14,9 @@ IS_WEB = SEEKBEAT_ENV == "web"
 IS_DESKTOP = SEEKBEAT_ENV == "desktop"
 IS_DEV = SEEKBEAT_ENV == "dev"
 
+# === Server Interface (set by seekbeat/asgi.py) ===
+IS_ASGI = os.getenv("SEEKBEAT_ASGI") == "1"
+
 # === App Name ===
 APP_NAME = "SeekBeat"
 
@@ -29,6 +32,12 @@ QR_DIR = APP_STORAGE_DIR / "qrcodes"
 # === Song Storage (Desktop Only) ===
 SONG_STORAGE_PATH = APP_STORAGE_DIR / "songs"
 
+# === Caches (search results, yt-dlp player cache, ...) ===
+CACHE_DIR = APP_STORAGE_DIR / "cache"
+
+# Optional shared Redis cache for web mode (e.g. redis://127.0.0.1:6379/1)
+SEARCH_CACHE_REDIS_URL = os.getenv("SEARCH_CACHE_REDIS_URL")
+
 # === Logs ===
 LOG_DIR = APP_STORAGE_DIR / "logs"
 LOG_FILE = LOG_DIR / "seekbeat.log"
@@ -41,5 +50,78 @@ if IS_DEV:
     QR_DIR = DEV_ROOT / "desktop_lan_connect" / "lan_utils" / "qrcodes"
     SONG_STORAGE_PATH = DEV_ROOT / "desktop_lan_connect" / "lan_utils" / "songs"
     FFMPEG_DIR = DEV_ROOT / "ffmpeg"
+    CACHE_DIR = DEV_ROOT / "cache"
     LOG_DIR = DEV_ROOT / "logs"
     LOG_FILE = LOG_DIR / "seekbeat.log"
+
+# === yt-dlp Extractor Pool ===
+# Persistent yt-dlp cache (player JS / nsig) shared by every extractor worker
+YTDLP_CACHE_DIR = CACHE_DIR / "yt-dlp"
+# Number of extractor worker processes (0 runs extractions in-process on threads)
+EXTRACTOR_POOL_WORKERS = int(os.getenv("EXTRACTOR_POOL_WORKERS", min(4, os.cpu_count() or 1)))
+# A worker is replaced after this many jobs...
+EXTRACTOR_MAX_JOBS_PER_WORKER = int(os.getenv("EXTRACTOR_MAX_JOBS_PER_WORKER", 200))
+# ...and the pool is recycled once a worker's resident memory grows past this (MB)
+EXTRACTOR_MAX_WORKER_MEMORY_MB = int(os.getenv("EXTRACTOR_MAX_WORKER_MEMORY_MB", 512))
+# Maximum extraction jobs queued or running before new ones are rejected
+EXTRACTOR_MAX_QUEUE = int(os.getenv("EXTRACTOR_MAX_QUEUE", 64))
+
+# === YouTube Data API Quota ===
+# Daily quota units per API key (NORMAL/BULK_SEARCH_YOUTUBE_API_KEY accept comma-separated keys)
+YOUTUBE_API_DAILY_QUOTA = int(os.getenv("YOUTUBE_API_DAILY_QUOTA", 10000))
+# Units of each interactive key that bulk searches may not borrow
+YOUTUBE_API_INTERACTIVE_RESERVE = int(os.getenv("YOUTUBE_API_INTERACTIVE_RESERVE", 1000))
+
+# === Persistent Search Store ===
+# Stored results older than this are served immediately but refreshed in the background (seconds)
+SEARCH_STORE_FRESH_SECONDS = int(os.getenv("SEARCH_STORE_FRESH_SECONDS", 6 * 60 * 60))
+# Stored results older than this are not served at all (seconds)
+SEARCH_STORE_MAX_STALE_SECONDS = int(os.getenv("SEARCH_STORE_MAX_STALE_SECONDS", 14 * 24 * 60 * 60))
+# Number of most-requested queries loaded into memory at startup
+SEARCH_WARM_START_QUERIES = int(os.getenv("SEARCH_WARM_START_QUERIES", 200))
+
+# === Search Deadlines ===
+# Time budget of a search request when the client doesn't send `timeout_ms` (milliseconds)
+SEARCH_DEFAULT_TIMEOUT_MS = int(os.getenv("SEARCH_DEFAULT_TIMEOUT_MS", 15000))
+# Largest `timeout_ms` a client may ask for (milliseconds)
+SEARCH_MAX_TIMEOUT_MS = int(os.getenv("SEARCH_MAX_TIMEOUT_MS", 60000))
+
+# === Hedged Searches ===
+# Start the yt-dlp path alongside a slow Data API search instead of waiting for it to fail
+SEARCH_HEDGING = os.getenv("SEARCH_HEDGING", "false").lower() in ("1", "true", "yes")
+# Hedge once the API call is slower than this percentile of its recent latencies
+SEARCH_HEDGE_PERCENTILE = float(os.getenv("SEARCH_HEDGE_PERCENTILE", 95))
+
+# === Bulk Search Jobs ===
+# Most terms a single job may submit
+SEARCH_JOB_MAX_TERMS = int(os.getenv("SEARCH_JOB_MAX_TERMS", 500))
+# Batches (of up to 10 terms) one job searches at once
+SEARCH_JOB_CONCURRENCY = int(os.getenv("SEARCH_JOB_CONCURRENCY", 2))
+# Jobs running at once; later ones wait in line
+SEARCH_JOB_MAX_RUNNING = int(os.getenv("SEARCH_JOB_MAX_RUNNING", 2))
+# Queued or running jobs accepted before new submissions are refused
+SEARCH_JOB_MAX_ACTIVE = int(os.getenv("SEARCH_JOB_MAX_ACTIVE", 20))
+# Finished jobs and their results are kept this long (seconds)
+SEARCH_JOB_RETENTION_SECONDS = int(os.getenv("SEARCH_JOB_RETENTION_SECONDS", 60 * 60))
+
+# === Search Scheduler ===
+# Upstream calls (API requests, yt-dlp extractions) running at once, over all priority classes
+# (the starting point when adaptive concurrency is on)
+SEARCH_UPSTREAM_CAPACITY = int(os.getenv("SEARCH_UPSTREAM_CAPACITY", 6))
+# Raise the limit while upstreams keep up, cut it on errors, throttling and slow calls (AIMD)
+SEARCH_ADAPTIVE_CONCURRENCY = os.getenv("SEARCH_ADAPTIVE_CONCURRENCY", "true").lower() in ("1", "true", "yes")
+# Bounds of the adaptive limit
+SEARCH_CONCURRENCY_FLOOR = int(os.getenv("SEARCH_CONCURRENCY_FLOOR", 2))
+SEARCH_CONCURRENCY_CEILING = int(os.getenv("SEARCH_CONCURRENCY_CEILING", 10))
+# Upstream calls each priority class may run at once
+SEARCH_CLASS_LIMITS = {
+    'interactive': int(os.getenv("SEARCH_INTERACTIVE_LIMIT", 5)),
+    'bulk': int(os.getenv("SEARCH_BULK_LIMIT", 4)),
+    'background': int(os.getenv("SEARCH_BACKGROUND_LIMIT", 1)),
+}
+# Share of contended capacity each class gets (weighted fair queuing)
+SEARCH_CLASS_WEIGHTS = {
+    'interactive': float(os.getenv("SEARCH_INTERACTIVE_WEIGHT", 6)),
+    'bulk': float(os.getenv("SEARCH_BULK_WEIGHT", 2)),
+    'background': float(os.getenv("SEARCH_BACKGROUND_WEIGHT", 1)),
+}
@@ -5,6 +5,7 @@ from .initialization import LANCreator
 from django.core.exceptions import PermissionDenied
 from ..models import DeviceProfile, SongProfile
 from config import SONG_STORAGE_PATH
+from search.suggestions import suggestions
 
 
 class SongManager:
@@ -95,6 +96,9 @@ class SongManager:
                 file_format=song_data.get("file_format"),
             ))
         SongProfile.objects.bulk_create(new_songs)
+        # bulk_create skips post_save, so the suggestion index is fed directly
+        for song in new_songs:
+            suggestions.add_song(song.title, song.artist)
         return {"added": len(new_songs)}
 
 
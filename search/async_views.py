@@ -0,0 +1,88 @@
+"""
+Async-native search endpoints, served when the project runs on the ASGI app
+(seekbeat/asgi.py). They await SearchEngine directly on the server's event loop
+instead of spinning up a loop per request with async_to_sync, so one worker can
+hold hundreds of in-flight searches without a thread each.
+
+Parsing, validation and responses are shared with the DRF views in
+search/views.py (see search/search_requests.py), which remain the WSGI entry
+points and the documented OpenAPI schema; rate limits count against the same
+groups.
+"""
+
+import logging
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from django_ratelimit.core import is_ratelimited
+
+from .search_requests import BadRequest, BulkSearchRequest, SearchRequest
+from .search_utils.streaming import streaming_response
+
+logger = logging.getLogger('seekbeat')
+
+
+
+def async_ratelimit(group: str, key: str, rate: str):
+    """
+    django_ratelimit's @ratelimit for async views.
+
+    `group` should match the sync view's ratelimit group so both entry points
+    count against the same per-IP budget.
+    """
+    def decorator(view):
+        @wraps(view)
+        async def _wrapped(request, *args, **kwargs):
+            limited = await sync_to_async(is_ratelimited)(
+                request=request, group=group, key=key, rate=rate, increment=True
+            )
+            request.limited = limited
+            if limited:
+                logger.warning("Rate limit hit on %s for %s", group, request.META.get('REMOTE_ADDR'))
+                return JsonResponse({"detail": "You do not have permission to perform this action."}, status=403)
+            return await view(request, *args, **kwargs)
+        return _wrapped
+    return decorator
+
+
+
+def json_response(data, status: int = 200) -> JsonResponse:
+    """
+    JsonResponse that, like DRF's Response, renders lists as well as dicts.
+    """
+    return JsonResponse(data, status=status, safe=False)
+
+
+
+@require_GET
+@async_ratelimit(group='search.views.search_view', key='ip', rate='25/m')
+async def search_view(request):
+    logger.info("Received async single search request from %s", request.META.get('REMOTE_ADDR'))
+
+    try:
+        search = SearchRequest(request.GET)
+    except BadRequest as e:
+        return json_response({"error": str(e)}, status=400)
+
+    body, code = await search.run()
+    return search.respond(request, json_response, body, code)
+
+
+
+@require_GET
+@async_ratelimit(group='search.views.bulk_search_view', key='ip', rate='5/m')
+async def bulk_search_view(request):
+    logger.info("Received async bulk search request: %s", request.GET.get('queries'))
+
+    try:
+        bulk = BulkSearchRequest(request.GET)
+    except BadRequest as e:
+        return json_response({"error": str(e)}, status=400)
+
+    if bulk.stream:
+        return streaming_response(bulk.frames(), bulk.stream)
+
+    body, code = await bulk.run()
+    return bulk.respond(request, json_response, body, code)
@@ -0,0 +1,293 @@
+import contextlib
+import copy
+import json
+import math
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import requests
+
+
+CASSETTE_DIR = Path(__file__).resolve().parent / 'cassettes'
+# Generated, not recorded: responses shaped like the real ones (made-up video IDs,
+# templated titles), holding only the fields the engine reads, for 10 search terms
+# with 10 results each (one bulk_search batch). Record real ones with --record.
+DEFAULT_CASSETTE = CASSETTE_DIR / 'generated.json'
+
+SEARCH_URL = "https://www.googleapis.com/youtube/v3/search"
+VIDEOS_URL = "https://www.googleapis.com/youtube/v3/videos"
+YTSEARCH = re.compile(r'^ytsearch(\d*):(.*)$', re.S)
+
+# The exception SearchEngine._retry_request's commented-out line raises
+SIMULATED_API_FAILURE = "Simulated API failure for testing."
+
+
+
+class CassetteMiss(LookupError):
+    """
+    Raised for a request the cassette has no recording of.
+    """
+
+
+
+@dataclass(frozen=True)
+class Profile:
+    """
+    Injected upstream latency and failures.
+
+    Latencies are log-normal, given by their median and p99 in milliseconds.
+    `api_error_rate` of Data API calls raise SIMULATED_API_FAILURE and
+    `api_5xx_rate` answer 503; `ytdlp_error_rate` of extractions raise.
+    """
+
+    name: str
+    api_latency_ms: tuple = (0, 0)
+    ytdlp_latency_ms: tuple = (0, 0)
+    api_error_rate: float = 0.0
+    api_5xx_rate: float = 0.0
+    ytdlp_error_rate: float = 0.0
+
+
+PROFILES = {
+    # No latency: measures the engine's own overhead
+    'none': Profile('none'),
+    # Typical upstream latencies
+    'typical': Profile('typical', api_latency_ms=(120, 600), ytdlp_latency_ms=(900, 3000)),
+    # Typical latencies with intermittent API 503s, API errors and yt-dlp errors
+    'flaky': Profile('flaky', api_latency_ms=(120, 600), ytdlp_latency_ms=(900, 3000),
+                     api_error_rate=0.1, api_5xx_rate=0.1, ytdlp_error_rate=0.05),
+    # Every API call fails, as with the "Simulated API failure" line uncommented
+    'api-down': Profile('api-down', api_error_rate=1.0),
+}
+
+
+
+class ReplayResponse:
+    """
+    The parts of requests.Response the engine reads.
+    """
+
+    def __init__(self, status_code: int, body: dict):
+        self.status_code = status_code
+        self._body = body
+
+    def json(self):
+        return self._body
+
+    @property
+    def text(self) -> str:
+        return json.dumps(self._body)
+
+
+
+class Cassette:
+    """
+    Data API and yt-dlp responses, replayed in place of the network: recorded
+    from the live services (see Recorder) or generated (DEFAULT_CASSETTE).
+
+    File layout (JSON):
+        {
+          "search": {query: search.list response body},
+          "videos": {video_id: videos.list item (snippet, contentDetails)},
+          "ytdlp":  {search term or URL: yt-dlp info dict (YTDLP_INFO_KEYS only)}
+        }
+
+    videos.list responses are assembled from "videos" for whatever IDs a batch
+    asks for, and `ytsearchN:` queries are served from the term's recording,
+    cut to N entries, so one recording serves every batch and result size.
+    """
+
+    def __init__(self, search=None, videos=None, ytdlp=None, path=None):
+        self.search = search or {}
+        self.videos = videos or {}
+        self.ytdlp = ytdlp or {}
+        self.path = path
+        self.misses = 0
+        self._lock = threading.Lock()
+
+
+    @classmethod
+    def load(cls, path=DEFAULT_CASSETTE) -> 'Cassette':
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data.get('search'), data.get('videos'), data.get('ytdlp'), path=path)
+
+
+    def save(self, path=None) -> None:
+        path = path or self.path
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'search': self.search, 'videos': self.videos, 'ytdlp': self.ytdlp}, f, indent=1, sort_keys=True)
+
+
+    @property
+    def queries(self) -> list[str]:
+        """
+        Search terms recorded for both the Data API and yt-dlp.
+        """
+        return [q for q in self.search if q in self.ytdlp]
+
+
+    def _miss(self, what: str):
+        with self._lock:
+            self.misses += 1
+        raise CassetteMiss(f"No recording of {what}")
+
+
+    def api_response(self, url: str, params: dict) -> ReplayResponse:
+        if url == SEARCH_URL:
+            body = self.search.get(params.get('q'))
+            if body is None:
+                self._miss(f"search.list q={params.get('q')!r}")
+            if params.get('pageToken'):  # Recordings hold first pages only
+                body = {**body, 'items': [], 'nextPageToken': None}
+            return ReplayResponse(200, copy.deepcopy(body))
+        if url == VIDEOS_URL:
+            ids = (params.get('id') or '').split(',')
+            return ReplayResponse(200, {'items': [copy.deepcopy(self.videos[i]) for i in ids if i in self.videos]})
+        self._miss(f"GET {url}")
+
+
+    def extraction(self, query: str) -> dict:
+        match = YTSEARCH.match(query)
+        if match:
+            info = self.ytdlp.get(match.group(2))
+            if info is None:
+                self._miss(f"yt-dlp search {match.group(2)!r}")
+            info = copy.deepcopy(info)
+            info['entries'] = info.get('entries', [])[:int(match.group(1) or 1)]
+            return info
+        info = self.ytdlp.get(query)
+        if info is None:
+            self._miss(f"yt-dlp extraction of {query!r}")
+        return copy.deepcopy(info)
+
+
+
+class Replayer:
+    """
+    Serves an engine's upstream calls from a cassette, with a Profile's latency
+    and failures. While active, requests.get (the Data API and duration lookups)
+    and engine._execute_search (yt-dlp) are replaced:
+
+        with Replayer(cassette, PROFILES['typical']).installed(engine):
+            ...
+    """
+
+    def __init__(self, cassette: Cassette, profile: Profile = PROFILES['none'], seed: int = 0):
+        self.cassette = cassette
+        self.profile = profile
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.api_calls = 0
+        self.extractions = 0
+        self.injected_failures = 0
+
+
+    def _draw(self) -> float:
+        with self._lock:
+            return self._random.random()
+
+
+    def _latency(self, median_p99) -> None:
+        median, p99 = median_p99
+        if not median:
+            return
+        sigma = math.log(max(p99, median) / median) / 2.326
+        with self._lock:
+            ms = median * math.exp(self._random.gauss(0, sigma))
+        time.sleep(ms / 1000)
+
+
+    def _fail(self, rate: float) -> bool:
+        if rate and self._draw() < rate:
+            with self._lock:
+                self.injected_failures += 1
+            return True
+        return False
+
+
+    def get(self, url, params=None, **kwargs):
+        with self._lock:
+            self.api_calls += 1
+        self._latency(self.profile.api_latency_ms)
+        if self._fail(self.profile.api_error_rate):
+            raise Exception(SIMULATED_API_FAILURE)
+        if self._fail(self.profile.api_5xx_rate):
+            return ReplayResponse(503, {'error': {'code': 503, 'message': 'Simulated backend error'}})
+        return self.cassette.api_response(url, params or {})
+
+
+    def extract(self, query: str, flat: bool = False) -> dict:
+        with self._lock:
+            self.extractions += 1
+        self._latency(self.profile.ytdlp_latency_ms)
+        if self._fail(self.profile.ytdlp_error_rate):
+            raise Exception("Simulated yt-dlp extraction failure.")
+        return self.cassette.extraction(query)
+
+
+    @contextlib.contextmanager
+    def installed(self, engine):
+        original_get = requests.get
+        requests.get = self.get
+        engine._execute_search = self.extract
+        try:
+            yield self
+        finally:
+            requests.get = original_get
+            del engine._execute_search
+
+
+
+class Recorder:
+    """
+    Records an engine's real upstream responses into a cassette (needs network
+    access and, for the Data API, NORMAL_SEARCH_YOUTUBE_API_KEY):
+
+        with Recorder(cassette).installed(engine):
+            ...
+        cassette.save()
+    """
+
+    def __init__(self, cassette: Cassette):
+        self.cassette = cassette
+
+
+    def get(self, original_get):
+        def recording_get(url, params=None, **kwargs):
+            response = original_get(url, params=params, **kwargs)
+            if response.status_code == 200:
+                body = response.json()
+                if url == SEARCH_URL and not (params or {}).get('pageToken'):
+                    self.cassette.search[params['q']] = body
+                elif url == VIDEOS_URL:
+                    for item in body.get('items', []):
+                        known = self.cassette.videos.get(item['id'], {})
+                        self.cassette.videos[item['id']] = {**known, **item}
+            return response
+        return recording_get
+
+
+    def extract(self, original_extract):
+        def recording_extract(query: str, flat: bool = False):
+            info = original_extract(query, flat)
+            match = YTSEARCH.match(query)
+            self.cassette.ytdlp[match.group(2) if match else query] = info
+            return info
+        return recording_extract
+
+
+    @contextlib.contextmanager
+    def installed(self, engine):
+        original_get = requests.get
+        requests.get = self.get(original_get)
+        engine._execute_search = self.extract(type(engine)._execute_search.__get__(engine))
+        try:
+            yield self
+        finally:
+            requests.get = original_get
+            del engine._execute_search
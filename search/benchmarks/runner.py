@@ -0,0 +1,282 @@
+import asyncio
+import contextlib
+import dataclasses
+import io
+import json
+import logging
+import platform
+import time
+import tracemalloc
+from pathlib import Path
+
+from search.search_engine import SearchEngine
+from search.search_utils.circuit_breaker import CircuitBreaker
+from search.search_utils.result_cache import LocalCacheBackend, SearchResultCache
+from .cassette import PROFILES, Replayer
+
+logger = logging.getLogger('seekbeat')
+
+
+BASELINES = Path(__file__).resolve().parent / 'baselines.json'
+
+# Scenario -> iterations per requested iteration (cheap scenarios need more samples)
+SCENARIOS = {
+    'classify': 20,
+    'single_search': 1,
+    'bulk_search': 1,
+    'api_fallback': 1,
+    'cache_hit': 20,
+}
+
+# Metrics compared against the baselines, with the smallest change that counts
+# (concurrent scenarios' peaks move by tens of KiB with how their tasks interleave)
+COMPARED_METRICS = {'p50_ms': 0.05, 'p95_ms': 0.1, 'p99_ms': 0.2, 'peak_kib': 64}
+
+# Below this many timed calls p99 is the single slowest one (one GC pause), so it isn't compared
+MIN_P99_SAMPLES = 100
+
+# Queries that aren't plain searches, mixed into the classify scenario
+CLASSIFY_EXTRAS = [
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+    "https://youtu.be/dQw4w9WgXcQ?si=abc",
+    "   lots   of   spaces   ",
+    "",
+    "x" * 600,
+]
+
+WARMUP_ITERATIONS = 2
+
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of `samples`.
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(durations_ms: list[float], peaks: list[int], retained: list[int], errors: int) -> dict:
+    return {
+        'iterations': len(durations_ms),
+        'p50_ms': round(percentile(durations_ms, 50), 4),
+        'p95_ms': round(percentile(durations_ms, 95), 4),
+        'p99_ms': round(percentile(durations_ms, 99), 4),
+        'mean_ms': round(sum(durations_ms) / len(durations_ms), 4) if durations_ms else 0.0,
+        # Median: one call's peak swings with the query and with thread-pool and GC timing
+        'peak_kib': round(percentile(peaks, 50) / 1024, 1),
+        'retained_kib': round(sum(retained) / len(retained) / 1024, 1) if retained else 0.0,
+        'errors': errors,
+    }
+
+
+def is_error(result) -> bool:
+    if isinstance(result, dict):
+        return 'error' in result
+    if isinstance(result, list) and result and isinstance(result[0], dict) and 'search_term' in result[0]:
+        return any('error' in block for block in result)  # Bulk blocks
+    return False
+
+
+
+class BenchmarkRunner:
+    """
+    Times SearchEngine's hot paths against a cassette (see cassette.Cassette).
+
+    Every scenario runs `iterations` timed calls (times SCENARIOS' scale) on an
+    engine with a private in-process cache, then `alloc_iterations` more under
+    tracemalloc (after a warm-up under tracing) for the median peak and the
+    mean retained memory of one call. Except in
+    cache_hit, the result cache, durations, key quota and circuit breakers are
+    reset before each call, so every call takes the full path. The engine runs
+    with one attempt per upstream call: retry backoff is a fixed sleep, not work
+    the engine does.
+    """
+
+    def __init__(self, cassette, profile=PROFILES['none'], iterations: int = 50, alloc_iterations: int = 9, seed: int = 0):
+        self.cassette = cassette
+        self.profile = profile
+        self.iterations = iterations
+        self.alloc_iterations = alloc_iterations
+        self.seed = seed
+        self.queries = cassette.queries
+        if not self.queries:
+            raise ValueError("The cassette has no queries recorded for both the Data API and yt-dlp.")
+
+
+    def build_engine(self) -> SearchEngine:
+        engine = SearchEngine()
+        engine.cache = SearchResultCache(LocalCacheBackend(max_entries=4096))
+        engine.duration_resolver.store = LocalCacheBackend(max_entries=20000)
+        engine.duration_resolver.memory = LocalCacheBackend(max_entries=20000)
+        engine.NORMAL_API_KEY, engine.BULK_API_KEY = 'bench-interactive-key', 'bench-bulk-key'
+        engine.retries = 1
+        engine.hedging = False
+        engine.prefetch_pages = False
+        return engine
+
+
+    def reset(self, engine: SearchEngine) -> None:
+        engine.cache.clear()
+        engine.duration_resolver.store.clear()
+        engine.duration_resolver.memory.clear()
+        engine._key_pool = None
+        engine.breakers = {name: CircuitBreaker(name, slow_call_seconds=b.slow_call_seconds) for name, b in engine.breakers.items()}
+
+
+    def _term(self, engine, i: int) -> dict:
+        return engine.clean_and_classify_query(self.queries[i % len(self.queries)])
+
+
+    def _scenario(self, name: str, engine: SearchEngine):
+        """
+        (setup(i), call(i) -> awaitable) for a scenario.
+        """
+        reset = lambda i: self.reset(engine)
+
+        if name == 'classify':
+            queries = self.queries + CLASSIFY_EXTRAS
+            async def call(i):
+                return engine.clean_and_classify_query(queries[i % len(queries)])
+            return (lambda i: None), call
+
+        if name in ('single_search', 'api_fallback'):
+            return reset, lambda i: engine.regular_search_with_yt_api(self._term(engine, i))
+
+        if name == 'bulk_search':
+            size = engine.max_bulk_search
+            return reset, lambda i: engine.bulk_search([self._term(engine, i + j) for j in range(size)])
+
+        if name == 'cache_hit':
+            # Every query is searched once, untimed, before the timed calls (see _measure)
+            return (lambda i: None), lambda i: engine.regular_search_with_yt_api(self._term(engine, i))
+
+        raise ValueError(f"Unknown scenario {name!r}")
+
+
+    async def _measure(self, name: str, engine: SearchEngine) -> dict:
+        setup, call = self._scenario(name, engine)
+        iterations = self.iterations * SCENARIOS[name]
+        errors = 0
+
+        if name == 'cache_hit':
+            for i in range(len(self.queries)):
+                await call(i)
+
+        for i in range(WARMUP_ITERATIONS):
+            setup(i)
+            await call(i)
+
+        durations = []
+        for i in range(iterations):
+            setup(i)
+            started = time.perf_counter()
+            result = await call(i)
+            durations.append((time.perf_counter() - started) * 1000)
+            errors += is_error(result)
+
+        peaks, retained = [], []
+        tracemalloc.start()
+        try:
+            # Untraced warm-up allocations (lazy imports, interning, pool threads) would
+            # otherwise land on the first traced calls
+            for i in range(WARMUP_ITERATIONS):
+                setup(i)
+                await call(i)
+            for i in range(self.alloc_iterations):
+                setup(i)
+                before = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                result = await call(i)
+                current, peak = tracemalloc.get_traced_memory()
+                peaks.append(peak - before)
+                retained.append(max(0, current - before))
+                del result
+        finally:
+            tracemalloc.stop()
+
+        return summarize(durations, peaks, retained, errors)
+
+
+    def run(self, scenarios=None) -> dict:
+        """
+        Run `scenarios` (default: all) and return {scenario: summary}.
+        """
+        results = {}
+        level = logger.level
+        logger.setLevel(logging.CRITICAL)  # Injected failures would otherwise log every call
+        try:
+            for name in scenarios or SCENARIOS:
+                profile = self.profile
+                if name == 'api_fallback':
+                    profile = dataclasses.replace(profile, name=f"{profile.name}+api-down", api_error_rate=1.0, api_5xx_rate=0.0)
+                engine = self.build_engine()
+                replayer = Replayer(self.cassette, profile, seed=self.seed)
+                with replayer.installed(engine), contextlib.redirect_stdout(io.StringIO()):
+                    results[name] = asyncio.run(self._measure(name, engine))
+                results[name]['upstream_calls'] = replayer.api_calls + replayer.extractions
+        finally:
+            logger.setLevel(level)
+        return results
+
+
+
+def load_baselines(path=BASELINES) -> dict:
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(profile_name: str, results: dict, path=BASELINES) -> None:
+    """
+    Store `results` as the baseline of `profile_name`, keeping other profiles'.
+    """
+    baselines = load_baselines(path)
+    baselines[profile_name] = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'scenarios': results,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def compare(results: dict, baseline: dict, tolerance: float = 0.25) -> list[dict]:
+    """
+    Compare a run with a stored baseline.
+
+    A metric regresses when it is more than `tolerance` (a fraction) above the
+    baseline and by more than its COMPARED_METRICS floor, which keeps
+    sub-millisecond jitter from counting. p99 is left out for scenarios timed
+    with fewer than MIN_P99_SAMPLES calls.
+
+    Returns:
+        list[dict]: {'scenario', 'metric', 'baseline', 'current', 'change', 'status'}
+                    with status 'ok', 'regression', 'improved' or 'new'.
+    """
+    rows = []
+    stored = (baseline or {}).get('scenarios', {})
+    for scenario, summary in results.items():
+        for metric, floor in COMPARED_METRICS.items():
+            if metric == 'p99_ms' and summary.get('iterations', MIN_P99_SAMPLES) < MIN_P99_SAMPLES:
+                continue
+            current = summary[metric]
+            before = stored.get(scenario, {}).get(metric)
+            if before is None:
+                rows.append({'scenario': scenario, 'metric': metric, 'baseline': None, 'current': current, 'change': None, 'status': 'new'})
+                continue
+            change = (current - before) / before if before else 0.0
+            status = 'ok'
+            if abs(current - before) > floor:
+                if change > tolerance:
+                    status = 'regression'
+                elif change < -tolerance:
+                    status = 'improved'
+            rows.append({'scenario': scenario, 'metric': metric, 'baseline': before, 'current': current, 'change': round(change, 3), 'status': status})
+    return rows
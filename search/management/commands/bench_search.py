@@ -0,0 +1,99 @@
+import asyncio
+
+from django.core.management.base import BaseCommand, CommandError
+
+from search.benchmarks.cassette import DEFAULT_CASSETTE, PROFILES, Cassette, Recorder
+from search.benchmarks.runner import BASELINES, SCENARIOS, BenchmarkRunner, compare, load_baselines, save_baseline
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark SearchEngine offline against replayed Data API and yt-dlp responses: "
+        "p50/p95/p99 latency and memory per call, compared with the stored baselines."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profile', choices=sorted(PROFILES), default='none',
+                            help="Injected upstream latency/failures (default: none, the engine's own overhead).")
+        parser.add_argument('--scenario', action='append', choices=list(SCENARIOS), dest='scenarios',
+                            help="Scenario to run (repeatable; default: all).")
+        parser.add_argument('--iterations', type=int, default=50, help="Timed calls per scenario (default: 50).")
+        parser.add_argument('--cassette', default=str(DEFAULT_CASSETTE), help="Cassette file to replay.")
+        parser.add_argument('--baselines', default=str(BASELINES), help="Baselines file.")
+        parser.add_argument('--save-baseline', action='store_true', help="Store this run as the profile's baseline.")
+        parser.add_argument('--check', action='store_true', help="Exit with an error if any metric regressed.")
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help="Relative slowdown that counts as a regression (default: 0.25).")
+        parser.add_argument('--record', nargs='+', metavar='QUERY',
+                            help="Record QUERY's live Data API and yt-dlp responses into the cassette instead of benchmarking.")
+
+    def handle(self, *args, **options):
+        if options['record']:
+            return self.record(options['record'], options['cassette'])
+
+        try:
+            cassette = Cassette.load(options['cassette'])
+            runner = BenchmarkRunner(cassette, PROFILES[options['profile']], iterations=options['iterations'])
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Can't use cassette {options['cassette']}: {e}")
+
+        self.stdout.write(f"Profile {options['profile']}, {len(runner.queries)} cassette queries, {options['iterations']} iterations")
+        results = runner.run(options['scenarios'])
+        if cassette.misses:
+            self.stdout.write(self.style.WARNING(f"{cassette.misses} requests weren't in the cassette (counted as upstream errors)."))
+
+        baseline = load_baselines(options['baselines']).get(options['profile'])
+        rows = compare(results, baseline, options['tolerance'])
+        self.report(results, rows)
+
+        if options['save_baseline']:
+            save_baseline(options['profile'], results, options['baselines'])
+            self.stdout.write(self.style.SUCCESS(f"Baseline for {options['profile']} saved to {options['baselines']}"))
+
+        regressions = [r for r in rows if r['status'] == 'regression']
+        if options['check'] and regressions:
+            raise CommandError(f"{len(regressions)} metrics regressed past {options['tolerance']:.0%}.")
+
+    def report(self, results: dict, rows: list[dict]):
+        header = f"{'scenario':<14}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'peak KiB':>10}{'kept KiB':>10}{'errors':>8}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for name, s in results.items():
+            self.stdout.write(
+                f"{name:<14}{s['p50_ms']:>10.3f}{s['p95_ms']:>10.3f}{s['p99_ms']:>10.3f}"
+                f"{s['peak_kib']:>10.1f}{s['retained_kib']:>10.1f}{s['errors']:>8}"
+            )
+
+        for row in rows:
+            if row['status'] == 'regression':
+                self.stdout.write(self.style.ERROR(
+                    f"Regression: {row['scenario']} {row['metric']} {row['baseline']} -> {row['current']} ({row['change']:+.0%})"
+                ))
+            elif row['status'] == 'improved':
+                self.stdout.write(self.style.SUCCESS(
+                    f"Improved: {row['scenario']} {row['metric']} {row['baseline']} -> {row['current']} ({row['change']:+.0%})"
+                ))
+        if rows and all(r['status'] == 'new' for r in rows):
+            self.stdout.write("No baseline for this profile yet (store one with --save-baseline).")
+
+    def record(self, queries: list[str], path: str):
+        from search.search_engine import SearchEngine
+
+        try:
+            cassette = Cassette.load(path)
+        except FileNotFoundError:
+            cassette = Cassette(path=path)
+
+        engine = SearchEngine()
+        if not len(engine.key_pool):
+            raise CommandError("Recording the Data API needs NORMAL_SEARCH_YOUTUBE_API_KEY.")
+        with Recorder(cassette).installed(engine):
+            for query in queries:
+                term = engine.clean_and_classify_query(query)
+                if term['type'] != 'search':
+                    raise CommandError(f"Only search terms can be recorded: {query!r}")
+                asyncio.run(engine._api_page(term))
+                asyncio.run(engine._scrape_search(term))
+                self.stdout.write(f"Recorded {query!r}")
+        cassette.save()
+        self.stdout.write(self.style.SUCCESS(f"Cassette saved to {path}"))
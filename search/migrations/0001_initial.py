@@ -0,0 +1,46 @@
+# Generated by Django 5.2 on 2026-10-17 00:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VideoMetadata',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('video_id', models.CharField(max_length=64, unique=True)),
+                ('title', models.CharField(blank=True, max_length=500, null=True)),
+                ('duration', models.PositiveIntegerField(blank=True, null=True)),
+                ('uploader', models.CharField(blank=True, max_length=255, null=True)),
+                ('thumbnail', models.TextField(blank=True, null=True)),
+                ('webpage_url', models.TextField()),
+                ('upload_date', models.CharField(blank=True, max_length=40, null=True)),
+                ('largest_thumbnail', models.TextField(blank=True, null=True)),
+                ('smallest_thumbnail', models.TextField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='QueryResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cache_key', models.CharField(max_length=200, unique=True)),
+                ('source', models.CharField(max_length=20)),
+                ('query', models.CharField(max_length=500)),
+                ('video_ids', models.JSONField(default=list)),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('fetched_at', models.DateTimeField()),
+                ('last_hit_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-hits'], name='search_quer_hits_1ebd02_idx')],
+            },
+        ),
+    ]
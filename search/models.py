@@ -1,3 +1,42 @@
 from django.db import models
 
-# Create your models here.
+
+
+class VideoMetadata(models.Model):
+    """
+    Cleaned search result for one video, shared by every query that returned it.
+    """
+    video_id = models.CharField(max_length=64, unique=True)  # YouTube ID, or a URL digest for other sites
+    title = models.CharField(max_length=500, blank=True, null=True)
+    duration = models.PositiveIntegerField(blank=True, null=True)  # in seconds
+    uploader = models.CharField(max_length=255, blank=True, null=True)
+    thumbnail = models.TextField(blank=True, null=True)
+    webpage_url = models.TextField()
+    upload_date = models.CharField(max_length=40, blank=True, null=True)  # "20240525" (yt-dlp) or ISO 8601 (Data API)
+    largest_thumbnail = models.TextField(blank=True, null=True)
+    smallest_thumbnail = models.TextField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.title} ({self.video_id})"
+
+
+
+class QueryResult(models.Model):
+    """
+    Ordered list of videos a search produced, keyed by its result-cache key
+    (which covers the source, query and search parameters).
+    """
+    cache_key = models.CharField(max_length=200, unique=True)
+    source = models.CharField(max_length=20)
+    query = models.CharField(max_length=500)
+    video_ids = models.JSONField(default=list)
+    hits = models.PositiveIntegerField(default=0)
+    fetched_at = models.DateTimeField()
+    last_hit_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['-hits'])]
+
+    def __str__(self):
+        return f"{self.source}: {self.query} ({len(self.video_ids)} results)"
@@ -1,15 +1,42 @@
 import random
+import threading
+import time
 import yt_dlp
 import asyncio
 import requests
 import os
 import re
 import unicodedata
+from django.db import connection
 from django.db.models import Q
+from asgiref.sync import sync_to_async
 
 import logging
 
 from desktop_lan_connect.models import DeviceProfile, SongProfile
+from chrome_extension.models import BookmarkedVideo
+from .search_utils.result_cache import DjangoCacheBackend, SearchResultCache
+from .search_utils.duration_resolver import DurationResolver
+from .search_utils.single_flight import SingleFlight
+from .search_utils.scheduler import SearchScheduler, priority_scope, run_as
+from .search_utils.adaptive_limit import AdaptiveLimit
+from .search_utils.extractor_pool import get_extractor_pool, ExtractorPoolBusy
+from .search_utils.circuit_breaker import CircuitBreaker, CircuitOpen
+from .search_utils.pagination import MAX_PAGE_SIZE, InvalidCursor, decode_cursor, encode_cursor, window_bounds
+from .search_utils.background import BackgroundLoop
+from .search_utils.metadata_store import DurationStore, MetadataStore
+from .search_utils.links import canonical_video_id, playlist_url, youtube_video_id
+from .search_utils.deadline import (
+    DEADLINE_ERROR, MIN_API_ATTEMPT_SECONDS, MIN_CALL_SECONDS, MIN_YTDLP_ATTEMPT_SECONDS, DeadlineExceeded,
+    allows as deadline_allows, call_timeout, current_deadline, deadline_scope, mark_partial, within_deadline,
+)
+from .search_utils.hedging import Hedger
+from .search_utils.bulk_jobs import BulkJobManager
+from .search_utils.hits import SEARCH_FIELDS, YTDLP_INFO_KEYS, SearchHit, serialize_hits
+from config import SEARCH_WARM_START_QUERIES, SEARCH_HEDGING, SEARCH_HEDGE_PERCENTILE
+from config import SEARCH_CLASS_LIMITS, SEARCH_CLASS_WEIGHTS, SEARCH_UPSTREAM_CAPACITY
+from config import SEARCH_ADAPTIVE_CONCURRENCY, SEARCH_CONCURRENCY_FLOOR, SEARCH_CONCURRENCY_CEILING
+from .search_utils.api_keys import ApiKeyPool, QuotaExceeded, RATE_LIMIT_REASONS, PLAYLIST_ITEMS_UNITS, SEARCH_LIST_UNITS, VIDEOS_LIST_UNITS, quota_reason
 logger = logging.getLogger('seekbeat')
 
 
@@ -20,28 +47,67 @@ logger = logging.getLogger('seekbeat')
 # https://www.youtube.com/shorts/5OU4sM47h6A?feature=share # TODO Youtube hacks
 
 
+def select_fields(fields) -> tuple | None:
+    """
+    The requested result fields, in SEARCH_FIELDS order, or None for all of them.
+    Unknown names are ignored.
+    """
+    if not fields:
+        return None
+    selected = tuple(f for f in SEARCH_FIELDS if f in set(fields))
+    return selected if selected != SEARCH_FIELDS else None
+
+
+def project_results(results, fields):
+    """
+    Limit each result of a search to `fields` (None keeps every field).
+    Errors and anything other than a list of results are returned unchanged.
+    """
+    if fields is None or not isinstance(results, list):
+        return results
+    return [{f: r.get(f) for f in fields} if isinstance(r, dict) else r for r in results]
+
+
+# Sources of a federated search, local ones first
+FEDERATED_SOURCES = ("lan", "bookmark", "youtube")
+
+# yt-dlp search modes: "full" resolves every result's watch page, "flat" reads the results page only
+YTDLP_MODES = ("full", "flat")
+
+# Playlist expansion: playlistItems.list returns at most 50 items per call, and
+# flat yt-dlp reads the playlist in windows of 100 (one YouTube continuation page)
+PLAYLIST_API_PAGE_SIZE = 50
+PLAYLIST_YTDLP_WINDOW = 100
+# Placeholder titles of playlist entries that can't be played
+UNAVAILABLE_TITLES = {'[Private video]', '[Deleted video]', 'Private video', 'Deleted video'}
+
 
 class SearchEngine:
     """
     SearchEngine centralizes all search-related functionality:
       - regular_search: YouTube-based metadata search via yt-dlp
       - bulk_search: run multiple regular_search calls concurrently
-      - lan_search: placeholder for LAN-based media search (future)
+      - lan_search: songs shared by active LAN devices
+      - bookmark_search: videos bookmarked from the Chrome extension
+      - federated_search: all of the above at once, local results first
     """
 
-    def __init__(self, config=None):
+    def __init__(self, config=None, persistent=False):
         """
         Initialize the SearchEngine with optional custom yt-dlp config.
 
         Args:
             config (dict, optional): A dict of yt-dlp options. If None,
                                      defaults to SEARCH_YDL_OPTS.
+            persistent (bool, optional): Keep results in the SQLite metadata store,
+                                         serve repeat queries from it, and load the
+                                         hottest queries into memory on startup.
         """
         
         # Default yt-dlp options optimized for fast, metadata-only searches
         self.SEARCH_YDL_OPTS = {
             "format": "bestaudio/best",    # Best audio quality
-            # "noplaylist": True,              # Ignore playlists
+            "noplaylist": True,              # watch?v=…&list=… links resolve to the video; playlists are expanded by playlist_pages
             "quiet": True,                   # Suppress console output
             "skip_download": True,           # Do not download files
             # "extract_flat": "in_playlist",           # Get full metadata, not flat URLs
@@ -49,6 +115,7 @@ class SearchEngine:
             # "source_address": "0.0.0.0",   # Avoid IPv6 resolution issues
             # "cachedir": False,               # Disable yt-dlp cache
             "no_warnings": True,             # Suppress warnings
+            "socket_timeout": 15,            # A stalled connection can't hold an extractor worker indefinitely
             # "print_json": True,
             "user_agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.5993.118 Safari/537.36"
         }
@@ -57,29 +124,201 @@ class SearchEngine:
         self.config = config if config else self.SEARCH_YDL_OPTS
 
         logger.debug("Initializing SearchEngine with config: %s", self.config)
-        # Initialize the yt-dlp extractor
-        self.ydl = yt_dlp.YoutubeDL(self.config)
+        # Flat options: search entries come from the results page alone, without resolving each video
+        self.flat_config = {**self.config, "extract_flat": "in_playlist"}
+        # Warm yt-dlp extractor processes, shared with StreamingEngine
+        self.extractor_pool = get_extractor_pool()
         # Default maximum number of results per query
         self.max_results = 10
         self.retries = 5
-        self.max_concurrent_searches = 5
-        self._sem = asyncio.Semaphore(self.max_concurrent_searches)
+        # Upstream calls each priority class (interactive, bulk, background) may run at once
+        self.max_concurrent_searches = dict(SEARCH_CLASS_LIMITS)
+        # Admits upstream calls (API requests, yt-dlp extractions) process-wide, interactive first.
+        # Their total follows observed upstream latency and errors (AIMD) unless adaptive concurrency is off
+        adaptive = AdaptiveLimit(SEARCH_UPSTREAM_CAPACITY, SEARCH_CONCURRENCY_FLOOR, SEARCH_CONCURRENCY_CEILING) if SEARCH_ADAPTIVE_CONCURRENCY else None
+        self.scheduler = SearchScheduler(self.max_concurrent_searches, SEARCH_CLASS_WEIGHTS, SEARCH_UPSTREAM_CAPACITY, adaptive=adaptive)
         self.max_query_length = 500
         self.max_bulk_search = 10
         self.BULK_API_KEY=os.getenv('BULK_SEARCH_YOUTUBE_API_KEY')
         self.NORMAL_API_KEY=os.getenv('NORMAL_SEARCH_YOUTUBE_API_KEY')
+        # Result cache (in-process in desktop mode, shared Django cache in web mode)
+        self.cache = SearchResultCache.for_environment()
+        # Batched videos.list duration lookups, remembered in the database when persistent
+        self.duration_resolver = DurationResolver(parse_duration=self._parse_duration, store=DurationStore() if persistent else None, limiter=self.scheduler)
+        # Concurrent identical searches share one in-flight upstream call
+        self.single_flight = SingleFlight()
+        # Per-upstream circuit breakers: fail fast (or fall back) while an upstream is down
+        self.breakers = {
+            'youtube_api': CircuitBreaker('youtube_api', slow_call_seconds=5),
+            'yt_dlp': CircuitBreaker('yt_dlp', slow_call_seconds=20),
+        }
+        # Runs prefetches and store refreshes outside the request's event loop
+        self.background = BackgroundLoop('seekbeat-background')
+        self.prefetch_pages = True
+        # Results that survive restarts (stale-while-revalidate)
+        self.store = MetadataStore() if persistent else None
+        if self.store is not None:
+            threading.Thread(target=self._warm_start_in_background, name='seekbeat-warm-start', daemon=True).start()
+        # Quota-aware API key pool, built lazily from NORMAL_API_KEY / BULK_API_KEY
+        self._key_pool = None
+        self._key_pool_sources = None
+        # Bulk terms collapsed onto another term
+        self.bulk_stats = {'terms': 0, 'deduplicated': 0}
+        # Video links answered with videos.list instead of yt-dlp
+        self.link_stats = {'videos_list_calls': 0, 'resolved': 0, 'not_found': 0, 'fallbacks': 0}
+        # Optional hedging: single searches start yt-dlp alongside a slow API call
+        self.hedging = SEARCH_HEDGING
+        self.hedger = Hedger(percentile=SEARCH_HEDGE_PERCENTILE)
+        # Large term lists searched as background jobs, in bulk_search-sized batches; in web
+        # mode every worker can follow them through the shared "search" cache
+        shared = self.cache.backend if isinstance(self.cache.backend, DjangoCacheBackend) else None
+        self.jobs = BulkJobManager(self.bulk_search_stream, self._bulk_key, self.background, batch_size=self.max_bulk_search, store=shared)
+
+
+    @property
+    def key_pool(self) -> ApiKeyPool:
+        """
+        API keys for interactive (NORMAL_API_KEY) and bulk (BULK_API_KEY) traffic.
+        Rebuilt if either setting is reassigned.
+        """
+        sources = (self.NORMAL_API_KEY, self.BULK_API_KEY)
+        if self._key_pool is None or self._key_pool_sources != sources:
+            self._key_pool = ApiKeyPool.from_env_values(self.NORMAL_API_KEY, self.BULK_API_KEY)
+            self._key_pool_sources = sources
+            self.duration_resolver.key_pool = self._key_pool
+        return self._key_pool
+
 
+    def _execute_search(self, query: str, flat: bool = False):
+        """
+        Helper method to run the yt-dlp search synchronously on the extractor pool.
+        Only the info keys a result is built from come back from the worker.
 
-    def _execute_search(self, query: str):
+        Gives up when the current deadline passes (cancelling the job if it hasn't
+        started), so the thread doesn't outlive the scheduler slot it ran under.
         """
-        Helper method to run the yt-dlp search synchronously.
+        try:
+            return self.extractor_pool.extract(query, self.flat_config if flat else self.config, keys=YTDLP_INFO_KEYS, timeout=call_timeout(None))
+        except TimeoutError:
+            mark_partial('yt-dlp')
+            raise DeadlineExceeded('yt-dlp') from None
+
+
+    async def _cached_call(self, key: str, fetch, flight_key: str = None, query: str = None):
         """
-        return self.ydl.extract_info(query, download=False)
+        Serve `key` from the result cache, or run `fetch()` and cache what it returns.
+        Concurrent misses for the same key are coalesced into a single `fetch()`.
 
-        
+        With a metadata store, misses are next looked up there: stored results are
+        returned at once and, once past the freshness threshold, refreshed in the
+        background. Fresh results are written back to the store.
+
+        Args:
+            key (str): Cache key built with self.cache.make_key.
+            fetch (callable): Zero-argument callable returning the upstream coroutine.
+            flight_key (str, optional): Coalescing key, when callers with the same cache
+                                        key must not share errors (defaults to `key`).
+            query (str, optional): Query text; results are only persisted when given.
+        """
+        cached = self.cache.get(key)
+        if cached is not None:
+            logger.debug("Cache hit for key=%s", key)
+            return cached
+
+        async def fetch_and_store():
+            # A child deadline tells whether this result was cut short (and must not be kept).
+            # It travels with the outcome, so coalesced callers can tell whose budget cut it short.
+            parent = current_deadline()
+            with deadline_scope(parent.child() if parent else None) as deadline:
+                try:
+                    result = await fetch()
+                except DeadlineExceeded as e:
+                    return e, deadline
+            if deadline is not None and deadline.partial:
+                logger.debug("Not caching partial result for key=%s", key)
+                return result, deadline
+            self.cache.store(key, result)
+            if self.store is not None and query is not None and self.store.is_storable(result):
+                try:
+                    await sync_to_async(self.store.save)(key, query, result)
+                except Exception:
+                    logger.exception("Metadata store write failed for key=%s", key)
+            return result, deadline
+
+        if self.store is not None and query is not None:
+            try:
+                stored = await sync_to_async(self.store.lookup)(key)
+            except Exception:
+                logger.exception("Metadata store lookup failed for key=%s", key)
+                stored = None
+            if stored is not None:
+                results, age = stored
+                self.cache.store(key, results)
+                if age > self.store.fresh_seconds:
+                    logger.debug("Serving stale stored results for key=%s (age=%ds), refreshing", key, age)
+                    self.background.spawn(f"revalidate:{key}", lambda: run_as('background', lambda: self.single_flight.do(flight_key or key, fetch_and_store)))
+                return results
+
+        while True:
+            result, deadline = await self.single_flight.do(flight_key or key, fetch_and_store)
+            if deadline is not None and deadline.partial and deadline.parent is not current_deadline():
+                # Cut short by the budget of another request we coalesced with: search again under ours
+                logger.debug("Coalesced call for key=%s was cut short by another deadline; retrying", key)
+                continue
+            if isinstance(result, DeadlineExceeded):
+                raise result
+            return result
+
+
+    def warm_start(self, limit: int = SEARCH_WARM_START_QUERIES) -> int:
+        """
+        Load the most requested stored queries into the result cache.
+
+        Returns:
+            int: Number of queries loaded.
+        """
+        try:
+            hottest = self.store.hottest(limit)
+        except Exception as e:
+            logger.warning("Warm start skipped: %s", e)
+            return 0
+
+        for key, results in hottest:
+            self.cache.store(key, results)
+        self.store.warm_loaded += len(hottest)
+        logger.info("Warm start loaded %d stored queries", len(hottest))
+        return len(hottest)
+
+
+    def _warm_start_in_background(self) -> None:
+        try:
+            self.warm_start()
+        finally:
+            connection.close()  # This thread's own connection
 
 
-    async def regular_search(self, search_term: str, max_results: int = None, offset: int = None) -> list[dict] | dict:
+    def get_stats(self) -> dict:
+        """
+        Runtime counters for the search engine, used by the stats endpoint.
+        """
+        return {
+            'cache': self.cache.stats(),
+            'durations': self.duration_resolver.stats(),
+            'single_flight': self.single_flight.stats(),
+            'concurrency': self.scheduler.stats(),
+            'extractor_pool': self.extractor_pool.stats(),
+            'api_keys': self.key_pool.stats(),
+            'breakers': {name: breaker.stats() for name, breaker in self.breakers.items()},
+            'background': self.background.stats(),
+            'store': self.store.stats() if self.store is not None else None,
+            'bulk': dict(self.bulk_stats),
+            'links': dict(self.link_stats),
+            'hedging': {'enabled': self.hedging, **self.hedger.stats()},
+            'jobs': self.jobs.stats(),
+        }
+
+
+    async def regular_search(self, search_term: str, max_results: int = None, offset: int = None, mode: str = "full", fields=None) -> list[dict] | dict:
         """
         Perform a single metadata search on YouTube.
 
@@ -87,11 +326,30 @@ class SearchEngine:
             search_term (str): The query string or URL.
             max_results (int, optional): Limit of results to return.
             offset (int, optional): Skip this many initial results.
+            mode (str, optional): "full" (resolve every result) or "flat" (results page only).
+            fields (iterable, optional): In flat mode, fields to fill in by resolving
+                                         only the results that lack them.
 
         Returns:
             list[dict] or dict: A list of metadata dicts for matching videos,
                                 or an error dict on failure.
         """
+        if search_term['type'] == 'invalid':
+            return search_term['reason']
+
+        fields = tuple(sorted(f for f in fields or () if f in SEARCH_FIELDS))
+        key = self.cache.make_key('ytdlp', search_term, max_results=max_results or self.max_results, offset=offset or 0, mode=mode, fields=fields)
+        return await self._cached_call(key, lambda: self._scrape_search(search_term, max_results, offset, mode, fields), query=search_term['query'])
+
+
+    async def _scrape_search(self, search_term: str, max_results: int = None, offset: int = None, mode: str = "full", fields=()) -> list[dict] | dict:
+        """
+        Uncached yt-dlp search behind regular_search, with retries and backoff.
+        """
+        # Past the first results, list the results page flat and resolve only the
+        # requested window instead of every video before it
+        if mode == "full" and offset and search_term['type'] == 'search':
+            return await self._scrape_search(search_term, max_results, offset, mode="flat", fields=SEARCH_FIELDS)
         limit = max_results or self.max_results
         total_to_fetch = limit + (offset or 0)
 
@@ -101,82 +359,154 @@ class SearchEngine:
         elif search_term['type'] == 'youtube':
             search_term = search_term['query']
             query = f"{search_term}"
+            upstream = f'yt_dlp_{mode}_link'
         elif search_term['type'] == 'search':
             search_term = search_term['query']
             query = f"ytsearch{total_to_fetch}:{search_term}"
+            # Windows of similar size share a latency baseline (rounded up to a power of two)
+            upstream = f'yt_dlp_{mode}_search{1 << (total_to_fetch - 1).bit_length()}'
 
         logger.info("yt-dlp search for query=%s", query)
 
-      
+        breaker = self.breakers['yt_dlp']
 
         for attempt in range(self.retries): 
+            if not deadline_allows(MIN_YTDLP_ATTEMPT_SECONDS):
+                mark_partial('yt-dlp')
+                return {"error": DEADLINE_ERROR}
             if attempt > 0:
                 print(f"Scrapper Retry: {attempt}/{self.retries}")
                 logger.debug(f"Scrapper Retry: {attempt}/{self.retries} for search term: {query}")
             try:
-
-                result = await asyncio.to_thread(self._execute_search, query)
+                # Fails fast (CircuitOpen) while yt-dlp extraction is known to be failing
+                breaker.allow()
+                started = time.monotonic()
+                try:
+                    async with self.scheduler:
+                        started = time.monotonic()  # Time spent queued for a slot isn't yt-dlp's
+                        if mode == "flat":
+                            result = await within_deadline(asyncio.to_thread(self._execute_search, query, True), 'yt-dlp')
+                        else:
+                            result = await within_deadline(asyncio.to_thread(self._execute_search, query), 'yt-dlp')
+                except (ExtractorPoolBusy, DeadlineExceeded, asyncio.CancelledError) as e:
+                    # Cancelled calls (hedge losers, expired bulk terms, gone clients) say nothing either
+                    breaker.record_neutral()
+                    if isinstance(e, ExtractorPoolBusy):
+                        self.scheduler.record_failure(upstream, 'busy')
+                    raise
+                except Exception:
+                    breaker.record_failure(time.monotonic() - started)
+                    self.scheduler.record_failure(upstream)
+                    raise
+                elapsed = time.monotonic() - started
+                breaker.record_success(elapsed)
+                # Flat and full extractions, links and search windows are told apart: their usual latencies differ widely
+                self.scheduler.record_success(upstream, elapsed)
                 logger.debug("yt-dlp returned type=%s for query=%s", result.get('_type'), query)
                 
 
-                # If it returns a playlist-like result
-                if isinstance(result, dict) and result.get("_type") == "playlist":
-                    entries = result.get("entries", [])
-                    cleaned_entries = [
-                        {
-                            "title": e.get("title"),
-                            "duration": e.get("duration"),
-                            "uploader": e.get("uploader"),
-                            "thumbnail": e.get("thumbnail"),
-                            "webpage_url": e.get("webpage_url"),
-                            'upload_date': e.get('upload_date'),
-                            'largest_thumbnail': max(e.get('thumbnails', []), key=lambda t: t.get('height', 0) * t.get('width', 0)).get('url') if e.get('thumbnails', []) else e.get('thumbnail'),
-                            'smallest_thumbnail': min(e.get('thumbnails', []), key=lambda t: t.get('filesize', float('inf'))).get('url')  if e.get('thumbnails', []) else e.get('thumbnail'),
-                        }
-                        for e in entries[offset or 0:total_to_fetch]
-                        if e and e.get("title") and e.get("webpage_url")
-                    ]
-                    # return cleaned_entries
-                    return cleaned_entries
-
-                # Single video fallback
-                if isinstance(result, dict) and result.get("title") and result.get("webpage_url"):
-                    return [{
-                        "title": result.get("title"),
-                        "duration": result.get("duration"),
-                        "uploader": result.get("uploader"),
-                        "thumbnail": result.get("thumbnail"),
-                        "webpage_url": result.get("webpage_url"),
-                        'upload_date': result.get('upload_date'),
-                        "smallest_thumbnail": min(result.get('thumbnails', []), key=lambda t: t.get("filesize", float("inf"))).get("url") if result.get('thumbnails', []) else result.get("thumbnail"),
-                    }]
-
-                return {"error": "No usable results returned"}
-
+                # The info dict is dropped as soon as its hits are built, so a slow
+                # enrichment never keeps the raw extraction alive
+                hits = self._ytdlp_hits(result, mode, offset or 0, total_to_fetch)
+                del result
+                if hits is None:
+                    return {"error": "No usable results returned"}
+                if mode == "flat":
+                    # Flat results: only the requested window is ever resolved further
+                    return await self._enrich_entries(serialize_hits(hits), fields)
+                return serialize_hits(hits)
+
+            except CircuitOpen as e:
+                logger.warning("yt-dlp circuit open, not searching query=%s", query)
+                return {"error": f"An error occurred while searching for {search_term}: {str(e)}"}
+            except DeadlineExceeded:
+                logger.warning("yt-dlp search ran out of time for query=%s", query)
+                return {"error": DEADLINE_ERROR}
             except Exception as e:
                 logger.exception("yt-dlp error on attempt %d for query=%s", attempt, query)
-                if attempt == self.retries - 1:  # Last attempt
+                if attempt == self.retries - 1 or breaker.is_open:  # Last attempt, or no point retrying
                     return {"error": f"An error occurred while searching for {search_term}: {str(e)}"}
             
                 # Exponential backoff with some random jitter
                 wait_time = min(2 ** attempt + random.uniform(0, 1), 10)  # Max delay of 10 seconds
+                if not deadline_allows(wait_time + MIN_YTDLP_ATTEMPT_SECONDS):
+                    mark_partial('yt-dlp retries')
+                    return {"error": f"An error occurred while searching for {search_term}: {str(e)}"}
                 await asyncio.sleep(wait_time)
 
 
-    async def _wrapped_search(self, term: str, max_results_per_term: int) -> dict:
+    def _ytdlp_hits(self, result, mode: str, start: int, end: int) -> list[SearchHit] | None:
+        """
+        SearchHits for entries `start` to `end` of a yt-dlp search (flat or full),
+        or for the single video it resolved to. None when there's nothing usable.
+        """
+        if not isinstance(result, dict):
+            return None
+
+        # Flat results list every result; the window is cut after filtering
+        if mode == "flat" and result.get("_type") == "playlist":
+            return [
+                SearchHit.from_flat(e)
+                for e in result.get("entries", [])
+                if e and e.get("title") and (e.get("webpage_url") or e.get("url"))
+            ][start:end]
+
+        # If it returns a playlist-like result
+        if result.get("_type") == "playlist":
+            return [
+                SearchHit.from_ytdlp(e)
+                for e in (result.get("entries") or [])[start:end]
+                if e and e.get("title") and e.get("webpage_url")
+            ]
+
+        # Single video fallback
+        if result.get("title") and result.get("webpage_url"):
+            return [SearchHit.from_ytdlp(result)]
+        return None
+
+
+    async def _enrich_entries(self, entries: list[dict], fields) -> list[dict]:
+        """
+        Fill in requested fields missing from flat results.
+
+        Only entries lacking one of `fields` are resolved, concurrently, through the
+        (cached, coalesced) single-video path; the rest are returned as they are.
+        """
+        wanted = [f for f in fields or () if f in SEARCH_FIELDS]
+        if not wanted:
+            return entries
+
+        async def enrich(entry):
+            if all(entry.get(f) is not None for f in wanted):
+                return
+            full = await self.regular_search({'type': 'youtube', 'query': entry['webpage_url']})
+            if isinstance(full, list) and full:
+                for f in wanted:
+                    if entry.get(f) is None:
+                        entry[f] = full[0].get(f)
+
+        await asyncio.gather(*(enrich(entry) for entry in entries))
+        return entries
+
+
+    async def _wrapped_search(self, term: str, max_results_per_term: int, duration_batcher=None, fields=None) -> dict:
         """
         Perform the search and return the result with the term.
 
         Args:
             term (str): The search term.
             max_results_per_term (int): Max results to return.
+            duration_batcher (DurationBatcher, optional): Shared duration lookups for a bulk call.
+            fields (tuple, optional): Result fields to return (see select_fields).
 
         Returns:
             dict: The result containing the term, results, and error info if any.
         """
+        if duration_batcher is not None:
+            duration_batcher.join()
         try:
 
-            data = await self.regular_search_with_yt_api(term, max_results=max_results_per_term, bulk=True)  
+            data = await self.regular_search_with_yt_api(term, max_results=max_results_per_term, bulk=True, duration_batcher=duration_batcher, fields=fields)
             return {   
                 'search_term': term,
                 'results': data,
@@ -190,15 +520,44 @@ class SearchEngine:
                 'error': str(e),
                 'count': 0
             }
+        finally:
+            if duration_batcher is not None:
+                duration_batcher.leave()
+
+
+    async def _wrapped_link(self, term: dict, videos: asyncio.Task, max_results_per_term: int, duration_batcher=None, fields=None) -> dict:
+        """
+        Bulk result for a single-video link. Waits for the call's shared
+        resolve_videos batch, which leaves the video in the result cache, then
+        searches the link like any other term (the link fast path finds it there,
+        or falls back to yt-dlp if the batch failed).
+
+        Args:
+            term (dict): The classified link.
+            videos (asyncio.Task): The shared resolve_videos task.
+        """
+        try:
+            # Shielded: the batch is shared with the call's other links
+            await asyncio.shield(videos)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Batched link resolution failed for %s", term['query'])
+        return await self._wrapped_search(term, max_results_per_term, duration_batcher=duration_batcher, fields=fields)
 
 
-    async def bulk_search(self, search_terms: list[str], max_results_per_term: int = 10) -> list[dict]:
+    async def bulk_search(self, search_terms: list[str], max_results_per_term: int = 10, deadline=None, fields=None) -> list[dict]:
         """
         Perform concurrent searches for multiple terms.
 
         Args:
             search_terms (list[str]): List of query strings.
             max_results_per_term (int): Max results per term.
+            deadline (Deadline, optional): Time budget (defaults to the current one).
+                                           Terms still running when it passes are
+                                           cancelled and reported with an error.
+            fields (iterable, optional): Result fields to return; lookups for the
+                                         others are skipped (default: all).
 
         Returns:
             list[dict]: A list of dicts, each containing:
@@ -212,15 +571,134 @@ class SearchEngine:
         if not search_terms:
             return [{"error": "No search terms provided"}]
 
-        # Wrap each search term with its result in a task
-        async def sem_wrapped(term):
-            async with self._sem:
-                print(f"Starting search for {term}")
-                logging.debug(f"Starting search for {term}")
-                return await self._wrapped_search(term, max_results_per_term)
+        deadline = deadline or current_deadline()
+        with deadline_scope(deadline), priority_scope('bulk'):
+            tasks = self._bulk_tasks(search_terms, max_results_per_term, fields)
+        done, pending = await asyncio.wait(set(tasks), timeout=deadline.remaining() if deadline else None)
+        for task in pending:
+            task.cancel()
+        if pending:
+            deadline.mark_partial('bulk')
+
+        # Duplicates share a block; each position reports its own term
+        return [
+            {**(task.result() if task in done else self._timed_out_block()), 'search_term': term}
+            for term, task in zip(search_terms, tasks)
+        ]
+
+
+    async def bulk_search_stream(self, search_terms: list[str], max_results_per_term: int = 10, deadline=None, fields=None):
+        """
+        Like bulk_search, but yield each term's block as soon as it resolves.
+
+        Blocks arrive in completion order, so each one carries the term's `index`
+        in `search_terms`. Pending searches are cancelled if the consumer stops early,
+        or when `deadline` passes (their blocks then carry an error).
+
+        Yields:
+            dict: {'index', 'search_term', 'results', 'count', 'error' (optional)}
+        """
+        if not search_terms:
+            yield {"error": "No search terms provided"}
+            return
+
+        deadline = deadline or current_deadline()
+        with deadline_scope(deadline), priority_scope('bulk'):
+            tasks = self._bulk_tasks(search_terms, max_results_per_term, fields)
+
+        async def indexed(index, task):
+            return index, await task
+
+        pending = set(range(len(tasks)))
+        try:
+            try:
+                for next_done in asyncio.as_completed([indexed(i, t) for i, t in enumerate(tasks)], timeout=deadline.remaining() if deadline else None):
+                    index, block = await next_done
+                    pending.discard(index)
+                    yield {'index': index, **block, 'search_term': search_terms[index]}
+            except asyncio.TimeoutError:
+                deadline.mark_partial('bulk')
+                for index in sorted(pending):
+                    yield {'index': index, **self._timed_out_block(), 'search_term': search_terms[index]}
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+    def _timed_out_block(self) -> dict:
+        return {'error': DEADLINE_ERROR, 'count': 0, 'partial': True}
+
+
+    async def run_with_deadline(self, deadline, search, on_timeout):
+        """
+        Run the coroutine returned by `search()` under `deadline`: retries and
+        fallbacks that can't finish in time are skipped, and once the deadline
+        passes the search is cancelled and `on_timeout` returned instead.
+
+        Args:
+            deadline (Deadline or None): The request's time budget (None: unbounded).
+            search (callable): Zero-argument callable returning the search coroutine.
+            on_timeout: Returned if nothing came back in time.
+        """
+        with deadline_scope(deadline):
+            try:
+                return await within_deadline(search(), 'timeout')
+            except DeadlineExceeded:
+                logger.warning("Search ran out of time")
+                return on_timeout
+
 
-        tasks = [asyncio.create_task(sem_wrapped(term)) for term in (search_terms if len(search_terms) <= self.max_bulk_search else search_terms[:self.max_bulk_search])]
-        return await asyncio.gather(*tasks)
+    def _bulk_key(self, term: dict) -> tuple[tuple, str | None]:
+        """
+        Identity of a bulk term, and its video ID when it links to a single video.
+
+        Search terms are compared case-insensitively (like the result cache) and
+        video links by ID, so `youtu.be/x`, `watch?v=x&t=3` and `shorts/x` are one term.
+        """
+        if term.get('type') == 'youtube':
+            video_id = canonical_video_id(term['query'])
+            if video_id:
+                return ('video', video_id), video_id
+        if term.get('type') == 'search':
+            return ('search', term['query'].casefold()), None
+        return (term.get('type'), term.get('query')), None
+
+
+    def _bulk_tasks(self, search_terms: list[dict], max_results_per_term: int, fields=None) -> list[asyncio.Task]:
+        """
+        Start the searches of a bulk call (up to max_bulk_search terms) and return one
+        task per term, in order.
+
+        Identical terms share a task. Single-video links are resolved together by
+        one resolve_videos batch; every other term gets a _wrapped_search, all of
+        them sharing a duration batcher.
+        """
+        search_terms = search_terms if len(search_terms) <= self.max_bulk_search else search_terms[:self.max_bulk_search]
+        fields = select_fields(fields)
+        # Durations for every term's results are resolved together
+        duration_batcher = self.duration_resolver.batcher()
+
+        # Wrap each search term with its result in a task.
+        # Upstream calls inside are admitted by self.scheduler as bulk work, so terms are not gated here.
+        async def sem_wrapped(term):
+            print(f"Starting search for {term}")
+            logging.debug(f"Starting search for {term}")
+            return await self._wrapped_search(term, max_results_per_term, duration_batcher=duration_batcher, fields=fields)
+
+        keyed = [(term, *self._bulk_key(term)) for term in search_terms]
+        video_ids = list(dict.fromkeys(video_id for _, _, video_id in keyed if video_id))
+        videos = asyncio.create_task(self.resolve_videos(video_ids, traffic='bulk')) if video_ids else None
+
+        unique, tasks = {}, []
+        for term, key, video_id in keyed:
+            if key not in unique:
+                search = self._wrapped_link(term, videos, max_results_per_term, duration_batcher, fields) if video_id else sem_wrapped(term)
+                unique[key] = asyncio.create_task(search)
+            tasks.append(unique[key])
+
+        self.bulk_stats['terms'] += len(tasks)
+        self.bulk_stats['deduplicated'] += len(tasks) - len(unique)
+        return tasks
     
 
 
@@ -265,6 +743,105 @@ class SearchEngine:
 
 
      
+    def bookmark_search(self, search_term: dict, limit: int = None) -> list[dict]:
+        """
+        Bookmarked videos whose title or uploader contains the query, newest first.
+        For a YouTube link, the bookmark of that video (if any).
+
+        Args:
+            search_term (dict): A classified query.
+            limit (int, optional): Maximum number of results (default max_results).
+        """
+        if search_term['type'] == 'youtube':
+            video_id = youtube_video_id(search_term['query'])
+            if not video_id:
+                return []
+            matches = BookmarkedVideo.objects.filter(webpage_url__contains=video_id)
+        else:
+            query = search_term['query']
+            matches = BookmarkedVideo.objects.filter(Q(title__icontains=query) | Q(uploader__icontains=query))
+
+        return serialize_hits(
+            SearchHit(
+                title=b.title, duration=b.duration, uploader=b.uploader, thumbnail=b.thumbnail,
+                webpage_url=b.webpage_url, upload_date=b.upload_date,
+                largest_thumbnail=b.thumbnail, smallest_thumbnail=b.thumbnail,
+            )
+            for b in matches.order_by('-created_at')[:limit or self.max_results]
+        )
+
+
+    async def federated_search(self, search_term: dict, fields=None, include_lan: bool = False, deadline=None):
+        """
+        Search LAN songs, bookmarks and YouTube in parallel and yield each source's
+        results as soon as it answers, so local hits arrive long before YouTube's.
+
+        Every result is tagged with its `source`. A video already returned by an
+        earlier source (same `webpage_url`) is dropped from later ones.
+
+        Args:
+            search_term (dict): A classified query.
+            fields (iterable, optional): Fields of bookmark and YouTube results to return.
+            include_lan (bool): Search LAN songs too (only for callers with LAN access).
+            deadline (Deadline, optional): Time budget of the YouTube search.
+
+        Yields:
+            dict: {'source', 'results', 'count', 'deduplicated', 'elapsed_ms'}, or
+                  {'source', 'error', 'count'} for a source that failed.
+        """
+        started = time.monotonic()
+        fields = select_fields(fields)
+        searches = {
+            'bookmark': lambda: sync_to_async(self.bookmark_search)(search_term),
+            'youtube': lambda: self.run_with_deadline(
+                deadline, lambda: self.regular_search_with_yt_api(search_term, fields=fields), {"error": DEADLINE_ERROR}
+            ),
+        }
+        if include_lan and search_term['type'] == 'search':
+            searches['lan'] = lambda: sync_to_async(self.lan_search)(search_term['query'])
+
+        tasks = {asyncio.create_task(search()): source for source, search in searches.items()}
+        seen = set()
+        try:
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # Several sources finishing together are still reported local first
+                for task in sorted(done, key=lambda t: FEDERATED_SOURCES.index(tasks[t])):
+                    source = tasks[task]
+                    try:
+                        results = task.result()
+                    except Exception as e:
+                        logger.exception("Federated %s search failed for query=%s", source, search_term['query'])
+                        results = {"error": str(e)}
+                    if isinstance(results, dict):
+                        yield {'source': source, 'error': results.get('error'), 'count': 0}
+                        continue
+                    if isinstance(results, str):  # An invalid query's reason
+                        yield {'source': source, 'error': results, 'count': 0}
+                        continue
+
+                    unique = []
+                    for result in results or []:
+                        url = result.get('webpage_url')
+                        if url and url in seen:
+                            continue
+                        seen.add(url)
+                        unique.append({**result, 'source': source})
+                    if source == 'bookmark':
+                        unique = project_results(unique, fields and fields + ('source',))
+                    yield {
+                        'source': source,
+                        'results': unique,
+                        'count': len(unique),
+                        'deduplicated': len(results or []) - len(unique),
+                        'elapsed_ms': round((time.monotonic() - started) * 1000),
+                    }
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
     def _parse_duration(self, duration_str):
         # The YouTube API returns the duration in ISO 8601 format, e.g., PT2M30S
         pattern = r'PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?'
@@ -278,134 +855,548 @@ class SearchEngine:
         return hours * 3600 + minutes * 60 + seconds
 
     
-    async def regular_search_with_yt_api(self, search_term, api_key=None, max_results=50, page_token=None, bulk=False):
+    async def regular_search_with_yt_api(self, search_term, api_key=None, max_results=50, page_token=None, bulk=False, duration_batcher=None, ytdlp_mode="full", fields=None):
+        """
+        Search through the YouTube Data API, falling back to yt-dlp.
+
+        `fields` limits each result to the named fields (see select_fields); the
+        duration lookups and thumbnail scans of fields left out are skipped.
+        """
         logger.info("YT-API search for term=%s (bulk=%s)", search_term, bulk)   
 
-        query = search_term
         if search_term['type'] == 'invalid':
             return search_term['reason']
-        elif search_term['type'] == 'youtube':
-            return await self.regular_search(search_term)
-        elif search_term['type'] == 'search':
-            search_term = search_term['query']
+        fields = select_fields(fields)
+        if search_term['type'] == 'youtube':
+            return project_results(await self._link_search(search_term, api_key, bulk, ytdlp_mode, fields), fields)
+
+        # Full results keep their existing keys (and stored entries)
+        sparse = {'fields': fields} if fields is not None else {}
+        key = self.cache.make_key('api', search_term, max_results=max_results, page_token=page_token, mode=ytdlp_mode, **sparse)
+        # Bulk calls raise instead of falling back to yt-dlp, so they only coalesce with each other
+        flight_key = f"{key}:bulk" if bulk else key
+        # Sparse results are not persisted: the store keeps whole videos
+        return await self._cached_call(key, lambda: self._api_search(search_term, api_key, max_results, page_token, bulk, duration_batcher, ytdlp_mode, fields), flight_key=flight_key, query=search_term['query'] if fields is None else None)
+
+
+    async def _link_search(self, search_term, api_key=None, bulk=False, ytdlp_mode="full", fields=None):
+        """
+        Metadata for a YouTube link. Single-video links are answered by one videos.list
+        call (1 quota unit, no extraction); yt-dlp is only used when the API can't be
+        asked (no key, quota spent, API down) and for playlist links.
+        """
+        video_id = canonical_video_id(search_term['query'])
+        if video_id and (api_key or len(self.key_pool)):
+            async def lookup():
+                videos = await self.resolve_videos([video_id], traffic='bulk' if bulk else 'interactive', api_key=api_key)
+                if video_id not in videos:
+                    return {"error": "Video lookup failed"}  # Not cached: the next caller asks again
+                return [videos[video_id]] if videos[video_id] else []
+
+            # Keyed by the canonical ID (as resolve_videos caches it), so concurrent pastes
+            # of the same video in any URL form share one videos.list call
+            result = await self._cached_call(self.cache.make_key('videos', {'type': 'youtube', 'query': video_id}), lookup)
+            if isinstance(result, list):
+                if not result:
+                    self.link_stats['not_found'] += 1
+                    return {"error": f"Video {video_id} is private, deleted or doesn't exist."}
+                self.link_stats['resolved'] += 1
+                return result
+            self.link_stats['fallbacks'] += 1
+            logger.info("Falling back to yt-dlp for link=%s", search_term['query'])
+
+        return await self.regular_search(search_term, mode=ytdlp_mode, fields=fields)
+
+
+    async def search_page(self, search_term=None, page_size: int = None, cursor: str = None, ytdlp_mode: str = "full", fields=None) -> dict:
+        """
+        Cursor-paginated search.
+
+        The first page is requested with a classified `search_term` (and optional
+        `page_size`); later pages with the `next_cursor` of the previous page only.
+        Data API pages follow the API's nextPageToken; yt-dlp pages are sliced from
+        cached windows of several pages, so reading page N never re-fetches pages 1..N-1.
+        The page after the one returned is prefetched in the background. `fields`
+        limits the returned results, and is not carried by the cursor.
+
+        Returns:
+            dict: {'results': [...], 'next_cursor': str or None}, or an error.
+
+        Raises:
+            InvalidCursor: If `cursor` is tampered with or expired.
+        """
+        if cursor:
+            state = decode_cursor(cursor)
+            if state['t'] == 'playlist':
+                raise InvalidCursor("This cursor belongs to a playlist expansion.")
+        else:
+            if search_term['type'] == 'invalid':
+                return search_term['reason']
+            page_size = min(max(int(page_size or self.max_results), 1), MAX_PAGE_SIZE)
+            use_api = len(self.key_pool) and not self.breakers['youtube_api'].is_open
+            state = {
+                'q': search_term['query'], 't': search_term['type'], 'm': ytdlp_mode, 's': page_size,
+                'src': 'api' if use_api and search_term['type'] == 'search' else 'ytdlp', 'off': 0, 'tok': None,
+            }
+
+        page = await self._fetch_page(state)
+        if not (isinstance(page, dict) and 'results' in page):
+            return page
+
+        next_state = page.pop('next_state')
+        fields = select_fields(fields)
+        if state.get('m') == 'flat' and fields:
+            # Flat windows are cached as listed: fill in the requested fields for this page only
+            page['results'] = await self._enrich_entries([dict(r) for r in page['results']], fields)
+        page['results'] = project_results(page['results'], fields)
+        page['next_cursor'] = encode_cursor(next_state) if next_state else None
+        if next_state and self.prefetch_pages:
+            self.background.spawn(page['next_cursor'], lambda: run_as('background', lambda: self._fetch_page(next_state)))
+        return page
+
+
+    async def _fetch_page(self, state: dict) -> dict:
+        """
+        Resolve the page described by a cursor state, plus the state of the page after it.
+        """
+        classified = {'type': state['t'], 'query': state['q']}
+        page_size, offset, mode = state['s'], state['off'], state.get('m', 'full')
+
+        if state['src'] == 'api':
+            key = self.cache.make_key('api_page', classified, page_size=page_size, page_token=state.get('tok'))
+            try:
+                page = await self._cached_call(key, lambda: self._api_page(classified, max_results=page_size, page_token=state.get('tok')))
+            except Exception as e:
+                logger.warning("API page failed for term=%s, continuing on yt-dlp at offset %d: %s", state['q'], offset, e)
+            else:
+                results = page['results']
+                token = page.get('next_page_token')
+                next_state = {**state, 'off': offset + len(results), 'tok': token} if token and results else None
+                return {'results': results, 'next_state': next_state}
+
+        # yt-dlp: slice the page out of cached windows of YTDLP_WINDOW_PAGES pages
+        results = []
+        position = offset
+        window_full = True
+        while len(results) < page_size and window_full:
+            window_start, window_size = window_bounds(position, page_size)
+            window = await self.regular_search(classified, max_results=window_size, offset=window_start, mode=mode)
+            if not isinstance(window, list):
+                if results:
+                    break
+                return window
+            taken = window[position - window_start:position - window_start + page_size - len(results)]
+            results.extend(taken)
+            position += len(taken)
+            window_full = len(window) == window_size and classified['type'] == 'search'
+            if not taken:
+                break
+
+        has_more = window_full or position < window_start + len(window)
+        next_state = {**state, 'src': 'ytdlp', 'off': position, 'tok': None} if results and has_more else None
+        return {'results': results, 'next_state': next_state}
+
+
+    async def playlist_pages(self, playlist_id: str = None, cursor: str = None, fields=None):
+        """
+        Expand a YouTube playlist page by page, without holding it all at once.
+
+        Pages come from playlistItems.list (50 items, 1 quota unit each) when an API
+        key is available, otherwise from flat yt-dlp extractions of 100-entry
+        windows. If the API fails midway, expansion continues on yt-dlp from the
+        same position. Private and deleted entries are skipped.
+
+        Args:
+            playlist_id (str, optional): Playlist to start expanding.
+            cursor (str, optional): The `next_cursor` of a previous page, to resume.
+            fields (iterable, optional): Result fields to return (see select_fields).
+
+        Yields:
+            dict: {'results': [...], 'next_cursor': str or None}; each result carries
+                  its `index` in the playlist.
+
+        Raises:
+            InvalidCursor: If `cursor` is tampered with, expired, or not a playlist's.
+        """
+        if cursor:
+            state = decode_cursor(cursor)
+            if state['t'] != 'playlist':
+                raise InvalidCursor("This cursor doesn't belong to a playlist expansion.")
+        else:
+            use_api = len(self.key_pool) and not self.breakers['youtube_api'].is_open
+            state = {
+                'q': playlist_id, 't': 'playlist', 's': PLAYLIST_API_PAGE_SIZE if use_api else PLAYLIST_YTDLP_WINDOW,
+                'src': 'api' if use_api else 'ytdlp', 'off': 0, 'tok': None,
+            }
 
-        api_key = api_key or self.NORMAL_API_KEY
+        fields = select_fields(fields)
+        while state is not None:
+            page = await self._fetch_playlist_page(state, fields)
+            if not (isinstance(page, dict) and 'results' in page):
+                yield page
+                return
+            state = page['next_state']
+            yield {'results': page['results'], 'next_cursor': encode_cursor(state) if state else None}
 
-        if not api_key:
+
+    async def _fetch_playlist_page(self, state: dict, fields=None) -> dict:
+        """
+        One page of a playlist expansion, plus the state of the page after it.
+        """
+        playlist_id, offset = state['q'], state['off']
+
+        if state['src'] == 'api':
+            try:
+                items, token = await self._playlist_api_page(playlist_id, state.get('tok'), fields)
+            except Exception as e:
+                logger.warning("playlistItems.list failed for playlist=%s, continuing on yt-dlp at offset %d: %s", playlist_id, offset, e)
+            else:
+                results = [{'index': offset + i, **item} for i, item in enumerate(items) if item is not None]
+                next_state = {**state, 'off': offset + len(items), 'tok': token} if token and items else None
+                return {'results': results, 'next_state': next_state}
+
+        opts = {**self.flat_config, 'noplaylist': False, 'playlist_items': f"{offset + 1}:{offset + PLAYLIST_YTDLP_WINDOW}"}
+        breaker = self.breakers['yt_dlp']
+        try:
+            breaker.allow()
+            started = time.monotonic()
+            try:
+                async with self.scheduler:
+                    started = time.monotonic()
+                    info = await self.extractor_pool.aextract(playlist_url(playlist_id), opts, keys=YTDLP_INFO_KEYS)
+            except ExtractorPoolBusy:
+                breaker.record_neutral()
+                self.scheduler.record_failure('yt_dlp_playlist', 'busy')
+                raise
+            except asyncio.CancelledError:
+                breaker.record_neutral()
+                raise
+            except Exception:
+                breaker.record_failure(time.monotonic() - started)
+                self.scheduler.record_failure('yt_dlp_playlist')
+                raise
+            elapsed = time.monotonic() - started
+            breaker.record_success(elapsed)
+            self.scheduler.record_success('yt_dlp_playlist', elapsed)
+        except Exception as e:
+            logger.warning("Flat playlist extraction failed for playlist=%s at offset %d: %s", playlist_id, offset, e)
+            return {"error": f"Could not expand playlist {playlist_id}: {str(e)}"}
+
+        entries = (info.get('entries') or []) if isinstance(info, dict) else []
+        results = [
+            {'index': offset + i, **SearchHit.from_flat(e).to_dict(fields)}
+            for i, e in enumerate(entries)
+            if e and e.get('title') not in UNAVAILABLE_TITLES and (e.get('webpage_url') or e.get('url'))
+        ]
+        next_state = {**state, 'src': 'ytdlp', 's': PLAYLIST_YTDLP_WINDOW, 'off': offset + len(entries), 'tok': None} if len(entries) == PLAYLIST_YTDLP_WINDOW else None
+        return {'results': results, 'next_state': next_state}
+
+
+    async def _playlist_api_page(self, playlist_id: str, page_token=None, fields=None) -> tuple[list, str | None]:
+        """
+        One playlistItems.list page: (cleaned items, None for unavailable ones; nextPageToken).
+        """
+        params = {'part': 'snippet,contentDetails', 'playlistId': playlist_id, 'maxResults': PLAYLIST_API_PAGE_SIZE, 'pageToken': page_token}
+        response, api_key = await self._search_request("https://www.googleapis.com/youtube/v3/playlistItems", params, f"playlist {playlist_id}", 'interactive', units=PLAYLIST_ITEMS_UNITS)
+        data = response.json()
+
+        items = data.get('items', [])
+        video_ids = [e.get('contentDetails', {}).get('videoId') for e in items]
+        available = [vid for vid, e in zip(video_ids, items) if vid and e.get('snippet', {}).get('videoOwnerChannelTitle')]
+        if fields is None or 'duration' in fields:
+            durations = await self._fetch_durations_parallel(available, api_key)
+        else:
+            durations = {}
+
+        cleaned = []
+        for video_id, e in zip(video_ids, items):
+            if video_id not in available:
+                cleaned.append(None)  # Private or deleted: keeps its position, but isn't returned
+                continue
+            snippet = e.get('snippet', {})
+            # The playlist item's channel is the playlist owner; the video's uploader is videoOwnerChannelTitle
+            item = {'snippet': {
+                **snippet,
+                'channelTitle': snippet.get('videoOwnerChannelTitle'),
+                'publishedAt': e.get('contentDetails', {}).get('videoPublishedAt') or snippet.get('publishedAt'),
+            }}
+            cleaned.append(self._clean_api_item(item, video_id, durations.get(video_id), fields))
+        return cleaned, data.get('nextPageToken')
+
+
+    async def _api_search(self, search_term, api_key=None, max_results=50, page_token=None, bulk=False, duration_batcher=None, ytdlp_mode="full", fields=None):
+        """
+        Uncached YouTube Data API search behind regular_search_with_yt_api,
+        falling back to yt-dlp when the API is unavailable. With hedging on, single
+        searches also start yt-dlp once the API call is slower than usual.
+        """
+        query = search_term
+        search_term = search_term['query']
+
+        if not api_key and not len(self.key_pool):
             raise ValueError("Youtube API key Not Provided, or is invalid.")
 
+        try:
+            if self.hedging and not bulk:
+                return await self.hedger.run(
+                    lambda: self._api_results(query, api_key, max_results, page_token, fields),
+                    lambda: self._ytdlp_fallback(query, ytdlp_mode, fields),
+                    is_valid=lambda results: isinstance(results, list) and bool(results),
+                    should_hedge=lambda: deadline_allows(MIN_YTDLP_ATTEMPT_SECONDS),
+                )
+            page = await self._api_page(query, api_key, max_results, page_token, bulk, duration_batcher, fields)
+        except Exception as e:
+            logger.exception("Failed parsing JSON for term=%s", search_term)
+            print(f"Youtube API failed after retries: {e}")
+            if isinstance(e, DeadlineExceeded):
+                raise
+            if bulk:
+                logger.warning("Bulk fallback: aborting bulk for term=%s", search_term) 
+                raise Exception("Bulk Search API is currently unavailable. Try again later.")
+            if not deadline_allows(MIN_YTDLP_ATTEMPT_SECONDS):
+                mark_partial('yt-dlp fallback')
+                return {"error": DEADLINE_ERROR}
+            logger.info("Falling back to yt-dlp for term=%s", search_term)
+            return await self._ytdlp_fallback(query, ytdlp_mode, fields)  # Fallback here
+
+        return page['results']
+
+
+    async def _ytdlp_fallback(self, search_term, ytdlp_mode="full", fields=None):
+        """
+        yt-dlp results for an API search, limited to `fields`.
+        """
+        # Flat results resolve whatever of `fields` the results page lacks
+        return project_results(await self.regular_search(search_term, mode=ytdlp_mode, fields=fields), fields)
+
+
+    async def _api_results(self, search_term, api_key=None, max_results=50, page_token=None, fields=None) -> list[dict]:
+        """
+        Results of one Data API page (the hedged primary call).
+        """
+        page = await self._api_page(search_term, api_key, max_results, page_token, fields=fields)
+        return page['results']
+
+
+    async def _api_page(self, search_term, api_key=None, max_results=50, page_token=None, bulk=False, duration_batcher=None, fields=None) -> dict:
+        """
+        Fetch one page of Data API results, without any fallback. Without
+        `duration` among `fields`, no videos.list call is made.
+
+        Returns:
+            dict: {'results': [...], 'next_page_token': str or None}
+        """
+        search_term = search_term['query']
+
         url = "https://www.googleapis.com/youtube/v3/search"
         params = {
             'part': 'snippet',
             'maxResults': max_results,
             'q': search_term,
-            'key': api_key,
             'type': 'video',
             'pageToken': page_token,
         }
 
+        response, api_key = await self._search_request(url, params, search_term, 'bulk' if bulk else 'interactive', api_key)
+        # raise Exception("Simulated Exception to test yt-dlp Fall back") # Fall back caller for testing.
+        data = response.json()
+        logger.debug("YT-API returned %d items for term=%s", len(data.get('items', [])), search_term)
 
-        try:
-            response = await self._retry_request(url, params, search_term, retries=self.retries)
-            # raise Exception("Simulated Exception to test yt-dlp Fall back") # Fall back caller for testing.
-            data = response.json()
-            logger.debug("YT-API returned %d items for term=%s", len(data.get('items', [])), search_term)
-        except Exception as e:
-            logger.exception("Failed parsing JSON for term=%s", search_term)
-            print(f"Youtube API failed after retries: {e}")
-            if bulk:
-                logger.warning("Bulk fallback: aborting bulk for term=%s", search_term) 
-                raise Exception("Bulk Search API is currently unavailable. Try again later.")
-            logger.info("Falling back to yt-dlp for term=%s", search_term)
-            return await self.regular_search(query)  # Fallback here
-
-        video_ids = [e.get('id', {}).get('videoId') for e in data.get('items', []) if e.get('id', {}).get('videoId')]
-
-        # Fetch all durations in parallel
-        durations = await self._fetch_durations_parallel(video_ids, api_key)
-
-        cleaned_entries = []
-
-        for e in data.get('items', []):
-            video_id = e.get('id', {}).get('videoId')
-            entry = {
-                "title": e.get("snippet", {}).get("title"),
-                "duration": durations.get(video_id),  # fast lookup
-                "uploader": e.get("snippet", {}).get("channelTitle"),
-                "thumbnail": e.get("snippet", {}).get("thumbnails", {}).get("high", {}).get("url"),
-                "webpage_url": f"https://www.youtube.com/watch?v={video_id}",
-                'upload_date': e.get("snippet", {}).get('publishedAt'),
-                'largest_thumbnail': max(
-                    e.get("snippet", {}).get('thumbnails', {}).values(),
-                    key=lambda t: t.get('height', 0) * t.get('width', 0)
-                ).get('url'),
-                'smallest_thumbnail': min(
-                    e.get("snippet", {}).get('thumbnails', {}).values(),
-                    key=lambda t: t.get('filesize', float('inf'))
-                ).get('url'),
-            }
-            cleaned_entries.append(entry)
+        # Hits are built, and the response body dropped, before waiting on durations
+        hits = [(e.get('id', {}).get('videoId'), SearchHit.from_api(e, e.get('id', {}).get('videoId'), fields=fields)) for e in data.get('items', [])]
+        next_page_token = data.get('nextPageToken')
+        del data, response
 
-        return cleaned_entries
+        # Fetch all durations in batched videos.list calls
+        if fields is None or 'duration' in fields:
+            video_ids = [video_id for video_id, _ in hits if video_id]
+            durations = await self._fetch_durations_parallel(video_ids, api_key, batcher=duration_batcher)
+            for video_id, hit in hits:
+                hit.duration = durations.get(video_id)
 
+        return {'results': serialize_hits((hit for _, hit in hits), fields), 'next_page_token': next_page_token}
 
 
+    def _clean_api_item(self, e: dict, video_id: str, duration, fields=None) -> dict:
+        """
+        Clean a search.list or videos.list item (anything with a `snippet`),
+        computing only `fields` (default: all of SEARCH_FIELDS).
+        """
+        return SearchHit.from_api(e, video_id, duration, fields).to_dict(fields)
 
-    async def _retry_request(self, url, params, search_term, retries=3):
-        for attempt in range(retries):
+
+    async def resolve_videos(self, video_ids: list[str], traffic: str = 'bulk', api_key=None) -> dict:
+        """
+        Look up single videos by ID with videos.list calls of up to 50 comma-separated
+        IDs (1 quota unit each, against 100 for a search). Results are cached per ID
+        (unknown IDs negatively) and durations remembered.
+
+        Returns:
+            dict: {video_id: cleaned result, or None when the API doesn't know the
+                  video (private, deleted)}. IDs that couldn't be looked up (no key,
+                  quota spent, API down) are left out.
+        """
+        keys = {vid: self.cache.make_key('videos', {'type': 'youtube', 'query': vid}) for vid in dict.fromkeys(video_ids)}
+        resolved = {}
+        for vid, key in keys.items():
+            cached = self.cache.get(key)
+            if isinstance(cached, list):
+                resolved[vid] = cached[0] if cached else None
+
+        missing = [vid for vid in keys if vid not in resolved]
+        if not missing or not (api_key or len(self.key_pool)):
+            return resolved
+
+        size = self.duration_resolver.BATCH_SIZE
+        chunks = [missing[i:i + size] for i in range(0, len(missing), size)]
+        batches = await asyncio.gather(*(self._videos_batch(chunk, traffic, api_key) for chunk in chunks), return_exceptions=True)
+        for chunk, batch in zip(chunks, batches):
+            if isinstance(batch, Exception):
+                logger.warning("videos.list batch of %d ids failed: %s", len(chunk), batch)
+                continue
+            for vid in chunk:
+                resolved[vid] = batch.get(vid)
+                self.cache.store(keys[vid], [resolved[vid]] if resolved[vid] else [])
+        return resolved
+
+
+    async def _videos_batch(self, video_ids: list[str], traffic: str, api_key=None) -> dict:
+        """
+        One videos.list call for up to 50 IDs: {video_id: cleaned result}.
+        """
+        self.link_stats['videos_list_calls'] += 1
+        params = {'part': 'snippet,contentDetails', 'id': ','.join(video_ids)}
+        response, _ = await self._search_request(self.duration_resolver.VIDEOS_URL, params, f"{len(video_ids)} video ids", traffic, api_key=api_key, units=VIDEOS_LIST_UNITS)
+
+        videos, durations = {}, {}
+        for item in response.json().get('items', []):
+            video_id = item.get('id')
             try:
-                if attempt > 0:
-                    print(f"Api Retry for '{search_term}': {attempt}/{self.retries}")
-                    logger.debug("Retry %d for term=%s", attempt, search_term) 
+                durations[video_id] = self._parse_duration(item.get('contentDetails', {}).get('duration'))
+            except Exception:
+                durations[video_id] = None
+            videos[video_id] = self._clean_api_item(item, video_id, durations[video_id])
 
+        self.duration_resolver.remember(durations)
+        return videos
 
-                # Simulate API failure for testing
-                # raise Exception("Simulated API failure for testing.")
 
-                response = await asyncio.to_thread(requests.get, url, params=params)
-            
-                # raise Exception("Simulated API failure for testing.")
-            
-                if response.status_code == 200:
-                    logger.debug("Request success for term=%s", search_term)  # 🔹 LOG HERE
-                    return response
-                else:
-                    logger.warning("Non-200 (%s) for term=%s: %s", response.status_code, search_term, response.text)  # 🔹 LOG HERE
 
-                    error_data = response.json()
-                    reason = error_data.get('error', {}).get('errors', [{}])[0].get('reason', '')
 
-                    if response.status_code == 403 and reason in ['quotaExceeded', 'userRateLimitExceeded']:
-                        raise Exception("Quota exceeded.")
-                    if response.status_code not in {500, 503}:
-                        raise Exception(f"Unrecoverable error: {response.status_code}")
+    async def _search_request(self, url, params, search_term, traffic, api_key=None, units=SEARCH_LIST_UNITS):
+        """
+        Run a Data API request (search.list unless `units` says otherwise) on `api_key`,
+        or on the pool's best key for `traffic`, moving on to the next key whenever
+        one runs out of quota.
+
+        Returns:
+            tuple: (response, the key that served it; durations are looked up with the same key)
+
+        Raises:
+            QuotaExceeded: If no key has quota left.
+        """
+        while True:
+            key = api_key or self.key_pool.acquire(traffic, units)
+            if key is None:
+                raise QuotaExceeded("noKeyAvailable")
+            try:
+                response = await self._retry_request(url, {**params, 'key': key}, search_term, retries=self.retries, quota_units=units)
+            except QuotaExceeded as e:
+                if api_key:
+                    raise
+                self.key_pool.mark_exhausted(key, e.reason)
+                continue
+            return response, key
+
+
+    async def _retry_request(self, url, params, search_term, retries=3, quota_units=0):
+        breaker = self.breakers['youtube_api']
+        for attempt in range(retries):
+            if not deadline_allows(MIN_API_ATTEMPT_SECONDS):
+                mark_partial('api')
+                raise DeadlineExceeded("No time left for another API attempt.")
+            if attempt > 0:
+                print(f"Api Retry for '{search_term}': {attempt}/{self.retries}")
+                logger.debug("Retry %d for term=%s", attempt, search_term) 
+
+            # Fails fast (CircuitOpen) while the API is known to be down
+            breaker.allow()
+
+            # Simulate API failure for testing
+            # raise Exception("Simulated API failure for testing.")
 
+            self.key_pool.charge(params.get('key'), quota_units)
+            started = time.monotonic()
+            try:
+                async with self.scheduler:
+                    started = time.monotonic()  # Time spent queued for a slot isn't the API's
+                    # The timeout ends the call itself, not just the wait for it
+                    response = await within_deadline(asyncio.to_thread(requests.get, url, params=params, timeout=call_timeout()), 'api')
+            except (DeadlineExceeded, asyncio.CancelledError):
+                breaker.record_neutral()
+                raise
+            except requests.Timeout as e:
+                if not deadline_allows(MIN_CALL_SECONDS):
+                    # Timed out because the request's budget ran out, not because the API is slow
+                    breaker.record_neutral()
+                    mark_partial('api')
+                    raise DeadlineExceeded("The API call ran out of time.") from e
+                breaker.record_failure(time.monotonic() - started)
+                self.scheduler.record_failure('youtube_api')
+                logger.warning("Request attempt %d timed out for term=%s", attempt + 1, search_term)
             except Exception as e:
+                breaker.record_failure(time.monotonic() - started)
+                self.scheduler.record_failure('youtube_api')
                 print(f"Request attempt {attempt+1} failed with error: {e}")
                 logger.exception(f"Request attempt {attempt+1} failed with error: {e}")
+            else:
+                elapsed = time.monotonic() - started
+                if response.status_code == 200:
+                    breaker.record_success(elapsed)
+                    self.scheduler.record_success('youtube_api', elapsed)
+                    logger.debug("Request success for term=%s", search_term)  # 🔹 LOG HERE
+                    return response
 
-            await asyncio.sleep(1)  # small delay before retry
+                logger.warning("Non-200 (%s) for term=%s: %s", response.status_code, search_term, response.text)  # 🔹 LOG HERE
+
+                reason = quota_reason(response)
+                if reason in RATE_LIMIT_REASONS or response.status_code == 429:
+                    self.scheduler.record_failure('youtube_api', 'throttled')
+                if reason:
+                    # Retrying the same key is pointless; the caller rotates keys
+                    breaker.record_neutral()
+                    raise QuotaExceeded(reason)
+                if response.status_code not in {500, 503}:
+                    breaker.record_neutral()
+                    raise Exception(f"Unrecoverable error: {response.status_code}")
+                breaker.record_failure(elapsed)
+                self.scheduler.record_failure('youtube_api')
+
+            if attempt < retries - 1 and not breaker.is_open:
+                if not deadline_allows(1 + MIN_API_ATTEMPT_SECONDS):
+                    mark_partial('api retries')
+                    raise DeadlineExceeded("No time left to retry the API.")
+                await asyncio.sleep(1)  # small delay before retry
 
         raise Exception(f"Failed after {retries} retries.")
 
 
 
-    async def _fetch_durations_parallel(self, video_ids, api_key):
-        async def fetch_duration(video_id):
-            url = f"https://www.googleapis.com/youtube/v3/videos?part=contentDetails&id={video_id}&key={api_key}"
-            try:
-                resp = await asyncio.to_thread(requests.get, url)
-                if resp.status_code == 200:
-                    duration_data = resp.json()
-                    raw_duration = duration_data['items'][0].get('contentDetails', {}).get('duration')
-                    return video_id, self._parse_duration(raw_duration)
-            except Exception:
-                pass
-            return video_id, None
+    async def _fetch_durations_parallel(self, video_ids, api_key, batcher=None):
+        """
+        Resolve durations for `video_ids` as {video_id: seconds or None}.
 
-        tasks = [fetch_duration(vid) for vid in video_ids]
-        results = await asyncio.gather(*tasks)
-        return dict(results)
+        Known IDs come from the durable duration cache; the rest are fetched with
+        comma-separated videos.list calls of up to 50 IDs. When a DurationBatcher is
+        given (bulk search), the lookups are pooled with the other terms of the call.
+        Durations still missing when the deadline passes are left out (None).
+        """
+        lookup = batcher.resolve(video_ids, api_key) if batcher is not None else self.duration_resolver.resolve(video_ids, api_key)
+        try:
+            return await within_deadline(lookup, 'durations')
+        except DeadlineExceeded:
+            logger.warning("Durations for %d videos ran out of time", len(video_ids))
+            return {}
 
 
 
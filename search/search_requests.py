@@ -0,0 +1,280 @@
+"""
+Request handling shared by the two entry points of the single and bulk search
+endpoints: the DRF views in search/views.py (WSGI, and the OpenAPI schema) and
+the async-native views in search/async_views.py (ASGI).
+
+Parameters are parsed and validated, searches run and responses built here, so
+both entry points answer alike. A view only picks how to wait for the search
+(`await` or async_to_sync) and which response class renders it.
+"""
+
+import logging
+
+from .search_engine import SearchEngine, SEARCH_FIELDS, YTDLP_MODES
+from .suggestions import suggestions
+from .search_utils.deadline import DEADLINE_ERROR, Deadline
+from .search_utils.http_cache import bulk_lifetime, conditional_response, result_lifetime
+from .search_utils.pagination import MAX_PAGE_SIZE, InvalidCursor
+from .search_utils.streaming import STREAM_FORMATS, bulk_frames
+from config import SEARCH_DEFAULT_TIMEOUT_MS, SEARCH_MAX_TIMEOUT_MS
+
+logger = logging.getLogger('seekbeat')
+
+
+engine = SearchEngine(persistent=True)
+suggestions.build_in_background()
+
+FIELDS_ERROR = f"fields must be a comma-separated list of: {', '.join(SEARCH_FIELDS)}."
+PAGE_SIZE_ERROR = f"page_size must be an integer between 1 and {MAX_PAGE_SIZE}."
+TIMEOUT_ERROR = f"timeout_ms must be an integer between 1 and {SEARCH_MAX_TIMEOUT_MS}."
+STREAM_ERROR = f"Unsupported stream format. Use one of: {', '.join(STREAM_FORMATS)}."
+
+
+
+class BadRequest(ValueError):
+    """
+    A request parameter the client got wrong; str() of it is the message to send back (400).
+    """
+
+
+
+def _bounded_int(raw: str, low: int, high: int, message: str) -> int:
+    try:
+        value = int(raw)
+    except (TypeError, ValueError):
+        raise BadRequest(message)
+    if not low <= value <= high:
+        raise BadRequest(message)
+    return value
+
+
+
+def parse_bulk_terms(raw: str) -> list[dict]:
+    """
+    Split a comma-separated `queries` value and classify each non-empty term.
+    """
+    return [engine.clean_and_classify_query(q.strip()) for q in raw.split(",") if q.strip()]
+
+
+
+def parse_page_size(raw: str | None) -> int | None:
+    """
+    Validate the `page_size` parameter.
+
+    Raises:
+        BadRequest: If it isn't an integer between 1 and MAX_PAGE_SIZE.
+    """
+    if raw in (None, ''):
+        return None
+    return _bounded_int(raw, 1, MAX_PAGE_SIZE, PAGE_SIZE_ERROR)
+
+
+
+def parse_deadline(raw: str | None) -> Deadline:
+    """
+    Start the request's deadline from the `timeout_ms` parameter (or the server default).
+
+    Raises:
+        BadRequest: If it isn't an integer between 1 and SEARCH_MAX_TIMEOUT_MS.
+    """
+    timeout_ms = SEARCH_DEFAULT_TIMEOUT_MS if raw in (None, '') else _bounded_int(raw, 1, SEARCH_MAX_TIMEOUT_MS, TIMEOUT_ERROR)
+    return Deadline(timeout_ms / 1000)
+
+
+
+def parse_fields(raw: str | None) -> list[str] | None:
+    """
+    Split the comma-separated `fields` parameter (None when absent: every field).
+
+    Raises:
+        BadRequest: If it names a field that results don't have.
+    """
+    if raw in (None, ''):
+        return None
+    fields = [f.strip() for f in raw.split(",") if f.strip()]
+    unknown = [f for f in fields if f not in SEARCH_FIELDS]
+    if unknown or not fields:
+        raise BadRequest(FIELDS_ERROR)
+    return fields
+
+
+
+def parse_stream(raw: str | None, default: str | None = None) -> str | None:
+    """
+    Validate a `stream` format parameter (`default` when absent).
+
+    Raises:
+        BadRequest: If it isn't one of STREAM_FORMATS.
+    """
+    stream = raw or default
+    if stream and stream not in STREAM_FORMATS:
+        raise BadRequest(STREAM_ERROR)
+    return stream
+
+
+
+def flag_partial(response, deadline: Deadline):
+    """
+    Mark responses whose search was cut short by the deadline with X-Search-Partial.
+    """
+    if deadline.partial:
+        response['X-Search-Partial'] = 'true'
+    return response
+
+
+
+def search_response(request, response_class, body, status: int, deadline: Deadline, lifetime: int | None):
+    """
+    Render a search outcome: errors as they are, results with the partial flag and HTTP caching headers.
+
+    Args:
+        request: The request (DRF or Django).
+        response_class: Builds the response from (data, status=...): DRF's Response, or a JsonResponse factory.
+        body: The response data.
+        status (int): Its HTTP status.
+        deadline (Deadline): The request's deadline.
+        lifetime (int | None): Seconds the result may be reused (see http_cache.result_lifetime).
+    """
+    if status != 200:
+        return response_class(body, status=status)
+    return conditional_response(request, flag_partial(response_class(body), deadline), body, lifetime)
+
+
+
+class SearchRequest:
+    """
+    A validated /api/search/ request: one search, or a page of one when
+    `page_size` or `cursor` is given.
+    """
+
+    __slots__ = ('query', 'cursor', 'mode', 'page_size', 'fields', 'deadline')
+
+    def __init__(self, params):
+        """
+        Args:
+            params: The query parameters (request.GET).
+
+        Raises:
+            BadRequest: If a parameter is missing or invalid.
+        """
+        self.query = params.get('query', None)
+        self.cursor = params.get('cursor')
+        if not self.query and not self.cursor:
+            logger.warning("No query parameter provided")
+            raise BadRequest("No query parameter provided.")
+
+        self.mode = params.get('mode', 'full')
+        if self.mode not in YTDLP_MODES:
+            raise BadRequest(f"Unsupported mode. Use one of: {', '.join(YTDLP_MODES)}.")
+
+        self.page_size = parse_page_size(params.get('page_size'))
+        self.fields = parse_fields(params.get('fields'))
+        self.deadline = parse_deadline(params.get('timeout_ms'))
+
+
+    async def run(self) -> tuple[object, int]:
+        """
+        Run the search within the request's deadline.
+
+        Returns:
+            tuple: (response data, HTTP status); failures come back as {"error": ...} data.
+        """
+        if self.cursor or self.page_size:
+            try:
+                classified = None if self.cursor else engine.clean_and_classify_query(self.query)
+                if classified:
+                    suggestions.record_query(classified)
+                page = await engine.run_with_deadline(
+                    self.deadline,
+                    lambda: engine.search_page(classified, page_size=self.page_size, cursor=self.cursor, ytdlp_mode=self.mode, fields=self.fields),
+                    {"results": [], "next_cursor": None},
+                )
+            except InvalidCursor as e:
+                return {"error": str(e)}, 400
+            except Exception as e:
+                logger.exception("Paged search failed for query=%s", self.query)
+                return {"error": f"Internal error: {str(e)}"}, 500
+            return page, 200
+
+        classified = engine.clean_and_classify_query(self.query)
+        logger.debug("Classified query: %s", classified)
+        suggestions.record_query(classified)
+
+        try:
+            result = await engine.run_with_deadline(
+                self.deadline,
+                lambda: engine.regular_search_with_yt_api(classified, ytdlp_mode=self.mode, fields=self.fields),
+                {"error": DEADLINE_ERROR},
+            )
+            logger.info("Search completed for query=%s, returned %s items", classified['query'], len(result) if isinstance(result, list) else 'error')
+        except Exception as e:
+            logger.exception("Search failed for query=%s", classified['query'])
+            return {"error": f"Internal error: {str(e)}"}, 500
+        return result, 200
+
+
+    def respond(self, request, response_class, body, status: int):
+        """
+        Build the response for run()'s outcome (see search_response).
+        """
+        lifetime = result_lifetime(body, engine.cache) if status == 200 else None
+        return search_response(request, response_class, body, status, self.deadline, lifetime)
+
+
+
+class BulkSearchRequest:
+    """
+    A validated /api/search/bulk/ request, answered whole or streamed (`stream`).
+    """
+
+    __slots__ = ('terms', 'fields', 'deadline', 'stream')
+
+    def __init__(self, params):
+        """
+        Args:
+            params: The query parameters (request.GET).
+
+        Raises:
+            BadRequest: If no term is given or a parameter is invalid.
+        """
+        self.terms = parse_bulk_terms(params.get("queries", ""))
+        logger.debug("Classified bulk terms: %s", self.terms)
+        if not self.terms:
+            logger.warning("Bulk search: no valid queries provided")
+            raise BadRequest("No valid queries provided.")
+
+        self.fields = parse_fields(params.get('fields'))
+        self.deadline = parse_deadline(params.get('timeout_ms'))
+        self.stream = parse_stream(params.get("stream"))
+
+
+    def frames(self):
+        """
+        The streamed response's frames, as an async generator (see streaming.bulk_frames).
+        """
+        logger.info("Streaming bulk search (%s) with %d terms", self.stream, len(self.terms))
+        return bulk_frames(engine.bulk_search_stream(search_terms=self.terms, deadline=self.deadline, fields=self.fields), self.stream)
+
+
+    async def run(self) -> tuple[object, int]:
+        """
+        Search every term within the request's deadline.
+
+        Returns:
+            tuple: (response data, HTTP status); a failure comes back as {"error": ...} data.
+        """
+        try:
+            results = await engine.bulk_search(search_terms=self.terms, deadline=self.deadline, fields=self.fields)
+            logger.info("Bulk search completed with %d terms", len(self.terms))
+        except Exception as e:
+            logger.exception("Bulk search failed")
+            return {"error": f"Internal error: {str(e)}"}, 500
+        return results, 200
+
+
+    def respond(self, request, response_class, body, status: int):
+        """
+        Build the response for run()'s outcome (see search_response).
+        """
+        lifetime = bulk_lifetime(body, engine.cache) if status == 200 else None
+        return search_response(request, response_class, body, status, self.deadline, lifetime)
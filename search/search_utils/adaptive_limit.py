@@ -0,0 +1,97 @@
+import threading
+import time
+
+
+class AdaptiveLimit:
+    """
+    AIMD concurrency limit for upstream calls.
+
+    The limit grows by one per `limit` successful calls (additive increase) while
+    it is actually being used, and is multiplied by `backoff` (multiplicative
+    decrease) when a call fails, is throttled, or is more than
+    `latency_tolerance` times slower than its upstream's usual latency. Decreases
+    are at most one per `cooldown` seconds, so a burst of failures from one
+    overloaded moment only counts once. The limit stays within [floor, ceiling].
+
+    Usual latency is tracked per upstream (an EWMA of every call, slow ones
+    included, so a lasting shift in latency becomes the new normal instead of
+    counting as slow forever), since a Data API request and a yt-dlp extraction
+    differ by an order of magnitude. Callers should name upstreams finely enough
+    that calls under one name are alike (e.g. per yt-dlp search window size).
+    """
+
+    def __init__(self, initial: int, floor: int, ceiling: int, backoff: float = 0.7,
+                 latency_tolerance: float = 2.0, smoothing: float = 0.1, cooldown: float = 1.0,
+                 clock=time.monotonic):
+        self.floor = max(1, floor)
+        self.ceiling = max(self.floor, ceiling)
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.smoothing = smoothing
+        self.cooldown = cooldown
+        self.clock = clock
+        self._limit = float(min(self.ceiling, max(self.floor, initial)))
+        self._last_decrease = None
+        self.baselines = {}  # Upstream -> usual latency (seconds)
+        self.increases = 0
+        self.decreases = {}  # Reason -> count
+        self._lock = threading.Lock()
+
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+
+    def record_success(self, upstream: str, seconds: float, in_flight: int) -> bool:
+        """
+        Record a successful call that took `seconds` while `in_flight` calls were running.
+
+        Returns:
+            bool: Whether the limit grew (waiters may now be admitted).
+        """
+        with self._lock:
+            baseline = self.baselines.get(upstream)
+            self.baselines[upstream] = seconds if baseline is None else baseline + self.smoothing * (seconds - baseline)
+            if baseline is not None and seconds > baseline * self.latency_tolerance:
+                self._decrease('slow')
+                return False
+
+            # Only a limit that is being used has earned a raise
+            if in_flight * 2 < self._limit or self._limit >= self.ceiling:
+                return False
+            before = self.limit
+            self._limit = min(self.ceiling, self._limit + 1 / self._limit)
+            if self.limit > before:
+                self.increases += 1
+                return True
+            return False
+
+
+    def record_failure(self, upstream: str, reason: str = 'error') -> None:
+        """
+        Record a failed (`error`), throttled (`throttled`) or rejected (`busy`) call.
+        """
+        with self._lock:
+            self._decrease(reason)
+
+
+    def _decrease(self, reason: str) -> None:
+        now = self.clock()
+        if self._last_decrease is not None and now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self._limit = max(float(self.floor), self._limit * self.backoff)
+        self.decreases[reason] = self.decreases.get(reason, 0) + 1
+
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'limit': self.limit,
+                'floor': self.floor,
+                'ceiling': self.ceiling,
+                'increases': self.increases,
+                'decreases': dict(self.decreases),
+                'usual_latency_ms': {name: round(seconds * 1000, 1) for name, seconds in self.baselines.items()},
+            }
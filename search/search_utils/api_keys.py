@@ -0,0 +1,250 @@
+import datetime
+import logging
+import threading
+import time
+
+from config import YOUTUBE_API_DAILY_QUOTA, YOUTUBE_API_INTERACTIVE_RESERVE
+
+logger = logging.getLogger('seekbeat')
+
+
+# Estimated quota cost of each YouTube Data API call we make
+SEARCH_LIST_UNITS = 100
+VIDEOS_LIST_UNITS = 1
+PLAYLIST_ITEMS_UNITS = 1
+
+TRAFFIC_CLASSES = ('interactive', 'bulk')
+
+# 403 reasons that take a key out of rotation until the daily reset...
+DAILY_QUOTA_REASONS = {'quotaExceeded', 'dailyLimitExceeded'}
+# ...and the ones that only need a short cool-down
+RATE_LIMIT_REASONS = {'userRateLimitExceeded', 'rateLimitExceeded'}
+RATE_LIMIT_COOLDOWN = 60
+
+try:
+    from zoneinfo import ZoneInfo
+    QUOTA_TZ = ZoneInfo("America/Los_Angeles")
+except Exception:  # No tz database (e.g. Windows without tzdata): use PST
+    QUOTA_TZ = datetime.timezone(datetime.timedelta(hours=-8))
+
+
+
+class QuotaExceeded(Exception):
+    """
+    Raised when a YouTube API key (or every key in the pool) is out of quota.
+    """
+
+    def __init__(self, reason: str = 'quotaExceeded'):
+        super().__init__(f"Quota exceeded ({reason}).")
+        self.reason = reason
+
+
+
+def quota_reason(response) -> str | None:
+    """
+    Return the quota/rate-limit reason of a 403 API response, or None.
+    """
+    if response.status_code != 403:
+        return None
+    try:
+        reason = response.json().get('error', {}).get('errors', [{}])[0].get('reason', '')
+    except Exception:
+        return None
+    return reason if reason in DAILY_QUOTA_REASONS | RATE_LIMIT_REASONS else None
+
+
+
+class ApiKey:
+    """
+    Estimated quota usage of a single API key for the current quota day.
+    """
+
+    __slots__ = ('key', 'traffic', 'used', 'day', 'blocked_until', 'last_reason')
+
+    def __init__(self, key: str, traffic: str):
+        self.key = key
+        self.traffic = traffic
+        self.used = 0
+        self.day = None
+        self.blocked_until = 0.0
+        self.last_reason = None
+
+
+    @property
+    def label(self) -> str:
+        return f"…{self.key[-4:]}"
+
+
+
+class ApiKeyPool:
+    """
+    Quota-aware pool of YouTube Data API keys.
+
+    Keys are grouped by traffic class ('interactive' for single searches, 'bulk' for
+    bulk searches). Every call is charged its estimated units (search.list = 100,
+    videos.list = 1) against a per-key daily budget that resets at midnight Pacific
+    time, like the real quota. A key that answers quotaExceeded is skipped until the
+    reset; one that answers userRateLimitExceeded cools down for a minute.
+
+    acquire() picks the key with the most quota left in the caller's class and, when
+    that class is out, borrows from the other one, so search stays on the API as long
+    as any key has quota. Bulk traffic never spends the last `interactive_reserve`
+    units of an interactive key. Usage is an in-process estimate.
+    """
+
+    def __init__(self, keys: dict, daily_quota: int = YOUTUBE_API_DAILY_QUOTA,
+                 interactive_reserve: int = YOUTUBE_API_INTERACTIVE_RESERVE, now=None, clock=time.monotonic):
+        """
+        Args:
+            keys (dict): {'interactive': [key, ...], 'bulk': [key, ...]}.
+            daily_quota (int): Units available to each key per quota day.
+            interactive_reserve (int): Units of each interactive key kept back from bulk traffic.
+            now (callable, optional): Returns the current aware datetime (for tests).
+            clock (callable): Monotonic clock used for rate-limit cool-downs.
+        """
+        self.daily_quota = daily_quota
+        self.interactive_reserve = interactive_reserve
+        self._now = now or (lambda: datetime.datetime.now(QUOTA_TZ))
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.rotations = 0
+        self._keys = {}
+        for traffic in TRAFFIC_CLASSES:
+            for key in keys.get(traffic, ()):
+                if key and key not in self._keys:
+                    self._keys[key] = ApiKey(key, traffic)
+
+
+    @classmethod
+    def from_env_values(cls, interactive: str | None, bulk: str | None, **kwargs) -> "ApiKeyPool":
+        """
+        Build a pool from the (comma-separated) NORMAL/BULK API key settings.
+        """
+        split = lambda value: [k.strip() for k in (value or "").split(",") if k.strip()]
+        return cls({'interactive': split(interactive), 'bulk': split(bulk)}, **kwargs)
+
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+    def _today(self) -> datetime.date:
+        return self._now().astimezone(QUOTA_TZ).date()
+
+
+    def _refresh(self, api_key: ApiKey, today: datetime.date) -> None:
+        if api_key.day != today:
+            api_key.day = today
+            api_key.used = 0
+            api_key.last_reason = None
+            api_key.blocked_until = 0.0
+
+
+    def _remaining(self, api_key: ApiKey) -> int:
+        if api_key.blocked_until == float('inf') or api_key.blocked_until > self._clock():
+            return 0
+        return max(0, self.daily_quota - api_key.used)
+
+
+    def acquire(self, traffic: str, units: int) -> str | None:
+        """
+        Return the key with the most quota left for `traffic`, or None if no key can
+        afford `units`. Does not charge; call charge() once the request is sent.
+        """
+        today = self._today()
+        with self._lock:
+            own, borrowed = [], []
+            for api_key in self._keys.values():
+                self._refresh(api_key, today)
+                remaining = self._remaining(api_key)
+                if api_key.traffic == traffic:
+                    if remaining >= units:
+                        own.append((remaining, api_key))
+                else:
+                    floor = self.interactive_reserve if api_key.traffic == 'interactive' else 0
+                    if remaining - floor >= units:
+                        borrowed.append((remaining, api_key))
+
+            candidates = own or borrowed
+            if not candidates:
+                return None
+            return max(candidates, key=lambda c: c[0])[1].key
+
+
+    def charge(self, key: str, units: int) -> None:
+        """
+        Record `units` spent on `key`. Keys outside the pool are ignored.
+        """
+        today = self._today()
+        with self._lock:
+            api_key = self._keys.get(key)
+            if api_key is not None:
+                self._refresh(api_key, today)
+                api_key.used += units
+
+
+    def mark_exhausted(self, key: str, reason: str = 'quotaExceeded') -> None:
+        """
+        Take `key` out of rotation until the daily reset (or a short cool-down for rate limits).
+        """
+        today = self._today()
+        with self._lock:
+            api_key = self._keys.get(key)
+            if api_key is None:
+                return
+            self._refresh(api_key, today)
+            api_key.last_reason = reason
+            if reason in RATE_LIMIT_REASONS:
+                api_key.blocked_until = self._clock() + RATE_LIMIT_COOLDOWN
+            else:
+                api_key.blocked_until = float('inf')
+            self.rotations += 1
+        logger.warning("API key %s rotated out (%s)", api_key.label, reason)
+
+
+    def replacement(self, key: str, units: int) -> str | None:
+        """
+        Mark-and-swap helper: a key from the same traffic class as `key` (after it ran out).
+        """
+        api_key = self._keys.get(key)
+        if api_key is None:
+            return None
+        return self.acquire(api_key.traffic, units)
+
+
+    def resets_at(self) -> datetime.datetime:
+        """
+        Next quota reset (midnight Pacific).
+        """
+        now = self._now().astimezone(QUOTA_TZ)
+        tomorrow = now.date() + datetime.timedelta(days=1)
+        return datetime.datetime.combine(tomorrow, datetime.time(), tzinfo=QUOTA_TZ)
+
+
+    def stats(self) -> dict:
+        """
+        Remaining-quota gauges per key and per traffic class.
+        """
+        today = self._today()
+        with self._lock:
+            keys = []
+            for api_key in self._keys.values():
+                self._refresh(api_key, today)
+                keys.append({
+                    'key': api_key.label,
+                    'traffic': api_key.traffic,
+                    'used': api_key.used,
+                    'remaining': self._remaining(api_key),
+                    'exhausted': self._remaining(api_key) == 0,
+                    'last_reason': api_key.last_reason,
+                })
+        return {
+            'daily_quota': self.daily_quota,
+            'resets_at': self.resets_at().isoformat(),
+            'rotations': self.rotations,
+            'remaining': {
+                traffic: sum(k['remaining'] for k in keys if k['traffic'] == traffic)
+                for traffic in TRAFFIC_CLASSES
+            },
+            'keys': keys,
+        }
@@ -0,0 +1,80 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import logging
+import threading
+
+logger = logging.getLogger('seekbeat')
+
+
+
+class BackgroundLoop:
+    """
+    An event loop on a daemon thread for fire-and-forget work (e.g. prefetching).
+
+    Request loops can't host such work: under WSGI each request runs on a short-lived
+    loop from async_to_sync that is closed, with its pending tasks, once the response
+    is built. Work scheduled here outlives the request, and runs in a fresh context
+    (it doesn't inherit the request's deadline). Jobs submitted under a key that is
+    already running are dropped.
+    """
+
+    def __init__(self, name: str = 'seekbeat-background'):
+        self.name = name
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._running = {}
+        self.submitted = 0
+        self.deduplicated = 0
+        self.failed = 0
+
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name=self.name, daemon=True)
+                self._thread.start()
+            return self._loop
+
+
+    def spawn(self, key: str, factory) -> concurrent.futures.Future | None:
+        """
+        Run the coroutine returned by `factory()` on the background loop.
+
+        Args:
+            key (str): Jobs with the same key are not run twice concurrently.
+            factory (callable): Zero-argument callable returning the coroutine.
+
+        Returns:
+            concurrent.futures.Future or None: None if the key was already running.
+        """
+        loop = self._ensure_loop()
+        with self._lock:
+            if key in self._running:
+                self.deduplicated += 1
+                return None
+            future = contextvars.Context().run(asyncio.run_coroutine_threadsafe, factory(), loop)
+            self._running[key] = future
+            self.submitted += 1
+        future.add_done_callback(lambda done: self._done(key, done))
+        return future
+
+
+    def _done(self, key: str, future: concurrent.futures.Future) -> None:
+        with self._lock:
+            self._running.pop(key, None)
+        if not future.cancelled() and future.exception() is not None:
+            self.failed += 1
+            logger.warning("Background job %s failed: %s", key, future.exception())
+
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'running': len(self._running),
+                'submitted': self.submitted,
+                'deduplicated': self.deduplicated,
+                'failed': self.failed,
+            }
@@ -0,0 +1,426 @@
+import asyncio
+import logging
+import threading
+import time
+import uuid
+
+from .concurrency import LoopBoundSemaphore
+from .deadline import Deadline
+from config import (
+    SEARCH_JOB_CONCURRENCY, SEARCH_JOB_MAX_ACTIVE, SEARCH_JOB_MAX_RUNNING,
+    SEARCH_JOB_MAX_TERMS, SEARCH_JOB_RETENTION_SECONDS, SEARCH_MAX_TIMEOUT_MS,
+)
+
+logger = logging.getLogger('seekbeat')
+
+
+FINISHED_STATES = ('done', 'failed', 'cancelled')
+
+
+
+class JobNotFound(KeyError):
+    """
+    Raised for job IDs that are unknown or have expired.
+    """
+
+
+
+class TooManyJobs(Exception):
+    """
+    Raised when SEARCH_JOB_MAX_ACTIVE jobs are already queued or running.
+    """
+
+
+
+class BulkJob:
+    """
+    One submitted list of search terms and the result blocks found so far.
+
+    Blocks are written by the job's worker on the background loop and read by
+    request threads, so every access goes through the job's lock. Other worker
+    processes see it through snapshot() (see BulkJobManager).
+    """
+
+    def __init__(self, terms: list[dict], fields=None, max_results_per_term: int = 10):
+        self.id = uuid.uuid4().hex
+        self.terms = terms
+        self.fields = fields
+        self.max_results_per_term = max_results_per_term
+        self.status = 'queued'
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+        self._blocks = [None] * len(terms)
+        self._completed = []  # Indices, in completion order
+        self._failed = 0
+        self._lock = threading.Lock()
+        self.version = 0  # Bumped on every change, so unchanged jobs aren't republished
+        self.published_version = None
+        self._reload = None  # Set on copies restored from a snapshot
+
+
+    def snapshot(self) -> dict:
+        """
+        The job's state as plain data, for other processes (see from_snapshot).
+        """
+        with self._lock:
+            return {
+                'id': self.id, 'terms': self.terms, 'fields': self.fields,
+                'max_results_per_term': self.max_results_per_term, 'status': self.status,
+                'created_at': self.created_at, 'started_at': self.started_at, 'finished_at': self.finished_at,
+                'blocks': list(self._blocks), 'completed': list(self._completed), 'failed': self._failed,
+            }
+
+
+    @classmethod
+    def from_snapshot(cls, data: dict, reload=None) -> 'BulkJob':
+        """
+        Read-only copy of a job running in another process.
+
+        Args:
+            data (dict): BulkJob.snapshot() output.
+            reload (callable, optional): job_id -> fresher copy or None (see latest()).
+        """
+        job = cls(data['terms'], data['fields'], data['max_results_per_term'])
+        job.id = data['id']
+        job.status = data['status']
+        job.created_at, job.started_at, job.finished_at = data['created_at'], data['started_at'], data['finished_at']
+        job._blocks, job._completed, job._failed = data['blocks'], data['completed'], data['failed']
+        job._reload = reload
+        return job
+
+
+    def latest(self) -> 'BulkJob':
+        """
+        The job's current state: itself when it runs in this process, else a
+        fresh copy of its shared snapshot (itself if that has expired).
+        """
+        if self._reload is None:
+            return self
+        return self._reload(self.id) or self
+
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+
+    def start(self) -> None:
+        with self._lock:
+            if self.status == 'queued':
+                self.status = 'running'
+                self.started_at = time.time()
+                self.version += 1
+
+
+    def finish(self, status: str) -> None:
+        with self._lock:
+            if not self.finished:
+                self.status = status
+                self.finished_at = time.time()
+                self.version += 1
+
+
+    def record(self, indices: list[int], block: dict) -> None:
+        """
+        Store the result block of a term at every position it was submitted at.
+        """
+        with self._lock:
+            for index in indices:
+                if self._blocks[index] is not None:
+                    continue
+                self._blocks[index] = {'index': index, **block, 'search_term': self.terms[index]}
+                self._completed.append(index)
+                self._failed += 'error' in block
+                self.version += 1
+
+
+    def completed_since(self, position: int) -> list[dict]:
+        """
+        Blocks finished after the first `position` ones, in completion order.
+        """
+        with self._lock:
+            return [self._blocks[index] for index in self._completed[position:]]
+
+
+    def page(self, offset: int, size: int) -> dict:
+        """
+        Blocks `offset` to `offset + size` in submission order. Terms still being
+        searched are returned as {'index', 'search_term', 'pending': True}.
+        """
+        with self._lock:
+            results = [
+                self._blocks[index] or {'index': index, 'search_term': self.terms[index], 'pending': True}
+                for index in range(offset, min(offset + size, len(self.terms)))
+            ]
+        next_offset = offset + size if offset + size < len(self.terms) else None
+        return {'job_id': self.id, 'status': self.status, 'results': results, 'next_offset': next_offset}
+
+
+    def summary(self) -> dict:
+        with self._lock:
+            completed, failed = len(self._completed), self._failed
+        end = self.finished_at or time.time()
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'total': len(self.terms),
+            'completed': completed,
+            'succeeded': completed - failed,
+            'failed': failed,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'elapsed_ms': round((end - self.started_at) * 1000) if self.started_at else 0,
+        }
+
+
+
+class BulkJobManager:
+    """
+    Runs large bulk searches as background jobs.
+
+    A job's terms are deduplicated as in SearchEngine.bulk_search, then searched in
+    batches of `batch_size` through `search_stream` (SearchEngine.bulk_search_stream),
+    so they share the result cache, the batched duration and link lookups and the
+    bulk API key pool with every other search. Each job runs at most `concurrency`
+    batches at once and at most `max_running` jobs run at a time; the rest wait
+    in line. Jobs are forgotten `retention_seconds` after they finish.
+
+    A job runs in the process that accepted it. With a shared `store` (web mode,
+    where gunicorn workers share the "search" cache), that process publishes a
+    snapshot of the job when it is queued, at most every `publish_seconds` while
+    blocks arrive, and when it ends, so every worker can answer status, result
+    and stream requests for it; those served elsewhere lag by up to
+    `publish_seconds`. A cancel arriving at another worker leaves a flag in the
+    store that the owner acts on at its next publish. The `max_running` and
+    `max_active` limits apply per process.
+    """
+
+    def __init__(self, search_stream, term_key, background, batch_size: int = 10,
+                 concurrency: int = SEARCH_JOB_CONCURRENCY, max_running: int = SEARCH_JOB_MAX_RUNNING,
+                 max_active: int = SEARCH_JOB_MAX_ACTIVE, max_terms: int = SEARCH_JOB_MAX_TERMS,
+                 retention_seconds: int = SEARCH_JOB_RETENTION_SECONDS, store=None, publish_seconds: float = 1.0):
+        """
+        Args:
+            search_stream (callable): (terms, max_results_per_term, deadline=, fields=) -> async
+                                      iterator of {'index', ...} blocks.
+            term_key (callable): term -> (identity, video_id), as SearchEngine._bulk_key.
+            background (BackgroundLoop): Where jobs run.
+            store (optional): Cache backend shared with the other worker processes
+                              (DjangoCacheBackend); None keeps jobs in this process only.
+            publish_seconds (float): Longest a shared snapshot lags behind its job.
+        """
+        self.search_stream = search_stream
+        self.term_key = term_key
+        self.background = background
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_active = max_active
+        self.max_terms = max_terms
+        self.retention_seconds = retention_seconds
+        self.store = store
+        self.publish_seconds = publish_seconds
+        # Only the background loop waits on it, so the limit is process-wide
+        self._running = LoopBoundSemaphore(max_running)
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.rejected = 0
+        self.cancelled = 0
+        self.published = 0
+        self.store_errors = 0
+
+
+    def submit(self, terms: list[dict], fields=None, max_results_per_term: int = 10) -> BulkJob:
+        """
+        Queue a search of `terms` (classified, at most `max_terms`).
+
+        Raises:
+            ValueError: If there are no terms or too many.
+            TooManyJobs: If `max_active` jobs are already queued or running.
+        """
+        if not terms or len(terms) > self.max_terms:
+            raise ValueError(f"A job takes between 1 and {self.max_terms} terms.")
+
+        self._prune()
+        job = BulkJob(terms, fields, max_results_per_term)
+        with self._lock:
+            if sum(not j.finished for j in self._jobs.values()) >= self.max_active:
+                self.rejected += 1
+                raise TooManyJobs(f"{self.max_active} search jobs are already in progress. Try again later.")
+            self._jobs[job.id] = job
+            self.submitted += 1
+
+        self._publish(job)
+        job.future = self.background.spawn(f"search-job:{job.id}", lambda: self._run(job))
+        logger.info("Search job %s queued with %d terms", job.id, len(terms))
+        return job
+
+
+    def get(self, job_id: str) -> BulkJob:
+        """
+        The job, or a copy of its shared snapshot if another process runs it.
+
+        Raises:
+            JobNotFound: If the job is unknown or has expired.
+        """
+        self._prune()
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            job = self._load(job_id)
+        if job is None:
+            raise JobNotFound(job_id)
+        return job
+
+
+    def cancel(self, job_id: str) -> BulkJob:
+        """
+        Stop a queued or running job. Blocks found so far are kept.
+        """
+        job = self.get(job_id)
+        if job.finished:
+            return job
+        if job._reload is not None:
+            # Another process runs it: leave it a note, and report the job as it will be
+            self._store_call('set', self._cancel_key(job_id), True, self.retention_seconds)
+            job.finish('cancelled')
+            logger.info("Search job %s cancellation requested", job.id)
+            return job
+
+        job.finish('cancelled')
+        if job.future is not None:
+            job.future.cancel()
+        self.cancelled += 1
+        self._publish(job)
+        logger.info("Search job %s cancelled", job.id)
+        return job
+
+
+    @staticmethod
+    def _key(job_id: str) -> str:
+        return f"search-job:{job_id}"
+
+
+    @staticmethod
+    def _cancel_key(job_id: str) -> str:
+        return f"search-job:{job_id}:cancel"
+
+
+    def _store_call(self, method: str, *args):
+        """
+        Call the shared store, logging (not raising) its failures: a job keeps
+        running in its own process when the store is unreachable.
+        """
+        if self.store is None:
+            return None
+        try:
+            return getattr(self.store, method)(*args)
+        except Exception:
+            self.store_errors += 1
+            logger.exception("Search job store %s failed", method)
+            return None
+
+
+    def _publish(self, job: BulkJob) -> None:
+        """
+        Share the job's current state with the other processes.
+        """
+        if self.store is None:
+            return
+        version = job.version
+        self._store_call('set', self._key(job.id), job.snapshot(), self.retention_seconds)
+        job.published_version = version
+        self.published += 1
+
+
+    def _load(self, job_id: str) -> BulkJob | None:
+        data = self._store_call('get', self._key(job_id))
+        return BulkJob.from_snapshot(data, reload=self._load) if data else None
+
+
+    async def _publish_while_running(self, job: BulkJob) -> None:
+        """
+        Republish the job whenever it changed, and act on cancels left by other processes.
+        """
+        while not job.finished:
+            await asyncio.sleep(self.publish_seconds)
+            if await asyncio.to_thread(self._store_call, 'get', self._cancel_key(job.id)):
+                self.cancel(job.id)
+                return
+            if job.version != job.published_version:
+                await asyncio.to_thread(self._publish, job)
+
+
+    async def _run(self, job: BulkJob) -> None:
+        async with self._running:
+            if not job.finished and await asyncio.to_thread(self._store_call, 'get', self._cancel_key(job.id)):
+                self.cancel(job.id)  # Cancelled from another process while waiting
+            if job.finished:  # Cancelled while waiting
+                return
+            job.start()
+            publisher = asyncio.create_task(self._publish_while_running(job)) if self.store is not None else None
+
+            # Identical terms are searched once and their block recorded at every position
+            positions = {}
+            for index, term in enumerate(job.terms):
+                positions.setdefault(self.term_key(term)[0], []).append(index)
+            unique = list(positions.values())
+            batches = [unique[i:i + self.batch_size] for i in range(0, len(unique), self.batch_size)]
+            batch_slots = asyncio.Semaphore(self.concurrency)
+
+            async def run_batch(batch):
+                async with batch_slots:
+                    blocks = self.search_stream(
+                        [job.terms[indices[0]] for indices in batch], job.max_results_per_term,
+                        deadline=Deadline(SEARCH_MAX_TIMEOUT_MS / 1000), fields=job.fields,
+                    )
+                    async for block in blocks:
+                        job.record(batch[block['index']], block)
+
+            try:
+                await asyncio.gather(*(run_batch(batch) for batch in batches))
+            except asyncio.CancelledError:
+                job.finish('cancelled')
+                raise
+            except Exception as e:
+                logger.exception("Search job %s failed", job.id)
+                for index in range(len(job.terms)):
+                    job.record([index], {'error': f"Search job failed: {e}", 'count': 0})
+                job.finish('failed')
+            else:
+                job.finish('done')
+                logger.info("Search job %s finished: %s", job.id, job.summary())
+            finally:
+                if publisher is not None:
+                    publisher.cancel()
+                    await asyncio.to_thread(self._publish, job)
+
+
+    def _prune(self) -> None:
+        """
+        Forget jobs that finished more than `retention_seconds` ago.
+        """
+        cutoff = time.time() - self.retention_seconds
+        with self._lock:
+            for job_id in [i for i, j in self._jobs.items() if j.finished and j.finished_at < cutoff]:
+                del self._jobs[job_id]
+
+
+    def stats(self) -> dict:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return {
+            'queued': sum(j.status == 'queued' for j in jobs),
+            'running': sum(j.status == 'running' for j in jobs),
+            'kept': len(jobs),
+            'submitted': self.submitted,
+            'rejected': self.rejected,
+            'cancelled': self.cancelled,
+            'concurrency': self.concurrency,
+            'shared': self.store is not None,
+            'published': self.published,
+            'store_errors': self.store_errors,
+        }
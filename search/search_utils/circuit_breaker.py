@@ -0,0 +1,160 @@
+import collections
+import logging
+import threading
+import time
+
+logger = logging.getLogger('seekbeat')
+
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+
+class CircuitOpen(Exception):
+    """
+    Raised instead of calling an upstream whose breaker is open.
+    """
+
+    def __init__(self, name: str, retry_in: float = 0.0):
+        super().__init__(f"{name} is temporarily unavailable (circuit open, retry in {retry_in:.0f}s).")
+        self.name = name
+        self.retry_in = retry_in
+
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open circuit breaker for one upstream.
+
+    The outcome of the last `window` calls is kept. Once at least `min_calls` are
+    recorded and either the failure rate reaches `failure_rate` or the share of calls
+    slower than `slow_call_seconds` reaches `slow_call_rate`, the breaker opens and
+    allow() raises CircuitOpen for `open_seconds`. After that, up to `half_open_probes`
+    calls are let through: a successful probe closes the breaker, a failed one
+    re-opens it. A probe that reports nothing within `probe_timeout` seconds is
+    given up on, so a lost probe can't keep the breaker half-open forever.
+
+    Callers invoke allow() before each upstream call and then exactly one of
+    record_success(), record_failure() or record_neutral() (for outcomes that say
+    nothing about upstream health, such as quota errors, or for cancelled calls).
+    """
+
+    def __init__(self, name: str, failure_rate: float = 0.5, slow_call_seconds: float = 10.0, slow_call_rate: float = 0.8,
+                 min_calls: int = 10, window: int = 20, open_seconds: float = 30.0, half_open_probes: int = 1,
+                 probe_timeout: float = 60.0, clock=time.monotonic):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.probe_timeout = probe_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._calls = collections.deque(maxlen=window)   # (failed, slow) per call
+        self.state = CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self._last_probe_at = 0.0
+        self.opened = 0
+        self.rejected = 0
+
+
+    def _transition(self, state: str) -> None:
+        if state != self.state:
+            logger.warning("Circuit breaker %s: %s -> %s", self.name, self.state, state)
+            self.state = state
+        if state == OPEN:
+            self._opened_at = self._clock()
+            self.opened += 1
+        if state != HALF_OPEN:
+            self._probes = 0
+        if state == CLOSED:
+            self._calls.clear()
+
+
+    def allow(self) -> None:
+        """
+        Reserve a call to the upstream.
+
+        Raises:
+            CircuitOpen: If the breaker is open, or half-open with all probes in flight.
+        """
+        with self._lock:
+            if self.state == OPEN:
+                remaining = self._opened_at + self.open_seconds - self._clock()
+                if remaining > 0:
+                    self.rejected += 1
+                    raise CircuitOpen(self.name, remaining)
+                self._transition(HALF_OPEN)
+
+            if self.state == HALF_OPEN:
+                if self._probes >= self.half_open_probes and self._clock() - self._last_probe_at >= self.probe_timeout:
+                    logger.warning("Circuit breaker %s: half-open probes timed out, probing again", self.name)
+                    self._probes = 0
+                if self._probes >= self.half_open_probes:
+                    self.rejected += 1
+                    raise CircuitOpen(self.name)
+                self._probes += 1
+                self._last_probe_at = self._clock()
+
+
+    def record_success(self, elapsed: float = 0.0) -> None:
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._transition(CLOSED)
+                return
+            self._record(False, elapsed >= self.slow_call_seconds)
+
+
+    def record_failure(self, elapsed: float = 0.0) -> None:
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._transition(OPEN)
+                return
+            self._record(True, elapsed >= self.slow_call_seconds)
+
+
+    def record_neutral(self) -> None:
+        """
+        Release a reserved call without counting it either way.
+        """
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probes = max(0, self._probes - 1)
+
+
+    def _record(self, failed: bool, slow: bool) -> None:
+        self._calls.append((failed, slow))
+        if self.state != CLOSED or len(self._calls) < self.min_calls:
+            return
+        failures = sum(f for f, _ in self._calls) / len(self._calls)
+        slow_calls = sum(s for _, s in self._calls) / len(self._calls)
+        if failures >= self.failure_rate or slow_calls >= self.slow_call_rate:
+            self._transition(OPEN)
+
+
+    @property
+    def is_open(self) -> bool:
+        """
+        True while calls would be rejected (ignores a pending half-open transition).
+        """
+        with self._lock:
+            return self.state == OPEN and self._clock() < self._opened_at + self.open_seconds
+
+
+    def stats(self) -> dict:
+        with self._lock:
+            calls = len(self._calls)
+            return {
+                'state': self.state,
+                'calls': calls,
+                'failure_rate': round(sum(f for f, _ in self._calls) / calls, 4) if calls else 0.0,
+                'slow_call_rate': round(sum(s for _, s in self._calls) / calls, 4) if calls else 0.0,
+                'opened': self.opened,
+                'rejected': self.rejected,
+                'retry_in': round(max(0.0, self._opened_at + self.open_seconds - self._clock()), 1) if self.state == OPEN else 0.0,
+            }
@@ -0,0 +1,66 @@
+import asyncio
+import threading
+import weakref
+
+
+
+class LoopBoundSemaphore:
+    """
+    Concurrency limiter that is safe to share across event loops.
+
+    A plain asyncio.Semaphore binds itself to the first loop that waits on it, so
+    one created in SearchEngine.__init__ breaks (or silently stops limiting) once
+    requests run on different loops. This keeps one asyncio.Semaphore per running
+    loop, created lazily inside that loop. Under ASGI every request shares the
+    server's loop, so the limit is process-wide.
+    """
+
+    def __init__(self, value: int):
+        """
+        Args:
+            value (int): Maximum number of concurrent holders per event loop.
+        """
+        self.value = value
+        self._semaphores = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            sem = self._semaphores.get(loop)
+            if sem is None:
+                sem = asyncio.Semaphore(self.value)
+                self._semaphores[loop] = sem
+            return sem
+
+
+    async def acquire(self) -> None:
+        await self._semaphore().acquire()
+
+
+    def release(self) -> None:
+        self._semaphore().release()
+
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.release()
+
+
+    def stats(self) -> dict:
+        """
+        Slots in use and callers waiting, summed over every live loop.
+        """
+        with self._lock:
+            semaphores = list(self._semaphores.values())
+        return {
+            'limit': self.value,
+            'loops': len(semaphores),
+            'in_use': sum(self.value - sem._value for sem in semaphores),
+            'waiting': sum(len(sem._waiters or ()) for sem in semaphores),
+        }
@@ -0,0 +1,148 @@
+import asyncio
+import contextlib
+import contextvars
+import time
+
+
+# Minimum time worth starting another Data API attempt or a yt-dlp extraction with (seconds)
+MIN_API_ATTEMPT_SECONDS = 0.5
+MIN_YTDLP_ATTEMPT_SECONDS = 2.0
+
+# Longest a blocking upstream HTTP call may take when there's no deadline, and
+# the shortest timeout worth giving one (seconds)
+MAX_CALL_SECONDS = 30.0
+MIN_CALL_SECONDS = 0.1
+
+DEADLINE_ERROR = "The search ran out of time before any results were found."
+
+_current = contextvars.ContextVar('seekbeat_search_deadline', default=None)
+
+
+
+class DeadlineExceeded(TimeoutError):
+    """
+    Raised when there isn't enough time left in the request's budget for a step.
+    """
+
+
+
+class Deadline:
+    """
+    Time budget of one search request.
+
+    Set with deadline_scope(); everything the request awaits (including tasks it
+    starts) sees it through current_deadline() and skips retries and fallbacks
+    that can't finish in time. Anything cut short marks the deadline `partial`,
+    which the views report with the X-Search-Partial header.
+
+    A child deadline shares its parent's expiry but has its own `partial` flag
+    (still propagated upwards), so one cached fetch can tell whether *its*
+    result is incomplete.
+    """
+
+    def __init__(self, seconds: float, clock=time.monotonic, parent: 'Deadline' = None):
+        self.clock = clock
+        self.expires_at = clock() + seconds
+        self.parent = parent
+        self.partial = False
+        self.reasons = []
+
+
+    def child(self) -> 'Deadline':
+        child = Deadline(0, self.clock, parent=self)
+        child.expires_at = self.expires_at
+        return child
+
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - self.clock())
+
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+    def allows(self, seconds: float) -> bool:
+        """
+        Whether `seconds` of work still fit in the budget.
+        """
+        return self.remaining() >= seconds
+
+
+    def mark_partial(self, reason: str) -> None:
+        self.partial = True
+        if reason not in self.reasons:
+            self.reasons.append(reason)
+        if self.parent is not None:
+            self.parent.mark_partial(reason)
+
+
+
+def current_deadline() -> Deadline | None:
+    return _current.get()
+
+
+
+@contextlib.contextmanager
+def deadline_scope(deadline: Deadline | None):
+    """
+    Make `deadline` the current one (None: no deadline) for the enclosed code.
+    """
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+
+def time_left() -> float | None:
+    """
+    Seconds left in the current deadline, or None without one (usable as a timeout).
+    """
+    deadline = _current.get()
+    return None if deadline is None else deadline.remaining()
+
+
+
+def call_timeout(cap: float | None = MAX_CALL_SECONDS) -> float | None:
+    """
+    Timeout to hand a blocking call (requests' `timeout`, a future's result()):
+    the time left in the current deadline, at most `cap` and at least MIN_CALL_SECONDS.
+
+    within_deadline() only stops awaiting a call that runs in a thread; the thread
+    itself keeps going (and holding its connection) unless the call times out too.
+    """
+    left = time_left()
+    if left is None:
+        return cap
+    return max(MIN_CALL_SECONDS, left if cap is None else min(cap, left))
+
+
+
+def allows(seconds: float) -> bool:
+    deadline = _current.get()
+    return deadline is None or deadline.allows(seconds)
+
+
+
+def mark_partial(reason: str) -> None:
+    deadline = _current.get()
+    if deadline is not None:
+        deadline.mark_partial(reason)
+
+
+
+async def within_deadline(aw, reason: str):
+    """
+    Await `aw`, giving up (and cancelling it) when the current deadline passes.
+
+    Raises:
+        DeadlineExceeded: If the deadline passed first; the deadline is marked partial.
+    """
+    try:
+        return await asyncio.wait_for(aw, time_left())
+    except asyncio.TimeoutError:
+        mark_partial(reason)
+        raise DeadlineExceeded(reason) from None
@@ -0,0 +1,283 @@
+import asyncio
+import contextlib
+import logging
+import threading
+
+import requests
+from asgiref.sync import sync_to_async
+
+from .result_cache import LocalCacheBackend
+from .api_keys import VIDEOS_LIST_UNITS, quota_reason
+from .deadline import call_timeout
+
+logger = logging.getLogger('seekbeat')
+
+
+
+class DurationResolver:
+    """
+    Resolves YouTube video durations with batched `videos.list` calls.
+
+    Up to BATCH_SIZE IDs are sent per request as a comma-separated `id=` list, and
+    every resolved duration is kept in a durable ID→seconds store (durations never
+    change), fronted by an in-process LRU. Repeat results never trigger a lookup again.
+
+    The store is looked up in batches (get_many) and written in batches (set_many),
+    keyed by video ID.
+    """
+
+    BATCH_SIZE = 50
+    VIDEOS_URL = "https://www.googleapis.com/youtube/v3/videos"
+
+    def __init__(self, parse_duration, store=None, memory=None, limiter=None, key_pool=None):
+        """
+        Args:
+            parse_duration (callable): Converts an ISO 8601 duration (e.g. PT2M30S) to seconds.
+            store: Durable backend (get_many/set_many interface), e.g. a DurationStore (the database).
+                   None keeps durations in `memory` only.
+            memory: In-process backend consulted before `store`.
+            limiter: Optional async context manager bounding concurrent API calls.
+            key_pool (ApiKeyPool, optional): Charged for every call; rotates keys that run out of quota.
+        """
+        self.parse_duration = parse_duration
+        self.limiter = limiter
+        self.key_pool = key_pool
+        self.store = store
+        self.memory = memory if memory is not None else LocalCacheBackend(max_entries=20000)
+        self.memory_hits = 0
+        self.store_hits = 0
+        self.fetched = 0
+        self.api_calls = 0
+        self._lock = threading.Lock()
+
+
+    def _key(self, video_id: str) -> str:
+        return f"seekbeat:duration:{video_id}"
+
+
+    async def lookup_cached(self, video_ids) -> dict:
+        """
+        Return {video_id: seconds} for every ID already known, without any network call.
+        """
+        found, unknown = {}, []
+        for video_id in video_ids:
+            seconds = self.memory.get(self._key(video_id))
+            if seconds is not None:
+                found[video_id] = seconds
+            else:
+                unknown.append(video_id)
+        with self._lock:
+            self.memory_hits += len(found)
+        if not unknown or self.store is None:
+            return found
+
+        try:
+            stored = await sync_to_async(self.store.get_many)(unknown)
+        except Exception:
+            logger.exception("Duration store lookup failed for %d ids", len(unknown))
+            stored = {}
+
+        for video_id, seconds in stored.items():
+            if seconds is not None:
+                self.memory.set(self._key(video_id), seconds)
+                found[video_id] = seconds
+                with self._lock:
+                    self.store_hits += 1
+        return found
+
+
+    def remember(self, durations: dict) -> None:
+        """
+        Persist resolved durations. Unknown (None) durations are not stored.
+        """
+        known = {video_id: seconds for video_id, seconds in durations.items() if seconds is not None}
+        if not known:
+            return
+        for video_id, seconds in known.items():
+            self.memory.set(self._key(video_id), seconds)
+        if self.store is None:
+            return
+        try:
+            self.store.set_many(known)
+        except Exception:
+            logger.exception("Duration store write failed for %d ids", len(known))
+
+
+    async def fetch_batch(self, video_ids: list[str], api_key: str) -> dict:
+        """
+        Fetch durations for up to BATCH_SIZE IDs in a single videos.list call.
+        IDs the API doesn't return (private, deleted) map to None.
+        """
+        params = {
+            'part': 'contentDetails',
+            'id': ",".join(video_ids),
+            'key': api_key,
+        }
+        durations = dict.fromkeys(video_ids)
+
+        try:
+            while True:
+                with self._lock:
+                    self.api_calls += 1
+                if self.key_pool is not None:
+                    self.key_pool.charge(params['key'], VIDEOS_LIST_UNITS)
+                async with self.limiter or contextlib.nullcontext():
+                    resp = await asyncio.to_thread(requests.get, self.VIDEOS_URL, params=params, timeout=call_timeout())
+
+                # Out of quota: retry on another key of the same traffic class, if any
+                reason = quota_reason(resp) if self.key_pool is not None else None
+                replacement = None
+                if reason:
+                    self.key_pool.mark_exhausted(params['key'], reason)
+                    replacement = self.key_pool.replacement(params['key'], VIDEOS_LIST_UNITS)
+                if not replacement:
+                    break
+                params['key'] = replacement
+
+            if resp.status_code != 200:
+                logger.warning("Duration batch failed (%s) for %d ids", resp.status_code, len(video_ids))
+                return durations
+
+            for item in resp.json().get('items', []):
+                raw_duration = item.get('contentDetails', {}).get('duration')
+                try:
+                    durations[item.get('id')] = self.parse_duration(raw_duration)
+                except Exception:
+                    logger.debug("Unparseable duration %r for video_id=%s", raw_duration, item.get('id'))
+        except Exception:
+            logger.exception("Duration batch request failed for %d ids", len(video_ids))
+
+        with self._lock:
+            self.fetched += sum(1 for v in durations.values() if v is not None)
+        return durations
+
+
+    async def fetch_missing(self, video_ids, api_key: str) -> dict:
+        """
+        Fetch (and remember) durations for IDs not in the cache, BATCH_SIZE IDs per request.
+        """
+        video_ids = list(dict.fromkeys(video_ids))
+        chunks = [video_ids[i:i + self.BATCH_SIZE] for i in range(0, len(video_ids), self.BATCH_SIZE)]
+        results = {}
+        for batch in await asyncio.gather(*(self.fetch_batch(chunk, api_key) for chunk in chunks)):
+            results.update(batch)
+        self.remember(results)
+        return results
+
+
+    async def resolve(self, video_ids, api_key: str) -> dict:
+        """
+        Return {video_id: seconds or None} for every ID, looking up only unknown IDs.
+        """
+        durations = await self.lookup_cached(video_ids)
+        missing = [vid for vid in video_ids if vid not in durations]
+        if missing:
+            durations.update(await self.fetch_missing(missing, api_key))
+        return durations
+
+
+    def batcher(self, max_wait: float = 0.25):
+        """
+        Create a DurationBatcher to share lookups between concurrent searches.
+        """
+        return DurationBatcher(self, max_wait=max_wait)
+
+
+    def stats(self) -> dict:
+        return {
+            'memory_hits': self.memory_hits,
+            'store_hits': self.store_hits,
+            'fetched': self.fetched,
+            'api_calls': self.api_calls,
+            'store': self.store.stats() if hasattr(self.store, 'stats') else None,
+        }
+
+
+
+class DurationBatcher:
+    """
+    Shares duration lookups between the concurrent searches of one bulk_search call.
+
+    IDs submitted by the participating searches are pooled and flushed together as
+    soon as every participant still running is waiting on durations, BATCH_SIZE IDs
+    are pending, or `max_wait` seconds have passed since the first pending ID.
+    Participants call join() when they start and leave() once they finish,
+    whichever path they took.
+    """
+
+    def __init__(self, resolver: DurationResolver, max_wait: float = 0.25):
+        self.resolver = resolver
+        self.active = 0
+        self.max_wait = max_wait
+        self._pending = {}
+        self._waiters = []
+        self._api_key = None
+        self._timer = None
+
+
+    async def resolve(self, video_ids, api_key: str) -> dict:
+        """
+        Return {video_id: seconds or None}, waiting for the shared batch if needed.
+        """
+        durations = await self.resolver.lookup_cached(video_ids)
+        missing = [vid for vid in video_ids if vid not in durations]
+        if not missing:
+            return durations
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._waiters.append(future)
+        self._pending.update(dict.fromkeys(missing))
+        self._api_key = self._api_key or api_key
+
+        if self._should_flush():
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        results = await future
+        durations.update({vid: results.get(vid) for vid in missing})
+        return durations
+
+
+    def join(self) -> None:
+        """
+        Register one running participant.
+        """
+        self.active += 1
+
+
+    def leave(self) -> None:
+        """
+        Mark one participant as finished; may release the batch for the others.
+        """
+        self.active = max(0, self.active - 1)
+        if self._pending and self._should_flush():
+            self._flush()
+
+
+    def _should_flush(self) -> bool:
+        return len(self._pending) >= self.resolver.BATCH_SIZE or len(self._waiters) >= self.active
+
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        ids, waiters = list(self._pending), self._waiters
+        self._pending, self._waiters = {}, []
+        asyncio.ensure_future(self._run_batch(ids, waiters, self._api_key))
+
+
+    async def _run_batch(self, ids, waiters, api_key) -> None:
+        try:
+            results = await self.resolver.fetch_missing(ids, api_key)
+        except Exception:
+            logger.exception("Shared duration batch failed for %d ids", len(ids))
+            results = {}
+        for future in waiters:
+            if not future.done():
+                future.set_result(results)
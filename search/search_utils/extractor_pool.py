@@ -0,0 +1,295 @@
+"""
+Pool of long-lived yt-dlp extractor worker processes, shared by SearchEngine and
+StreamingEngine.
+
+Each worker keeps a warm `yt_dlp.YoutubeDL` per option set, so extractor setup is
+paid once per worker rather than once per request, and the on-disk yt-dlp cache
+(player JS, nsig/signature functions) survives restarts. Extraction runs outside
+the server process, off its GIL and across several cores.
+
+This module must stay importable without Django: worker processes are started
+with the "spawn" method and only import what they need to run `_worker_extract`.
+"""
+
+import asyncio
+import concurrent.futures
+import json
+import logging
+import multiprocessing
+import os
+import threading
+
+import yt_dlp
+
+from config import (
+    YTDLP_CACHE_DIR,
+    EXTRACTOR_POOL_WORKERS,
+    EXTRACTOR_MAX_JOBS_PER_WORKER,
+    EXTRACTOR_MAX_WORKER_MEMORY_MB,
+    EXTRACTOR_MAX_QUEUE,
+)
+
+logger = logging.getLogger('seekbeat')
+
+
+# Warm extractors of the current process, keyed by their options
+_worker_ydls = {}
+
+# Options that change from call to call (e.g. a playlist window); extractions
+# using them get a one-off YoutubeDL instead of a cached one per value
+ONE_OFF_OPTIONS = ('playlist_items',)
+
+
+
+class ExtractorPoolBusy(RuntimeError):
+    """
+    Raised when the extraction queue is full.
+    """
+
+
+
+class ExtractionError(RuntimeError):
+    """
+    yt-dlp failure inside a worker, re-raised as a picklable exception.
+    """
+
+
+
+def _rss_mb():
+    """
+    Current resident memory of this process in MB, or None where unsupported.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+
+def _project(info, keys):
+    """
+    Keep only `keys` of an info dict (and of each playlist entry).
+    """
+    if not isinstance(info, dict) or not keys:
+        return info
+    projected = {k: info.get(k) for k in keys if k in info}
+    if isinstance(info.get('entries'), list):
+        projected['entries'] = [_project(e, keys) for e in info['entries']]
+    return projected
+
+
+
+def _worker_extract(opts: dict, url: str, keys=None):
+    """
+    Run one extraction with this process's warm YoutubeDL for `opts`.
+
+    Returns:
+        tuple: (sanitized info dict, resident memory in MB or None)
+    """
+    if any(option in opts for option in ONE_OFF_OPTIONS):
+        ydl = yt_dlp.YoutubeDL(opts)
+    else:
+        options_key = json.dumps(opts, sort_keys=True, default=str)
+        ydl = _worker_ydls.get(options_key)
+        if ydl is None:
+            ydl = yt_dlp.YoutubeDL(opts)
+            _worker_ydls[options_key] = ydl
+
+    try:
+        info = ydl.sanitize_info(ydl.extract_info(url, download=False))
+    except Exception as e:
+        # yt-dlp errors carry tracebacks, which cannot cross the process boundary
+        raise ExtractionError(str(e)) from None
+    return _project(info, keys), _rss_mb()
+
+
+
+class ExtractorPool:
+    """
+    Bounded pool of yt-dlp extractor processes.
+
+    Workers are replaced after `max_jobs_per_worker` jobs; if a worker reports
+    memory above `max_worker_memory_mb`, the whole pool is swapped for a fresh one
+    (in-flight jobs finish on the old pool). At most `max_queue` jobs may be queued
+    or running; beyond that `ExtractorPoolBusy` is raised instead of piling up work.
+    With `workers=0` extractions run in-process on the caller's thread.
+    """
+
+    def __init__(self, workers: int = EXTRACTOR_POOL_WORKERS, max_jobs_per_worker: int = EXTRACTOR_MAX_JOBS_PER_WORKER,
+                 max_worker_memory_mb: int = EXTRACTOR_MAX_WORKER_MEMORY_MB, max_queue: int = EXTRACTOR_MAX_QUEUE,
+                 cache_dir=YTDLP_CACHE_DIR):
+        self.workers = workers
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.max_worker_memory_mb = max_worker_memory_mb
+        self.max_queue = max_queue
+        self.cache_dir = str(cache_dir) if cache_dir else None
+        self._executor = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.recycles = 0
+        self.last_worker_rss_mb = None
+
+
+    def _get_executor(self) -> concurrent.futures.ProcessPoolExecutor:
+        if self._executor is None:
+            if self.cache_dir:
+                os.makedirs(self.cache_dir, exist_ok=True)
+            logger.info("Starting extractor pool with %d workers", self.workers)
+            self._executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                max_tasks_per_child=self.max_jobs_per_worker,
+            )
+        return self._executor
+
+
+    def _prepare(self, opts: dict) -> dict:
+        opts = dict(opts)
+        if self.cache_dir and "cachedir" not in opts:
+            opts["cachedir"] = self.cache_dir
+        return opts
+
+
+    def submit(self, url: str, opts: dict, keys=None) -> concurrent.futures.Future:
+        """
+        Queue an extraction and return a future for its (sanitized) info dict.
+
+        Args:
+            url (str): URL or yt-dlp search query (e.g. "ytsearch10:adele").
+            opts (dict): yt-dlp options; workers keep one warm extractor per distinct set.
+            keys (iterable, optional): Only return these info keys (smaller IPC payloads).
+
+        Raises:
+            ExtractorPoolBusy: If `max_queue` jobs are already queued or running.
+        """
+        with self._lock:
+            if self.pending >= self.max_queue:
+                self.rejected += 1
+                raise ExtractorPoolBusy(f"Extractor queue is full ({self.max_queue} jobs).")
+            self.pending += 1
+
+        result = concurrent.futures.Future()
+        try:
+            if self.workers <= 0:
+                job = concurrent.futures.Future()
+                try:
+                    job.set_result(_worker_extract(self._prepare(opts), url, keys))
+                except Exception as e:
+                    job.set_exception(e)
+            else:
+                with self._lock:
+                    executor = self._get_executor()
+                job = executor.submit(_worker_extract, self._prepare(opts), url, keys)
+        except Exception:
+            with self._lock:
+                self.pending -= 1
+            raise
+
+        job.add_done_callback(lambda done: self._finish(done, result))
+        # A caller that stopped waiting cancels the job, if no worker has picked it up yet
+        result.add_done_callback(lambda done: job.cancel() if done.cancelled() else None)
+        return result
+
+
+    def _finish(self, job: concurrent.futures.Future, result: concurrent.futures.Future) -> None:
+        recycle = False
+        with self._lock:
+            self.pending -= 1
+            if job.cancelled():
+                return
+            if job.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+                rss = job.result()[1]
+                self.last_worker_rss_mb = rss
+                recycle = self.workers > 0 and rss is not None and rss > self.max_worker_memory_mb
+
+        if recycle:
+            self.recycle()
+
+        try:
+            if job.exception() is not None:
+                result.set_exception(job.exception())
+            else:
+                result.set_result(job.result()[0])
+        except concurrent.futures.InvalidStateError:
+            pass  # The caller gave up (cancelled) while the job ran
+
+
+    def recycle(self) -> None:
+        """
+        Replace the worker processes; jobs already submitted finish on the old ones.
+        """
+        with self._lock:
+            old, self._executor = self._executor, None
+            self.recycles += 1
+        if old is not None:
+            logger.info("Recycling extractor pool (last worker rss=%s MB)", self.last_worker_rss_mb)
+            old.shutdown(wait=False)
+
+
+    def extract(self, url: str, opts: dict, keys=None, timeout: float = None) -> dict:
+        """
+        Blocking extraction.
+
+        Raises:
+            TimeoutError: If no result came within `timeout` seconds; the job is
+                          cancelled unless a worker has already started it.
+        """
+        future = self.submit(url, opts, keys)
+        try:
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+
+    async def aextract(self, url: str, opts: dict, keys=None) -> dict:
+        """
+        Awaitable extraction.
+        """
+        if self.workers <= 0:
+            return await asyncio.to_thread(self.extract, url, opts, keys)
+        return await asyncio.wrap_future(self.submit(url, opts, keys))
+
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+    def stats(self) -> dict:
+        return {
+            'workers': self.workers,
+            'running': self._executor is not None,
+            'pending': self.pending,
+            'max_queue': self.max_queue,
+            'completed': self.completed,
+            'failed': self.failed,
+            'rejected': self.rejected,
+            'recycles': self.recycles,
+            'last_worker_rss_mb': round(self.last_worker_rss_mb, 1) if self.last_worker_rss_mb else None,
+        }
+
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_extractor_pool() -> ExtractorPool:
+    """
+    Process-wide extractor pool, created on first use.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ExtractorPool()
+        return _pool
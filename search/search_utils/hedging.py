@@ -0,0 +1,119 @@
+import asyncio
+import collections
+import logging
+import threading
+import time
+
+logger = logging.getLogger('seekbeat')
+
+
+
+class Hedger:
+    """
+    Hedged requests: run a primary call and, if it hasn't returned after the
+    `percentile` of its recent latencies, start an alternate in parallel. The first
+    valid result wins and the other call is cancelled.
+
+    Latencies of the last `window` successful primary calls are kept; until
+    `min_samples` are known no hedging happens. The hedge delay is clamped to
+    [`min_delay`, `max_delay`] seconds.
+    """
+
+    def __init__(self, percentile: float = 95, min_samples: int = 20, window: int = 200,
+                 min_delay: float = 0.25, max_delay: float = 5.0):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self._latencies = collections.deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.hedged = 0
+        self.primary_wins = 0
+        self.alternate_wins = 0
+
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+
+
+    def delay(self) -> float | None:
+        """
+        Seconds to wait for the primary before hedging, or None while there are too few samples.
+        """
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+        return min(self.max_delay, max(self.min_delay, ordered[index]))
+
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+
+    async def run(self, primary, alternate, is_valid=lambda result: True, should_hedge=lambda: True):
+        """
+        Run `primary()`, hedged with `alternate()`.
+
+        Args:
+            primary (callable): Zero-argument callable returning the primary coroutine.
+            alternate (callable): Same, for the alternate path.
+            is_valid (callable): Whether an alternate result may be returned.
+            should_hedge (callable): Checked before starting the alternate (e.g. time left).
+
+        Returns:
+            The first valid result. If the primary fails before hedging, its exception
+            is raised (the caller's usual fallback applies); once hedged, a primary
+            failure just leaves the race to the alternate, whose outcome is returned.
+        """
+        self._count('requests')
+        started = time.monotonic()
+        primary_task = asyncio.ensure_future(primary())
+        alternate_task = None
+        try:
+            delay = self.delay()
+            done, _ = await asyncio.wait({primary_task}, timeout=delay)
+            if primary_task in done or not should_hedge():
+                result = await primary_task
+                self.record(time.monotonic() - started)
+                return result
+
+            self._count('hedged')
+            logger.info("Primary call slower than %.2fs, hedging", delay)
+            alternate_task = asyncio.ensure_future(alternate())
+            pending = {primary_task, alternate_task}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                if primary_task in done and primary_task.exception() is None:
+                    self.record(time.monotonic() - started)
+                    self._count('primary_wins')
+                    return primary_task.result()
+                if alternate_task in done and alternate_task.exception() is None and is_valid(alternate_task.result()):
+                    self._count('alternate_wins')
+                    return alternate_task.result()
+
+            # Neither produced a usable result: report the alternate's outcome
+            return alternate_task.result()
+        finally:
+            for task in (primary_task, alternate_task):
+                if task is not None and not task.done():
+                    task.cancel()
+
+
+    def stats(self) -> dict:
+        delay = self.delay()
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'hedged': self.hedged,
+                'hedge_rate': round(self.hedged / self.requests, 4) if self.requests else 0.0,
+                'primary_wins': self.primary_wins,
+                'alternate_wins': self.alternate_wins,
+                'percentile': self.percentile,
+                'delay_ms': round(delay * 1000) if delay is not None else None,
+                'samples': len(self._latencies),
+            }
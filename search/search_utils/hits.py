@@ -0,0 +1,138 @@
+import sys
+from operator import attrgetter
+
+
+# Fields of a cleaned search result, interned so every result shares the same key objects
+SEARCH_FIELDS = tuple(sys.intern(f) for f in (
+    "title", "duration", "uploader", "thumbnail", "webpage_url",
+    "upload_date", "largest_thumbnail", "smallest_thumbnail",
+))
+
+# Info keys a search needs from yt-dlp (everything else, e.g. formats, stays in the worker)
+YTDLP_INFO_KEYS = (
+    '_type', 'entries', 'id', 'title', 'url', 'webpage_url', 'duration',
+    'uploader', 'channel', 'thumbnail', 'thumbnails', 'upload_date',
+)
+
+_getters = {}
+
+
+
+def _largest(thumbnails: list, default=None):
+    if not thumbnails:
+        return default
+    return max(thumbnails, key=lambda t: (t.get('height') or 0) * (t.get('width') or 0)).get('url')
+
+
+def _smallest(thumbnails: list, default=None):
+    if not thumbnails:
+        return default
+    return min(thumbnails, key=lambda t: t.get('filesize', float('inf'))).get('url')
+
+
+
+class SearchHit:
+    """
+    One search result, whatever produced it (yt-dlp full or flat entries, Data API
+    items). Slots instead of a per-result dict; results leave the engine as dicts
+    built by to_dict/serialize_hits, with SEARCH_FIELDS as keys.
+    """
+
+    __slots__ = SEARCH_FIELDS
+
+    def __init__(self, title=None, duration=None, uploader=None, thumbnail=None, webpage_url=None,
+                 upload_date=None, largest_thumbnail=None, smallest_thumbnail=None):
+        self.title = title
+        self.duration = duration
+        self.uploader = uploader
+        self.thumbnail = thumbnail
+        self.webpage_url = webpage_url
+        self.upload_date = upload_date
+        self.largest_thumbnail = largest_thumbnail
+        self.smallest_thumbnail = smallest_thumbnail
+
+
+    @classmethod
+    def from_ytdlp(cls, info: dict) -> 'SearchHit':
+        """
+        From a resolved yt-dlp info dict (a search entry or a single video).
+        """
+        thumbnails = info.get('thumbnails') or []
+        return cls(
+            title=info.get('title'),
+            duration=info.get('duration'),
+            uploader=info.get('uploader'),
+            thumbnail=info.get('thumbnail'),
+            webpage_url=info.get('webpage_url'),
+            upload_date=info.get('upload_date'),
+            largest_thumbnail=_largest(thumbnails, info.get('thumbnail')),
+            smallest_thumbnail=_smallest(thumbnails, info.get('thumbnail')),
+        )
+
+
+    @classmethod
+    def from_flat(cls, entry: dict) -> 'SearchHit':
+        """
+        From a flat yt-dlp entry. Fields the results page doesn't carry (e.g.
+        upload_date) are left as None.
+        """
+        thumbnails = entry.get('thumbnails') or []
+        largest = _largest(thumbnails, entry.get('thumbnail'))
+        return cls(
+            title=entry.get('title'),
+            duration=entry.get('duration'),
+            uploader=entry.get('uploader') or entry.get('channel'),
+            thumbnail=entry.get('thumbnail') or largest,
+            webpage_url=entry.get('webpage_url') or entry.get('url'),
+            upload_date=entry.get('upload_date'),
+            largest_thumbnail=largest,
+            smallest_thumbnail=_smallest(thumbnails, entry.get('thumbnail')),
+        )
+
+
+    @classmethod
+    def from_api(cls, item: dict, video_id: str, duration=None, fields=None) -> 'SearchHit':
+        """
+        From a search.list or videos.list item (anything with a `snippet`). The
+        thumbnail scans only run when a thumbnail size is among `fields`.
+        """
+        snippet = item.get('snippet', {})
+        thumbnails = snippet.get('thumbnails', {})
+        hit = cls(
+            title=snippet.get('title'),
+            duration=duration,
+            uploader=snippet.get('channelTitle'),
+            thumbnail=thumbnails.get('high', {}).get('url'),
+            webpage_url=f"https://www.youtube.com/watch?v={video_id}",
+            upload_date=snippet.get('publishedAt'),
+        )
+        if fields is None or 'largest_thumbnail' in fields:
+            hit.largest_thumbnail = max(thumbnails.values(), key=lambda t: t.get('height', 0) * t.get('width', 0)).get('url')
+        if fields is None or 'smallest_thumbnail' in fields:
+            hit.smallest_thumbnail = min(thumbnails.values(), key=lambda t: t.get('filesize', float('inf'))).get('url')
+        return hit
+
+
+    def to_dict(self, fields=None) -> dict:
+        """
+        The result as a plain dict, limited to `fields` (default: all of SEARCH_FIELDS).
+        """
+        fields = tuple(fields) if fields else SEARCH_FIELDS
+        getter = _getters.get(fields)
+        if getter is None:
+            getter = _getters.setdefault(fields, attrgetter(*fields))
+        values = getter(self)
+        return dict(zip(fields, values if len(fields) > 1 else (values,)))
+
+
+    def __repr__(self):
+        return f"SearchHit({self.title!r}, {self.webpage_url!r})"
+
+
+
+def serialize_hits(hits, fields=None) -> list[dict]:
+    """
+    Turn SearchHits into the dicts the engine returns (see SearchHit.to_dict).
+    """
+    fields = tuple(fields) if fields else SEARCH_FIELDS
+    return [hit.to_dict(fields) for hit in hits]
@@ -0,0 +1,71 @@
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import quote_etag
+
+
+
+def result_lifetime(result, cache) -> int | None:
+    """
+    Seconds a client may reuse `result`: as long as `cache` (a SearchResultCache)
+    keeps the same result server-side.
+
+    Pages are judged by their results. Anything the server cache wouldn't store
+    (errors, invalid queries) gets None.
+    """
+    if isinstance(result, dict) and 'results' in result:
+        return result_lifetime(result['results'], cache)
+    if cache.is_negative(result):
+        return cache.negative_ttl
+    return cache.ttl if isinstance(result, list) else None
+
+
+
+def bulk_lifetime(blocks: list, cache) -> int | None:
+    """
+    result_lifetime of a bulk response: that of its shortest-lived term (None if any term failed).
+    """
+    lifetimes = [result_lifetime(block.get('results'), cache) for block in blocks]
+    if not lifetimes or None in lifetimes:
+        return None
+    return min(lifetimes)
+
+
+
+def content_etag(data) -> str:
+    """
+    Strong ETag of a JSON response body: a digest of the data as the JSON
+    renderers serialize it (key order included), so the DRF and async views
+    agree on it.
+    """
+    body = json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(',', ':'))
+    return quote_etag(hashlib.blake2b(body.encode('utf-8'), digest_size=16).hexdigest())
+
+
+
+def conditional_response(request, response, data, lifetime: int | None):
+    """
+    Make a search response cacheable by browsers and the extension.
+
+    Responses with a `lifetime` get an ETag and `Cache-Control: public,
+    max-age=<lifetime>, stale-while-revalidate=<lifetime>`, and a request whose
+    If-None-Match matches gets a bodiless 304 instead. Partial (X-Search-Partial)
+    and error responses are marked no-store.
+
+    Args:
+        request: The request (DRF or Django).
+        response: The 200 response carrying `data`.
+        data: The response body, before rendering.
+        lifetime (int | None): Seconds it may be reused (see result_lifetime).
+    """
+    if lifetime is None or response.has_header('X-Search-Partial'):
+        patch_cache_control(response, no_store=True)
+        return response
+
+    response['ETag'] = content_etag(data)
+    patch_cache_control(response, public=True, max_age=lifetime, stale_while_revalidate=lifetime)
+    # DRF picks JSON or the browsable API from Accept
+    patch_vary_headers(response, ('Accept',))
+    return get_conditional_response(request, etag=response['ETag'], response=response)
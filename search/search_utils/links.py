@@ -0,0 +1,53 @@
+import re
+from urllib.parse import parse_qs, urlsplit
+
+
+# Every URL form of a single video: watch?v=, youtu.be/, shorts/, embed/, live/
+YOUTUBE_ID = re.compile(r'(?:[?&]v=|youtu\.be/|/shorts/|/embed/|/live/)([A-Za-z0-9_-]{11})')
+
+
+
+def youtube_video_id(url: str) -> str | None:
+    """
+    The video ID in a YouTube URL, whatever its form, or None.
+    """
+    match = YOUTUBE_ID.search(url or '')
+    return match.group(1) if match else None
+
+
+
+def canonical_video_id(url: str) -> str | None:
+    """
+    The video ID of a link to exactly one video, or None.
+
+    Links carrying a `list=` parameter are left alone and resolved by yt-dlp;
+    whole playlists are expanded by SearchEngine.playlist_pages instead.
+    """
+    if 'list' in parse_qs(urlsplit(url or '').query):
+        return None
+    return youtube_video_id(url)
+
+
+
+# Playlist IDs: PL…, UU…, OLAK5uy_…, RD… mixes, and so on
+PLAYLIST_ID = re.compile(r'^[A-Za-z0-9_-]{2,64}$')
+
+
+def youtube_playlist_id(url: str) -> str | None:
+    """
+    The `list=` playlist ID of a YouTube URL (playlist?list=, watch?v=…&list=), or None.
+    """
+    parts = urlsplit((url or '').strip())
+    if not re.fullmatch(r'(?:www\.|m\.|music\.)?(?:youtube\.com|youtu\.be)', parts.netloc):
+        return None
+    playlist_id = parse_qs(parts.query).get('list', [None])[0]
+    return playlist_id if playlist_id and PLAYLIST_ID.match(playlist_id) else None
+
+
+def playlist_url(playlist_id: str) -> str:
+    return f"https://www.youtube.com/playlist?list={playlist_id}"
+
+
+
+def watch_url(video_id: str) -> str:
+    return f"https://www.youtube.com/watch?v={video_id}"
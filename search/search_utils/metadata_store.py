@@ -0,0 +1,271 @@
+import datetime
+import hashlib
+import logging
+import threading
+
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import QueryResult, VideoMetadata
+from .links import youtube_video_id
+from config import SEARCH_STORE_FRESH_SECONDS, SEARCH_STORE_MAX_STALE_SECONDS
+
+logger = logging.getLogger('seekbeat')
+
+
+# Fields of a cleaned search result that are kept per video
+VIDEO_FIELDS = (
+    'title', 'duration', 'uploader', 'thumbnail', 'webpage_url',
+    'upload_date', 'largest_thumbnail', 'smallest_thumbnail',
+)
+
+
+
+def video_id_for(url: str) -> str:
+    """
+    The YouTube video ID in `url`, or a stable digest of the URL for anything else.
+    """
+    video_id = youtube_video_id(url)
+    if video_id:
+        return video_id
+    return 'url:' + hashlib.sha1((url or '').encode('utf-8')).hexdigest()
+
+
+
+class MetadataStore:
+    """
+    SQLite-backed store of search results (search.models), surviving restarts.
+
+    Each video's cleaned result is stored once in VideoMetadata; each query's
+    ordered list of video IDs in QueryResult, under its result-cache key. Entries
+    younger than `fresh_seconds` are served as they are, older ones are served while
+    the caller refreshes them, and ones past `max_stale_seconds` are ignored.
+
+    All methods touch the database and are synchronous; call them from async code
+    through sync_to_async.
+    """
+
+    def __init__(self, fresh_seconds: int = SEARCH_STORE_FRESH_SECONDS, max_stale_seconds: int = SEARCH_STORE_MAX_STALE_SECONDS):
+        self.fresh_seconds = fresh_seconds
+        self.max_stale_seconds = max_stale_seconds
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.saved = 0
+        self.warm_loaded = 0
+
+
+    def _count(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+
+    @staticmethod
+    def is_storable(results) -> bool:
+        """
+        Only non-empty lists of cleaned results are stored (no errors, no empty results).
+        """
+        return isinstance(results, list) and bool(results) and all(
+            isinstance(r, dict) and r.get('webpage_url') for r in results
+        )
+
+
+    def _results_for(self, video_ids: list[str], videos: dict) -> list[dict] | None:
+        if any(vid not in videos for vid in video_ids):
+            return None
+        return [{f: getattr(videos[vid], f) for f in VIDEO_FIELDS} for vid in video_ids]
+
+
+    def lookup(self, key: str) -> tuple[list[dict], float] | None:
+        """
+        Return (results, age in seconds) for `key`, or None if unknown or too old.
+        """
+        row = QueryResult.objects.filter(cache_key=key).first()
+        now = timezone.now()
+        age = (now - row.fetched_at).total_seconds() if row else None
+        if row is None or age > self.max_stale_seconds:
+            self._count('misses')
+            return None
+
+        videos = VideoMetadata.objects.in_bulk(row.video_ids, field_name='video_id')
+        results = self._results_for(row.video_ids, videos)
+        if results is None:
+            self._count('misses')
+            return None
+
+        QueryResult.objects.filter(pk=row.pk).update(hits=F('hits') + 1, last_hit_at=now)
+        self._count('stale_hits' if age > self.fresh_seconds else 'hits')
+        return results, age
+
+
+    def save(self, key: str, query: str, results: list[dict]) -> bool:
+        """
+        Store `results` for `key`. Known videos are updated, but a None field never
+        overwrites a stored value (flat results lack some fields).
+
+        Returns:
+            bool: Whether anything was stored.
+        """
+        if not self.is_storable(results):
+            return False
+
+        now = timezone.now()
+        video_ids, incoming = [], {}
+        for result in results:
+            vid = video_id_for(result['webpage_url'])
+            video_ids.append(vid)
+            data = {f: result.get(f) for f in VIDEO_FIELDS}
+            if data['duration'] is not None:
+                data['duration'] = int(data['duration'])
+            incoming[vid] = data
+
+        with transaction.atomic():
+            existing = VideoMetadata.objects.in_bulk(list(incoming), field_name='video_id')
+            # Rows are upserted rather than inserted: the duration writer (DurationStore) may
+            # add a duration-only row for one of these videos at any moment. Each row only
+            # sets the fields it has a value for, grouped since an upsert takes one field list.
+            groups = {}
+            for vid, data in incoming.items():
+                row = existing.get(vid)
+                if row is not None:
+                    data = {f: getattr(row, f) if value is None else value for f, value in data.items()}
+                known = tuple(f for f in VIDEO_FIELDS if data[f] is not None)
+                groups.setdefault(known, []).append(VideoMetadata(video_id=vid, updated_at=now, **data))
+
+            for known, rows in groups.items():
+                VideoMetadata.objects.bulk_create(
+                    rows, update_conflicts=True, unique_fields=['video_id'], update_fields=[*known, 'updated_at'],
+                )
+            QueryResult.objects.update_or_create(
+                cache_key=key,
+                defaults={'source': key.split(':')[2], 'query': query[:500], 'video_ids': video_ids, 'fetched_at': now},
+            )
+
+        self._count('saved')
+        return True
+
+
+    def hottest(self, limit: int) -> list[tuple[str, list[dict]]]:
+        """
+        (key, results) of the `limit` most requested queries that are not too old.
+        """
+        cutoff = timezone.now() - datetime.timedelta(seconds=self.max_stale_seconds)
+        rows = list(QueryResult.objects.filter(fetched_at__gte=cutoff).order_by('-hits', '-last_hit_at')[:limit])
+        videos = VideoMetadata.objects.in_bulk({vid for row in rows for vid in row.video_ids}, field_name='video_id')
+
+        loaded = []
+        for row in rows:
+            results = self._results_for(row.video_ids, videos)
+            if results is not None:
+                loaded.append((row.cache_key, results))
+        return loaded
+
+
+    def stats(self) -> dict:
+        return {
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'saved': self.saved,
+            'warm_loaded': self.warm_loaded,
+            'fresh_seconds': self.fresh_seconds,
+        }
+
+
+
+class DurationStore:
+    """
+    Video durations kept in VideoMetadata.duration, the durable store behind
+    DurationResolver (durations never change, so they never expire).
+
+    get_many() reads synchronously (call it through sync_to_async). set_many()
+    only queues: a writer thread upserts the queue in one batch every
+    `flush_seconds` (or once `max_batch` durations are waiting), so remembering a
+    duration never puts database work on a request's path. Queued durations are
+    served by get_many() before they are written.
+    """
+
+    def __init__(self, flush_seconds: float = 1.0, max_batch: int = 500):
+        self.flush_seconds = flush_seconds
+        self.max_batch = max_batch
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._writer = None
+        self.written = 0
+        self.failed_writes = 0
+
+
+    def get_many(self, video_ids) -> dict:
+        """
+        {video_id: seconds} for the IDs with a known duration.
+        """
+        video_ids = list(video_ids)
+        with self._lock:
+            found = {vid: self._pending[vid] for vid in video_ids if vid in self._pending}
+        rest = [vid for vid in video_ids if vid not in found]
+        if rest:
+            found.update(VideoMetadata.objects.filter(video_id__in=rest, duration__isnull=False).values_list('video_id', 'duration'))
+        return found
+
+
+    def set_many(self, durations: dict) -> None:
+        """
+        Queue {video_id: seconds} for the writer thread.
+        """
+        with self._lock:
+            self._pending.update(durations)
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._run, name='seekbeat-duration-writer', daemon=True)
+                self._writer.start()
+            if len(self._pending) >= self.max_batch:
+                self._wake.set()
+
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            with self._lock:
+                if not self._pending:  # Idle: the next set_many starts a new writer
+                    self._writer = None
+                    return
+            try:
+                self.flush()
+            finally:
+                connection.close()  # This thread's own connection
+
+
+    def flush(self) -> int:
+        """
+        Write the queued durations now, in one upsert.
+
+        Returns:
+            int: Number of durations written.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        rows = [VideoMetadata(video_id=vid, duration=int(seconds), webpage_url=f"https://www.youtube.com/watch?v={vid}")
+                for vid, seconds in pending.items()]
+        try:
+            # Videos already stored only get their duration set; the rest start as duration-only rows
+            VideoMetadata.objects.bulk_create(rows, update_conflicts=True, unique_fields=['video_id'], update_fields=['duration'])
+        except Exception:
+            # Lost durations are looked up again on their next miss
+            logger.exception("Failed to write %d durations", len(pending))
+            with self._lock:
+                self.failed_writes += len(pending)
+            return 0
+        with self._lock:
+            self.written += len(pending)
+        return len(pending)
+
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'queued': len(self._pending), 'written': self.written, 'failed_writes': self.failed_writes}
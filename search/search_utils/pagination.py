@@ -0,0 +1,59 @@
+from django.core import signing
+
+
+CURSOR_SALT = 'seekbeat.search.cursor'
+# Cursors older than this are rejected (Data API page tokens don't live forever)
+CURSOR_MAX_AGE = 6 * 60 * 60
+
+MAX_PAGE_SIZE = 50
+# yt-dlp pages are served from windows of this many pages, fetched and cached together
+YTDLP_WINDOW_PAGES = 4
+
+
+
+class InvalidCursor(ValueError):
+    """
+    Raised for cursors that were tampered with, expired, or are malformed.
+    """
+
+
+
+def encode_cursor(state: dict) -> str:
+    """
+    Sign a page position into an opaque, URL-safe cursor.
+
+    Args:
+        state (dict): {'q', 't', 'm', 's', 'src', 'off', 'tok'}: query, query type,
+                      yt-dlp mode, page size, source ('api' or 'ytdlp'), number of
+                      results already served, and the Data API nextPageToken.
+    """
+    return signing.dumps(state, salt=CURSOR_SALT, compress=True)
+
+
+
+def decode_cursor(cursor: str) -> dict:
+    """
+    Verify and unpack a cursor produced by encode_cursor.
+
+    Raises:
+        InvalidCursor: If the signature doesn't match, the cursor expired, or it is malformed.
+    """
+    try:
+        state = signing.loads(cursor, salt=CURSOR_SALT, max_age=CURSOR_MAX_AGE)
+    except signing.SignatureExpired:
+        raise InvalidCursor("Cursor has expired, start again from the first page.")
+    except signing.BadSignature:
+        raise InvalidCursor("Invalid cursor.")
+
+    if not isinstance(state, dict) or not {'q', 't', 's', 'src', 'off'} <= state.keys():
+        raise InvalidCursor("Invalid cursor.")
+    return state
+
+
+
+def window_bounds(offset: int, page_size: int) -> tuple[int, int]:
+    """
+    Start and size of the yt-dlp result window holding the page at `offset`.
+    """
+    size = page_size * YTDLP_WINDOW_PAGES
+    return (offset // size) * size, size
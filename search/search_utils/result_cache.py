@@ -0,0 +1,275 @@
+import hashlib
+import threading
+import time
+import logging
+from collections import OrderedDict
+
+from config import IS_WEB
+
+logger = logging.getLogger('seekbeat')
+
+
+
+class LocalCacheBackend:
+    """
+    In-process cache store with per-entry expiry and bounded LRU eviction.
+    Used in desktop mode, where a single process serves every request.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        """
+        Args:
+            max_entries (int): Maximum number of entries kept before the
+                               least recently used one is evicted.
+        """
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+
+    def get(self, key: str):
+        """
+        Return the cached value for `key`, or None if missing or expired.
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+
+            value, expires_at = item
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+
+            self._data.move_to_end(key)
+            return value
+
+
+    def set(self, key: str, value, ttl: float = None) -> None:
+        """
+        Store `value` under `key` for `ttl` seconds (forever if ttl is None).
+        """
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+
+    def get_many(self, keys) -> dict:
+        """
+        {key: value} for the keys that are cached.
+        """
+        found = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                found[key] = value
+        return found
+
+
+    def set_many(self, mapping: dict, ttl: float = None) -> None:
+        for key, value in mapping.items():
+            self.set(key, value, ttl)
+
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+    def __len__(self):
+        return len(self._data)
+
+
+
+class DjangoCacheBackend:
+    """
+    Cache store backed by a configured Django cache alias (see CACHES in settings).
+    Used in web mode so every gunicorn worker shares the same entries; size
+    bounding and eviction are handled by the underlying cache backend.
+    """
+
+    def __init__(self, alias: str = 'search'):
+        self.alias = alias
+        self.evictions = 0
+
+
+    @property
+    def _cache(self):
+        from django.core.cache import caches
+        return caches[self.alias]
+
+
+    def get(self, key: str):
+        return self._cache.get(key)
+
+
+    def set(self, key: str, value, ttl: float = None) -> None:
+        self._cache.set(key, value, timeout=ttl)
+
+
+    def get_many(self, keys) -> dict:
+        return self._cache.get_many(keys)
+
+
+    def set_many(self, mapping: dict, ttl: float = None) -> None:
+        self._cache.set_many(mapping, timeout=ttl)
+
+
+    def delete(self, key: str) -> None:
+        self._cache.delete(key)
+
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+    def __len__(self):
+        # Shared backends don't expose a cheap entry count.
+        return -1
+
+
+
+class SearchResultCache:
+    """
+    TTL + LRU cache in front of SearchEngine's upstream searches.
+
+    Non-empty result lists are cached for `ttl` seconds. Searches that came back
+    with no usable results are cached negatively for `negative_ttl` seconds so a
+    burst of the same dead query doesn't keep hitting YouTube. Transient errors
+    are never cached.
+    """
+
+    NO_RESULTS_ERROR = "No usable results returned"
+
+    def __init__(self, backend=None, ttl: int = 300, negative_ttl: int = 30):
+        """
+        Args:
+            backend: A LocalCacheBackend / DjangoCacheBackend (or anything with
+                     the same get/set/delete/clear interface).
+            ttl (int): Lifetime in seconds of a positive entry.
+            negative_ttl (int): Lifetime in seconds of a "no results" entry.
+        """
+        self.backend = backend if backend is not None else LocalCacheBackend()
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self._lock = threading.Lock()
+
+
+    @classmethod
+    def for_environment(cls, **kwargs):
+        """
+        Build a cache with the backend suited to the current SEEKBEAT_ENV:
+        shared Django cache in web mode, in-process LRU otherwise.
+        """
+        backend = DjangoCacheBackend('search') if IS_WEB else LocalCacheBackend()
+        return cls(backend=backend, **kwargs)
+
+
+    def make_key(self, source: str, classified: dict, **params) -> str:
+        """
+        Build a cache key from a classified query and the paging parameters.
+
+        Plain search terms are case-folded so "Adele Hello" and "adele hello"
+        share an entry; YouTube links are kept verbatim since video IDs are
+        case-sensitive.
+
+        Args:
+            source (str): Which upstream produced the result ('api', 'ytdlp', ...).
+            classified (dict): Output of SearchEngine.clean_and_classify_query.
+            **params: Anything else that changes the result (max_results, page_token, offset).
+        """
+        query = classified.get('query') or ''
+        if classified.get('type') == 'search':
+            query = query.casefold()
+
+        parts = [source, classified.get('type'), query]
+        parts += [f"{name}={params[name]}" for name in sorted(params)]
+        digest = hashlib.sha1("\x1f".join(map(str, parts)).encode('utf-8')).hexdigest()
+        return f"seekbeat:search:{source}:{digest}"
+
+
+    def is_negative(self, result) -> bool:
+        """
+        True for results that mean "this query has nothing to show".
+        """
+        if isinstance(result, list):
+            return not result
+        return isinstance(result, dict) and result.get('error') == self.NO_RESULTS_ERROR
+
+
+    def get(self, key: str):
+        """
+        Look up a cached result and update the hit/miss counters.
+        """
+        value = self.backend.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            elif self.is_negative(value):
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+        return value
+
+
+    def store(self, key: str, result) -> bool:
+        """
+        Cache `result` if it is cacheable. Returns True when it was stored.
+        """
+        if self.is_negative(result):
+            ttl = self.negative_ttl
+        elif isinstance(result, list):
+            ttl = self.ttl
+        else:
+            return False
+
+        try:
+            self.backend.set(key, result, ttl)
+        except Exception:
+            logger.exception("Failed to store search result in cache for key=%s", key)
+            return False
+
+        with self._lock:
+            self.stores += 1
+        return True
+
+
+    def invalidate(self, key: str) -> None:
+        self.backend.delete(key)
+
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+
+    def stats(self) -> dict:
+        """
+        Counters used to size the cache.
+        """
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            'backend': type(self.backend).__name__,
+            'entries': len(self.backend),
+            'hits': self.hits,
+            'negative_hits': self.negative_hits,
+            'misses': self.misses,
+            'stores': self.stores,
+            'evictions': self.backend.evictions,
+            'hit_ratio': round((self.hits + self.negative_hits) / lookups, 4) if lookups else 0.0,
+            'ttl': self.ttl,
+            'negative_ttl': self.negative_ttl,
+        }
@@ -0,0 +1,248 @@
+import asyncio
+import collections
+import contextlib
+import contextvars
+import threading
+import time
+
+
+# Priority classes of upstream work, most urgent first
+PRIORITY_CLASSES = ('interactive', 'bulk', 'background')
+
+_current = contextvars.ContextVar('seekbeat_search_priority', default='interactive')
+
+
+
+@contextlib.contextmanager
+def priority_scope(priority: str):
+    """
+    Run the enclosed code (and tasks it starts) as `priority` work.
+    """
+    if priority not in PRIORITY_CLASSES:
+        raise ValueError(f"Unknown priority class {priority!r}")
+    token = _current.set(priority)
+    try:
+        yield priority
+    finally:
+        _current.reset(token)
+
+
+
+def current_priority() -> str:
+    return _current.get()
+
+
+
+async def run_as(priority: str, factory):
+    """
+    Await `factory()` as `priority` work (for coroutines started elsewhere, e.g. on the background loop).
+    """
+    with priority_scope(priority):
+        return await factory()
+
+
+
+class _Waiter:
+    __slots__ = ('loop', 'future', 'tag', 'enqueued_at', 'granted')
+
+    def __init__(self, loop, tag: float, enqueued_at: float):
+        self.loop = loop
+        self.future = loop.create_future()
+        self.tag = tag
+        self.enqueued_at = enqueued_at
+        self.granted = False
+
+
+
+class _PriorityClass:
+    def __init__(self, name: str, limit: int, weight: float):
+        self.name = name
+        self.limit = limit
+        self.weight = weight
+        self.queue = collections.deque()
+        self.running = 0
+        self.last_tag = 0.0
+        self.dispatched = 0
+        self.waits = collections.deque(maxlen=500)  # Seconds, of the last dispatches
+        self.max_wait = 0.0
+
+
+    @property
+    def has_room(self) -> bool:
+        return self.running < self.limit
+
+
+
+def _wake(future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+
+class SearchScheduler:
+    """
+    Process-wide admission control for upstream calls (Data API requests, yt-dlp
+    extractions), shared by every event loop.
+
+    Each call runs as one of PRIORITY_CLASSES (see priority_scope). At most
+    `capacity` calls run at once, and at most `limits[c]` of them from class c.
+    When a slot frees up, the waiting classes that are under their own limit are
+    served by weighted fair queuing: every waiter is tagged with a virtual finish
+    time that grows by 1/weight per call of its class, and the smallest tag goes
+    first. Interactive searches therefore overtake a queue of bulk terms without
+    starving it, and background refreshes only get what is left.
+
+    With an AdaptiveLimit, `capacity` follows it instead: callers report how
+    their upstream calls went (record_success / record_failure) and the limit
+    rises and falls with what the upstreams can take.
+
+        async with scheduler:   # A slot of the current priority class
+            ...
+    """
+
+    def __init__(self, limits: dict, weights: dict, capacity: int, adaptive=None, clock=time.monotonic):
+        """
+        Args:
+            limits (dict): {class: most calls of that class running at once}.
+            weights (dict): {class: share of the contended capacity}.
+            capacity (int): Most calls running at once, over all classes.
+            adaptive (AdaptiveLimit, optional): Replaces `capacity` with an adaptive limit.
+        """
+        self._capacity = capacity
+        self.adaptive = adaptive
+        self.clock = clock
+        self.classes = {
+            name: _PriorityClass(name, limits[name], weights.get(name, 1))
+            for name in PRIORITY_CLASSES
+        }
+        self.in_use = 0
+        self._virtual_time = 0.0
+        self._lock = threading.Lock()
+
+
+    @property
+    def capacity(self) -> int:
+        return self.adaptive.limit if self.adaptive is not None else self._capacity
+
+
+    def _tag(self, cls: _PriorityClass) -> float:
+        cls.last_tag = max(self._virtual_time, cls.last_tag) + 1 / cls.weight
+        return cls.last_tag
+
+
+    def _grant(self, cls: _PriorityClass, tag: float, waited: float) -> None:
+        cls.running += 1
+        cls.dispatched += 1
+        cls.waits.append(waited)
+        cls.max_wait = max(cls.max_wait, waited)
+        self.in_use += 1
+        self._virtual_time = max(self._virtual_time, tag)
+
+
+    def _dispatch(self) -> None:
+        """
+        Hand free slots to waiters, smallest tag first. Called with the lock held.
+        """
+        while self.in_use < self.capacity:
+            eligible = [c for c in self.classes.values() if c.queue and c.has_room]
+            if not eligible:
+                return
+            cls = min(eligible, key=lambda c: c.queue[0].tag)
+            waiter = cls.queue.popleft()
+            waiter.granted = True
+            self._grant(cls, waiter.tag, self.clock() - waiter.enqueued_at)
+            try:
+                waiter.loop.call_soon_threadsafe(_wake, waiter.future)
+            except RuntimeError:  # Its loop is closed: nobody will use the slot
+                self._release_locked(cls, dispatch=False)
+
+
+    def _release_locked(self, cls: _PriorityClass, dispatch: bool = True) -> None:
+        cls.running -= 1
+        self.in_use -= 1
+        if dispatch:
+            self._dispatch()
+
+
+    async def acquire(self, priority: str = None) -> str:
+        """
+        Wait for a slot of `priority` (default: the current priority class).
+
+        Returns:
+            str: The class the slot belongs to (pass it to release()).
+        """
+        priority = priority or current_priority()
+        cls = self.classes[priority]
+        with self._lock:
+            tag = self._tag(cls)
+            # Nobody eligible is waiting whenever a slot is free, so a free slot can be taken at once
+            if self.in_use < self.capacity and cls.has_room and not cls.queue:
+                self._grant(cls, tag, 0.0)
+                return priority
+            waiter = _Waiter(asyncio.get_running_loop(), tag, self.clock())
+            cls.queue.append(waiter)
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter.granted:
+                    self._release_locked(cls)
+                else:
+                    cls.queue.remove(waiter)
+            raise
+        return priority
+
+
+    def release(self, priority: str) -> None:
+        with self._lock:
+            self._release_locked(self.classes[priority])
+
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+
+    async def __aexit__(self, exc_type, exc, tb):
+        # The priority scope can't change inside the `async with` body
+        self.release(current_priority())
+
+
+    def record_success(self, upstream: str, seconds: float) -> None:
+        """
+        Report a successful upstream call (no-op without an adaptive limit).
+        """
+        # Calls are reported once their slot is released, so count the reporting one back in
+        if self.adaptive is not None and self.adaptive.record_success(upstream, seconds, self.in_use + 1):
+            with self._lock:
+                self._dispatch()
+
+
+    def record_failure(self, upstream: str, reason: str = 'error') -> None:
+        """
+        Report a failed (`error`), throttled (`throttled`) or rejected (`busy`) upstream call.
+        """
+        if self.adaptive is not None:
+            self.adaptive.record_failure(upstream, reason)
+
+
+    def stats(self) -> dict:
+        adaptive = self.adaptive.stats() if self.adaptive is not None else None
+        with self._lock:
+            classes = {}
+            for name, cls in self.classes.items():
+                waits = sorted(cls.waits)
+                classes[name] = {
+                    'limit': cls.limit,
+                    'weight': cls.weight,
+                    'running': cls.running,
+                    'queued': len(cls.queue),
+                    'dispatched': cls.dispatched,
+                    'wait_ms': {
+                        'avg': round(sum(waits) / len(waits) * 1000, 1) if waits else 0.0,
+                        'p95': round(waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000, 1) if waits else 0.0,
+                        'max': round(cls.max_wait * 1000, 1),
+                    },
+                }
+            return {'capacity': self.capacity, 'in_use': self.in_use, 'classes': classes, 'adaptive': adaptive}
@@ -0,0 +1,103 @@
+import asyncio
+import concurrent.futures
+import logging
+import threading
+
+logger = logging.getLogger('seekbeat')
+
+
+
+class _LeaderCancelled(Exception):
+    """
+    Raised to followers when the call they were waiting on was cancelled.
+    """
+
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls into a single in-flight execution.
+
+    The first caller for a key (the leader) runs the work; every caller that
+    arrives while it is running (a follower) waits for the same outcome, result
+    or error. Outcomes are published on a concurrent.futures.Future, so followers
+    may live on other event loops/threads (e.g. one loop per async_to_sync request).
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+        self.leader_cancellations = 0
+
+
+    async def do(self, key: str, fn):
+        """
+        Run `fn()` for `key`, or join the call already in flight for it.
+
+        Args:
+            key (str): Identity of the call.
+            fn (callable): Zero-argument callable returning a coroutine.
+
+        Returns:
+            Whatever the leading call returned (or raises what it raised).
+        """
+        while True:
+            with self._lock:
+                future = self._calls.get(key)
+                leader = future is None
+                if leader:
+                    future = concurrent.futures.Future()
+                    self._calls[key] = future
+                    self.leaders += 1
+                else:
+                    self.coalesced += 1
+
+            if leader:
+                return await self._lead(key, future, fn)
+
+            try:
+                # Shielded so a follower giving up doesn't cancel the shared call.
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except _LeaderCancelled:
+                logger.debug("Single-flight leader for key=%s was cancelled; retrying", key)
+
+
+    async def _lead(self, key: str, future: concurrent.futures.Future, fn):
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            with self._lock:
+                self.leader_cancellations += 1
+            self._finish(key, future, exception=_LeaderCancelled())
+            raise
+        except BaseException as e:
+            self._finish(key, future, exception=e)
+            raise
+        self._finish(key, future, result=result)
+        return result
+
+
+    def _finish(self, key: str, future: concurrent.futures.Future, result=None, exception=None) -> None:
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+
+
+    def stats(self) -> dict:
+        """
+        Coalescing counters: executions (leaders) vs. calls that piggy-backed on them.
+        """
+        calls = self.leaders + self.coalesced
+        return {
+            'in_flight': len(self._calls),
+            'executions': self.leaders,
+            'coalesced': self.coalesced,
+            'leader_cancellations': self.leader_cancellations,
+            'coalescing_ratio': round(self.coalesced / calls, 4) if calls else 0.0,
+        }
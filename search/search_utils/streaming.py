@@ -0,0 +1,177 @@
+import asyncio
+import json
+import time
+
+from django.http import StreamingHttpResponse
+
+
+STREAM_FORMATS = ('ndjson', 'sse')
+
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'sse': 'text/event-stream',
+}
+
+
+
+def encode_frame(payload: dict, fmt: str, event: str = 'result') -> bytes:
+    """
+    Encode one frame as an NDJSON line or a Server-Sent Event.
+    """
+    data = json.dumps(payload, ensure_ascii=False, default=str)
+    if fmt == 'sse':
+        return f"event: {event}\ndata: {data}\n\n".encode('utf-8')
+    return f"{data}\n".encode('utf-8')
+
+
+
+async def bulk_frames(blocks, fmt: str):
+    """
+    Encode the blocks of SearchEngine.bulk_search_stream, followed by a summary frame.
+
+    Args:
+        blocks: Async iterator of per-term result blocks.
+        fmt (str): 'ndjson' or 'sse'.
+
+    Yields:
+        bytes: Encoded frames.
+    """
+    started = time.monotonic()
+    terms = errors = 0
+    async for block in blocks:
+        terms += 1
+        errors += 'error' in block
+        yield encode_frame(block, fmt)
+
+    summary = {
+        'terms': terms,
+        'succeeded': terms - errors,
+        'failed': errors,
+        'elapsed_ms': round((time.monotonic() - started) * 1000),
+    }
+    if fmt == 'sse':
+        yield encode_frame(summary, fmt, event='summary')
+    else:
+        yield encode_frame({'summary': summary}, fmt)
+
+
+
+async def federated_frames(blocks, fmt: str):
+    """
+    Encode the blocks of SearchEngine.federated_search (one per source, in the
+    order they answer), followed by a summary frame.
+
+    Yields:
+        bytes: Encoded frames.
+    """
+    started = time.monotonic()
+    counts, failed, deduplicated = {}, [], 0
+    async for block in blocks:
+        counts[block['source']] = block['count']
+        deduplicated += block.get('deduplicated', 0)
+        if 'error' in block:
+            failed.append(block['source'])
+        yield encode_frame(block, fmt)
+
+    summary = {
+        'sources': counts,
+        'failed': failed,
+        'deduplicated': deduplicated,
+        'elapsed_ms': round((time.monotonic() - started) * 1000),
+    }
+    if fmt == 'sse':
+        yield encode_frame(summary, fmt, event='summary')
+    else:
+        yield encode_frame({'summary': summary}, fmt)
+
+
+
+async def playlist_frames(pages, fmt: str):
+    """
+    Encode the pages of SearchEngine.playlist_pages: each entry as its own frame,
+    then, after every page, a cursor frame to resume from, and finally a summary.
+    An error stops the stream with an error frame.
+
+    Yields:
+        bytes: Encoded frames.
+    """
+    started = time.monotonic()
+    entries = 0
+    complete = False
+    async for page in pages:
+        if 'results' not in page:
+            yield encode_frame(page, fmt, event='error')
+            break
+        for entry in page['results']:
+            entries += 1
+            yield encode_frame(entry, fmt)
+        yield encode_frame({'next_cursor': page['next_cursor']}, fmt, event='cursor')
+        complete = page['next_cursor'] is None
+
+    summary = {'entries': entries, 'complete': complete, 'elapsed_ms': round((time.monotonic() - started) * 1000)}
+    if fmt == 'sse':
+        yield encode_frame(summary, fmt, event='summary')
+    else:
+        yield encode_frame({'summary': summary}, fmt)
+
+
+
+async def job_frames(job, fmt: str, poll_seconds: float = 0.5):
+    """
+    Encode a search job's blocks as they complete (completion order, including
+    those finished before the stream was opened), then its summary frame once
+    the job is over.
+
+    Args:
+        job (BulkJob): The job to follow.
+        fmt (str): 'ndjson' or 'sse'.
+        poll_seconds (float): How often to check the job for new blocks.
+    """
+    position = 0
+    while True:
+        job = job.latest()  # Jobs run by another worker are followed through their snapshots
+        finished = job.finished  # Read first, so no block recorded before the end is missed
+        blocks = job.completed_since(position)
+        position += len(blocks)
+        for block in blocks:
+            yield encode_frame(block, fmt)
+        if finished:
+            break
+        await asyncio.sleep(poll_seconds)
+
+    if fmt == 'sse':
+        yield encode_frame(job.summary(), fmt, event='summary')
+    else:
+        yield encode_frame({'summary': job.summary()}, fmt)
+
+
+
+def iterate_in_new_loop(agen):
+    """
+    Drive an async generator from synchronous code (WSGI streaming responses).
+
+    A private event loop is kept for the life of the generator so tasks it starts
+    keep running between chunks.
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(agen.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        loop.run_until_complete(agen.aclose())
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+
+
+
+def streaming_response(frames, fmt: str) -> StreamingHttpResponse:
+    """
+    Wrap encoded frames (sync or async iterator) in a non-buffered streaming response.
+    """
+    response = StreamingHttpResponse(frames, content_type=CONTENT_TYPES[fmt])
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Tell nginx not to buffer the stream
+    return response
@@ -0,0 +1,151 @@
+import bisect
+import re
+import threading
+import unicodedata
+
+
+# Suffixes starting at the first N words of a text are indexed, so "believer"
+# finds "Imagine Dragons - Believer"
+MAX_INDEXED_WORDS = 8
+# Prefixes matching at most this many index rows are ranked by scanning them;
+# more common ones by walking the entries heaviest first
+MAX_SCAN = 2000
+MAX_TEXT_LENGTH = 200
+
+_NON_WORD = re.compile(r"[\W_]+", re.UNICODE)
+
+
+
+def normalize(text: str) -> str:
+    """
+    Case-, accent- and punctuation-insensitive form of `text` used as the index key.
+    """
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return _NON_WORD.sub(' ', text.casefold()).strip()
+
+
+
+class PrefixIndex:
+    """
+    In-memory typeahead index: a sorted array of (suffix, key) rows searched with
+    binary search, plus the entries in rank order.
+
+    Each entry is a display text with a frequency weight and the sources it came
+    from (e.g. 'query', 'bookmark', 'lan'). Adding a known text (after normalization)
+    only bumps its weight, so the suffix array is touched only for new texts. Lookups
+    return entries with a word starting with the prefix, heaviest first, ranked
+    across every match: a prefix matching up to MAX_SCAN rows has them all scored,
+    a more common one is answered by walking the entries from the heaviest down
+    until `limit` of them match (with that many matches, they come early).
+    """
+
+    def __init__(self):
+        self._rows = []       # sorted (suffix, key)
+        self._entries = {}    # key -> {'text', 'weight', 'sources'}
+        self._ranked = []     # sorted (-weight, len(text), key): best first
+        self._lock = threading.Lock()
+
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+    def _suffixes(self, key: str) -> set:
+        words = key.split(' ')
+        return {' '.join(words[i:]) for i in range(min(len(words), MAX_INDEXED_WORDS))}
+
+
+    @staticmethod
+    def _rank(key: str, entry: dict) -> tuple:
+        return (-entry['weight'], len(entry['text']), key)
+
+
+    def _unrank(self, key: str, entry: dict) -> None:
+        i = bisect.bisect_left(self._ranked, self._rank(key, entry))
+        if i < len(self._ranked) and self._ranked[i][2] == key:
+            del self._ranked[i]
+
+
+    def add(self, text: str, source: str, weight: float = 1) -> None:
+        """
+        Add `weight` to `text` (inserting it if new) and tag it with `source`.
+        """
+        text = (text or '').strip()[:MAX_TEXT_LENGTH]
+        key = normalize(text)
+        if not key:
+            return
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = {'text': text, 'weight': weight, 'sources': {source: weight}}
+                for suffix in self._suffixes(key):
+                    bisect.insort(self._rows, (suffix, key))
+                bisect.insort(self._ranked, self._rank(key, entry))
+                return
+            self._unrank(key, entry)
+            entry['weight'] += weight
+            entry['sources'][source] = entry['sources'].get(source, 0) + weight
+            bisect.insort(self._ranked, self._rank(key, entry))
+
+
+    def remove(self, text: str, source: str, weight: float = None) -> None:
+        """
+        Take back `weight` (default: all) contributed by `source`; drop the text once
+        nothing is left.
+        """
+        key = normalize(text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or source not in entry['sources']:
+                return
+            taken = entry['sources'][source] if weight is None else min(weight, entry['sources'][source])
+            self._unrank(key, entry)
+            entry['sources'][source] -= taken
+            entry['weight'] -= taken
+            if entry['sources'][source] <= 0:
+                del entry['sources'][source]
+            if entry['sources']:
+                bisect.insort(self._ranked, self._rank(key, entry))
+                return
+
+            del self._entries[key]
+            for suffix in self._suffixes(key):
+                i = bisect.bisect_left(self._rows, (suffix, key))
+                if i < len(self._rows) and self._rows[i] == (suffix, key):
+                    del self._rows[i]
+
+
+    def clear(self) -> None:
+        with self._lock:
+            self._rows.clear()
+            self._entries.clear()
+            self._ranked.clear()
+
+
+    def lookup(self, prefix: str, limit: int = 8) -> list[dict]:
+        """
+        Entries having a word that starts with `prefix`, by descending weight.
+
+        Returns:
+            list[dict]: [{'text', 'score', 'sources'}, ...]
+        """
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        with self._lock:
+            start = bisect.bisect_left(self._rows, (prefix,))
+            end = bisect.bisect_left(self._rows, (prefix + '\U0010ffff',), start)
+            if end - start <= MAX_SCAN:
+                keys = {key for _, key in self._rows[start:end]}
+                best = sorted(keys, key=lambda key: self._rank(key, self._entries[key]))[:limit]
+            else:
+                best = []
+                for _, _, key in self._ranked:
+                    if any(suffix.startswith(prefix) for suffix in self._suffixes(key)):
+                        best.append(key)
+                        if len(best) == limit:
+                            break
+
+            entries = [self._entries[key] for key in best]
+            return [{'text': e['text'], 'score': e['weight'], 'sources': sorted(e['sources'])} for e in entries]
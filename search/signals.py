@@ -0,0 +1,47 @@
+"""
+Keeps the suggestion index (search/suggestions.py) in step with bookmarks and LAN songs.
+Connected in SearchConfig.ready().
+"""
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from chrome_extension.models import BookmarkedVideo
+from desktop_lan_connect.models import SongProfile
+from .suggestions import suggestions
+
+
+
+@receiver(pre_save, sender=BookmarkedVideo)
+@receiver(pre_save, sender=SongProfile)
+def remember_previous_text(sender, instance, **kwargs):
+    # A renamed bookmark/song must give up the suggestion it contributed before
+    instance._suggest_previous = None
+    if suggestions.built and instance.pk:
+        instance._suggest_previous = sender.objects.filter(pk=instance.pk).first()
+
+
+@receiver(post_save, sender=BookmarkedVideo)
+def bookmark_saved(sender, instance, **kwargs):
+    previous = getattr(instance, '_suggest_previous', None)
+    if previous is not None:
+        suggestions.remove_bookmark(previous.title)
+    suggestions.add_bookmark(instance.title)
+
+
+@receiver(post_delete, sender=BookmarkedVideo)
+def bookmark_deleted(sender, instance, **kwargs):
+    suggestions.remove_bookmark(instance.title)
+
+
+@receiver(post_save, sender=SongProfile)
+def song_saved(sender, instance, **kwargs):
+    previous = getattr(instance, '_suggest_previous', None)
+    if previous is not None:
+        suggestions.remove_song(previous.title, previous.artist)
+    suggestions.add_song(instance.title, instance.artist)
+
+
+@receiver(post_delete, sender=SongProfile)
+def song_deleted(sender, instance, **kwargs):
+    suggestions.remove_song(instance.title, instance.artist)
@@ -0,0 +1,146 @@
+"""
+Typeahead suggestions for /api/search/suggest/.
+
+The prefix index (search_utils/suggest_index.py) is built in the background at
+startup from past queries (QueryResult), bookmarked video titles and LAN song
+titles/artists, then kept current in memory: single searches are recorded by the
+search views, and bookmark/song changes arrive through the signals in
+search/signals.py.
+"""
+
+import logging
+import threading
+
+from django.db import connection
+
+from .search_utils.suggest_index import PrefixIndex
+
+logger = logging.getLogger('seekbeat')
+
+
+# How much one occurrence of each source counts towards a suggestion's rank
+SOURCE_WEIGHTS = {
+    'query': 1,
+    'bookmark': 3,
+    'lan': 2,
+}
+
+
+
+class Suggestions:
+    """
+    Suggestion index built off the request path, then incrementally updated.
+    """
+
+    def __init__(self):
+        self.index = PrefixIndex()
+        self.built = False
+        self._build_lock = threading.Lock()
+        self._builder = None
+        self.lookups = 0
+
+
+    def build(self) -> None:
+        """
+        (Re)build the index from the database.
+        """
+        from chrome_extension.models import BookmarkedVideo
+        from desktop_lan_connect.models import SongProfile
+        from .models import QueryResult
+
+        with self._build_lock:
+            self.index.clear()
+            for query, hits in QueryResult.objects.exclude(query__startswith='http').values_list('query', 'hits'):
+                self.index.add(query, 'query', SOURCE_WEIGHTS['query'] * max(hits, 1))
+            for title in BookmarkedVideo.objects.values_list('title', flat=True):
+                self.index.add(title, 'bookmark', SOURCE_WEIGHTS['bookmark'])
+            for title, artist in SongProfile.objects.values_list('title', 'artist'):
+                self._add_song(title, artist)
+            self.built = True
+            logger.info("Suggestion index built with %d entries", len(self.index))
+
+
+    def ensure_built(self) -> None:
+        if not self.built:
+            self.build()
+
+
+    def build_in_background(self) -> None:
+        """
+        Start building the index on a daemon thread, unless it's built or being built.
+        """
+        with self._build_lock:
+            if self.built or (self._builder is not None and self._builder.is_alive()):
+                return
+            self._builder = threading.Thread(target=self._build_in_background, name='seekbeat-suggest-build', daemon=True)
+            self._builder.start()
+
+
+    def _build_in_background(self) -> None:
+        try:
+            self.build()
+        except Exception:
+            logger.exception("Suggestion index build failed")
+        finally:
+            connection.close()  # This thread's own connection
+
+
+    def suggest(self, prefix: str, limit: int = 8) -> list[dict]:
+        """
+        Suggestions for `prefix`; none until the index is built, so no keystroke waits on the database.
+        """
+        self.lookups += 1
+        if not self.built:
+            self.build_in_background()
+            return []
+        return self.index.lookup(prefix, limit)
+
+
+    def record_query(self, search_term: dict) -> None:
+        """
+        Count a classified single search. Links aren't worth suggesting.
+        Before the first build this is a no-op: the build reads past queries anyway.
+        """
+        if self.built and search_term.get('type') == 'search':
+            self.index.add(search_term['query'], 'query', SOURCE_WEIGHTS['query'])
+
+
+    def add_bookmark(self, title: str) -> None:
+        if self.built:
+            self.index.add(title, 'bookmark', SOURCE_WEIGHTS['bookmark'])
+
+
+    def remove_bookmark(self, title: str) -> None:
+        if self.built:
+            self.index.remove(title, 'bookmark', SOURCE_WEIGHTS['bookmark'])
+
+
+    def _add_song(self, title: str, artist: str | None) -> None:
+        for text in (title, artist):
+            if text:
+                self.index.add(text, 'lan', SOURCE_WEIGHTS['lan'])
+
+
+    def add_song(self, title: str, artist: str | None) -> None:
+        if self.built:
+            self._add_song(title, artist)
+
+
+    def remove_song(self, title: str, artist: str | None) -> None:
+        if not self.built:
+            return
+        for text in (title, artist):
+            if text:
+                self.index.remove(text, 'lan', SOURCE_WEIGHTS['lan'])
+
+
+    def stats(self) -> dict:
+        return {
+            'built': self.built,
+            'entries': len(self.index),
+            'lookups': self.lookups,
+        }
+
+
+
+suggestions = Suggestions()
@@ -0,0 +1,86 @@
+import asyncio
+import unittest
+
+from search.search_utils.adaptive_limit import AdaptiveLimit
+from search.search_utils.scheduler import SearchScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestAdaptiveLimit(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.limit = AdaptiveLimit(4, floor=2, ceiling=8, backoff=0.5, cooldown=1.0, clock=self.clock)
+
+    def test_grows_by_one_per_window_of_busy_successes(self):
+        for _ in range(5):  # About `limit` of them
+            self.limit.record_success('api', 0.1, in_flight=4)
+        self.assertEqual(self.limit.limit, 5)
+        for _ in range(200):
+            self.limit.record_success('api', 0.1, in_flight=8)
+        self.assertEqual(self.limit.limit, 8)  # Ceiling
+
+    def test_does_not_grow_while_mostly_idle(self):
+        for _ in range(20):
+            self.limit.record_success('api', 0.1, in_flight=1)
+        self.assertEqual(self.limit.limit, 4)
+
+    def test_failures_halve_the_limit_once_per_cooldown(self):
+        self.limit.record_failure('api', 'throttled')
+        self.limit.record_failure('api', 'throttled')
+        self.assertEqual(self.limit.limit, 2)
+        self.assertEqual(self.limit.stats()['decreases'], {'throttled': 1})
+        self.clock.now = 5
+        self.limit.record_failure('api')
+        self.assertEqual(self.limit.limit, 2)  # Floor
+
+    def test_slow_calls_count_against_their_own_upstream(self):
+        self.limit.record_success('api', 0.1, in_flight=1)
+        self.limit.record_success('yt_dlp_full', 3.0, in_flight=1)  # Slow for the API, usual for yt-dlp
+        self.assertEqual(self.limit.limit, 4)
+        self.limit.record_success('api', 0.5, in_flight=1)
+        self.assertEqual(self.limit.limit, 2)
+        self.assertEqual(self.limit.stats()['decreases'], {'slow': 1})
+
+    def test_lasting_latency_shift_becomes_the_new_baseline(self):
+        for _ in range(20):
+            self.limit.record_success('api', 0.3, in_flight=4)
+        for _ in range(500):
+            self.clock.now += 0.5
+            self.limit.record_success('api', 0.8, in_flight=4)
+        self.assertAlmostEqual(self.limit.stats()['usual_latency_ms']['api'], 800, delta=1)
+        self.assertLessEqual(self.limit.stats()['decreases']['slow'], 2)
+        self.assertEqual(self.limit.limit, 8)  # Grew back once 0.8s was normal
+
+
+class TestSchedulerFollowsAdaptiveLimit(unittest.TestCase):
+
+    def test_capacity_tracks_the_limit_and_growth_admits_waiters(self):
+        adaptive = AdaptiveLimit(1, floor=1, ceiling=3)
+        scheduler = SearchScheduler({'interactive': 5, 'bulk': 5, 'background': 5}, {}, capacity=10, adaptive=adaptive)
+        self.assertEqual(scheduler.capacity, 1)
+
+        async def run():
+            await scheduler.acquire()
+            waiter = asyncio.create_task(scheduler.acquire())
+            await asyncio.sleep(0)
+            self.assertFalse(waiter.done())
+            scheduler.record_success('api', 0.1)  # Busy at the limit: grows to 2
+            await asyncio.wait_for(waiter, 1)
+            scheduler.release('interactive')
+            scheduler.release('interactive')
+
+        asyncio.run(run())
+        stats = scheduler.stats()
+        self.assertEqual((stats['capacity'], stats['adaptive']['limit'], stats['in_use']), (2, 2, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
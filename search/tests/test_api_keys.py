@@ -0,0 +1,73 @@
+import datetime
+import unittest
+from unittest.mock import MagicMock
+
+from search.search_utils.api_keys import ApiKeyPool, QUOTA_TZ, SEARCH_LIST_UNITS, quota_reason
+
+
+class TestApiKeyPool(unittest.TestCase):
+
+    def setUp(self):
+        self.now = datetime.datetime(2025, 6, 1, 12, 0, tzinfo=QUOTA_TZ)
+        self.clock = 0.0
+        self.pool = ApiKeyPool(
+            {'interactive': ['int-key-1', 'int-key-2'], 'bulk': ['bulk-key-1']},
+            daily_quota=1000, interactive_reserve=300, now=lambda: self.now, clock=lambda: self.clock,
+        )
+
+    def test_from_env_values_splits_comma_separated_keys(self):
+        pool = ApiKeyPool.from_env_values("a, b,", None)
+        self.assertEqual(len(pool), 2)
+        self.assertEqual(pool.acquire('bulk', 1), 'a')
+
+    def test_traffic_classes_use_their_own_keys(self):
+        self.assertIn(self.pool.acquire('interactive', SEARCH_LIST_UNITS), ('int-key-1', 'int-key-2'))
+        self.assertEqual(self.pool.acquire('bulk', SEARCH_LIST_UNITS), 'bulk-key-1')
+
+    def test_picks_key_with_most_quota_left(self):
+        self.pool.charge('int-key-1', 500)
+        self.assertEqual(self.pool.acquire('interactive', SEARCH_LIST_UNITS), 'int-key-2')
+
+    def test_bulk_borrows_interactive_keys_above_reserve_only(self):
+        self.pool.mark_exhausted('bulk-key-1')
+        self.assertIsNotNone(self.pool.acquire('bulk', SEARCH_LIST_UNITS))
+
+        self.pool.charge('int-key-1', 650)
+        self.pool.charge('int-key-2', 650)
+        self.assertIsNone(self.pool.acquire('bulk', SEARCH_LIST_UNITS))
+        self.assertIsNotNone(self.pool.acquire('interactive', SEARCH_LIST_UNITS))
+
+    def test_interactive_borrows_bulk_keys(self):
+        self.pool.mark_exhausted('int-key-1')
+        self.pool.mark_exhausted('int-key-2')
+        self.assertEqual(self.pool.acquire('interactive', SEARCH_LIST_UNITS), 'bulk-key-1')
+
+    def test_rate_limited_key_cools_down(self):
+        self.pool.mark_exhausted('bulk-key-1', 'userRateLimitExceeded')
+        self.assertNotEqual(self.pool.acquire('bulk', 1), 'bulk-key-1')
+        self.clock += 61
+        self.assertEqual(self.pool.acquire('bulk', 1), 'bulk-key-1')
+
+    def test_quota_resets_at_pacific_midnight(self):
+        self.pool.mark_exhausted('bulk-key-1')
+        self.pool.charge('int-key-1', 1000)
+        self.now = datetime.datetime(2025, 6, 2, 0, 1, tzinfo=QUOTA_TZ)
+
+        self.assertEqual(self.pool.acquire('bulk', SEARCH_LIST_UNITS), 'bulk-key-1')
+        stats = self.pool.stats()
+        self.assertEqual(stats['remaining'], {'interactive': 2000, 'bulk': 1000})
+        self.assertTrue(stats['resets_at'].startswith('2025-06-03T00:00:00'))
+
+    def test_stats_mask_keys(self):
+        labels = [k['key'] for k in self.pool.stats()['keys']]
+        self.assertEqual(labels, ['…ey-1', '…ey-2', '…ey-1'])
+
+    def test_quota_reason(self):
+        response = MagicMock(status_code=403, json=MagicMock(return_value={'error': {'errors': [{'reason': 'quotaExceeded'}]}}))
+        self.assertEqual(quota_reason(response), 'quotaExceeded')
+        response.json.return_value = {'error': {'errors': [{'reason': 'forbidden'}]}}
+        self.assertIsNone(quota_reason(response))
+        self.assertIsNone(quota_reason(MagicMock(status_code=500)))
+
+
+# Use this to run it:    python manage.py test search.tests.test_api_keys
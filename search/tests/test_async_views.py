@@ -0,0 +1,73 @@
+import json
+
+from django.core.cache import cache
+from django.test import TestCase, AsyncRequestFactory
+from unittest.mock import patch, AsyncMock
+
+from search import async_views
+from search.search_requests import TIMEOUT_ERROR
+
+
+class AsyncSearchViewTests(TestCase):
+    def setUp(self):
+        self.factory = AsyncRequestFactory()
+        cache.clear()
+
+    @patch("search.search_requests.engine.regular_search_with_yt_api", new_callable=AsyncMock)
+    async def test_search_success(self, mock_search):
+        mock_search.return_value = [{"title": "Test Song", "webpage_url": "https://yt.com/video"}]
+
+        response = await async_views.search_view(self.factory.get("/api/search/", {"query": "Man of Steel"}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content), mock_search.return_value)
+        self.assertEqual(mock_search.await_args.args[0], {"type": "search", "query": "Man of Steel"})
+
+    @patch("search.search_requests.engine.regular_search_with_yt_api", new_callable=AsyncMock)
+    async def test_search_not_modified(self, mock_search):
+        mock_search.return_value = [{"title": "Test Song", "webpage_url": "https://yt.com/video"}]
+
+        response = await async_views.search_view(self.factory.get("/api/search/", {"query": "Believer"}))
+        self.assertIn("max-age=300", response["Cache-Control"])
+        response = await async_views.search_view(
+            self.factory.get("/api/search/", {"query": "Believer"}, headers={"If-None-Match": response["ETag"]})
+        )
+        self.assertEqual(response.status_code, 304)
+
+    async def test_search_missing_query(self):
+        response = await async_views.search_view(self.factory.get("/api/search/"))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("error", json.loads(response.content))
+
+    @patch("search.search_requests.engine.regular_search_with_yt_api", new_callable=AsyncMock)
+    async def test_search_rate_limited(self, mock_search):
+        mock_search.return_value = []
+        for _ in range(25):
+            response = await async_views.search_view(self.factory.get("/api/search/", {"query": "x"}))
+            self.assertEqual(response.status_code, 200)
+        response = await async_views.search_view(self.factory.get("/api/search/", {"query": "x"}))
+        self.assertEqual(response.status_code, 403)
+
+    @patch("search.search_requests.engine.bulk_search", new_callable=AsyncMock)
+    async def test_bulk_search_success(self, mock_bulk):
+        mock_bulk.return_value = [{"search_term": {"type": "search", "query": "Adele Hello"}, "results": [], "count": 0}]
+
+        response = await async_views.bulk_search_view(self.factory.get("/api/search/bulk/", {"queries": "Adele Hello, ,"}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)[0]["search_term"]["query"], "Adele Hello")
+        self.assertEqual(len(mock_bulk.await_args.kwargs["search_terms"]), 1)
+
+    async def test_bulk_search_no_queries(self):
+        response = await async_views.bulk_search_view(self.factory.get("/api/search/bulk/"))
+        self.assertEqual(response.status_code, 400)
+
+    async def test_invalid_parameters_share_the_sync_views_errors(self):
+        response = await async_views.bulk_search_view(self.factory.get("/api/search/bulk/", {"queries": "a", "timeout_ms": "soon"}))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(json.loads(response.content), {"error": TIMEOUT_ERROR})
+
+    async def test_post_not_allowed(self):
+        response = await async_views.search_view(self.factory.post("/api/search/"))
+        self.assertEqual(response.status_code, 405)
+
+
+# Use this to run it:    python manage.py test search.tests.test_async_views
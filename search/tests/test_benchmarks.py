@@ -0,0 +1,69 @@
+import asyncio
+import unittest
+
+import requests
+
+from search.benchmarks.cassette import PROFILES, SIMULATED_API_FAILURE, Cassette, CassetteMiss, Replayer
+from search.benchmarks.runner import BenchmarkRunner, compare, percentile
+from search.search_engine import SearchEngine
+
+
+class TestBenchmarkStats(unittest.TestCase):
+
+    def test_nearest_rank_percentiles(self):
+        samples = list(range(1, 101))
+        self.assertEqual(percentile(samples, 50), 50)
+        self.assertEqual(percentile(samples, 95), 95)
+        self.assertEqual(percentile(samples, 99), 99)
+        self.assertEqual(percentile([], 50), 0.0)
+
+    def test_compare_flags_regressions_past_tolerance_and_floor(self):
+        baseline = {'scenarios': {'single_search': {'p50_ms': 10.0, 'p95_ms': 0.01, 'p99_ms': 20.0, 'peak_kib': 100}}}
+        current = {'single_search': {'p50_ms': 14.0, 'p95_ms': 0.05, 'p99_ms': 10.0, 'peak_kib': 110}}
+        status = {r['metric']: r['status'] for r in compare(current, baseline, tolerance=0.25)}
+        self.assertEqual(status, {'p50_ms': 'regression', 'p95_ms': 'ok', 'p99_ms': 'improved', 'peak_kib': 'ok'})
+        self.assertEqual({r['status'] for r in compare(current, None)}, {'new'})
+        current['single_search']['iterations'] = 50  # p99 of 50 calls is the slowest one
+        self.assertNotIn('p99_ms', {r['metric'] for r in compare(current, baseline)})
+
+
+class TestReplay(unittest.TestCase):
+
+    def setUp(self):
+        self.cassette = Cassette.load()
+
+    def test_replays_api_search_with_durations(self):
+        engine = SearchEngine()
+        engine.NORMAL_API_KEY = 'test-key'
+        query = self.cassette.queries[0]
+        with Replayer(self.cassette).installed(engine):
+            results = asyncio.run(engine._api_page({'type': 'search', 'query': query}))['results']
+        self.assertEqual(len(results), 10)
+        self.assertTrue(all(isinstance(r['duration'], int) for r in results))
+
+    def test_api_down_profile_raises_the_simulated_failure(self):
+        replayer = Replayer(self.cassette, PROFILES['api-down'])
+        with self.assertRaisesRegex(Exception, SIMULATED_API_FAILURE):
+            replayer.get("https://www.googleapis.com/youtube/v3/search", params={'q': self.cassette.queries[0]})
+
+    def test_unrecorded_requests_are_misses(self):
+        with self.assertRaises(CassetteMiss):
+            self.cassette.extraction("ytsearch10:never recorded")
+        self.assertEqual(self.cassette.misses, 1)
+
+    def test_ytsearch_is_cut_to_the_requested_size(self):
+        info = self.cassette.extraction(f"ytsearch3:{self.cassette.queries[0]}")
+        self.assertEqual(len(info['entries']), 3)
+
+    def test_runner_measures_scenarios_and_restores_requests(self):
+        get = requests.get
+        results = BenchmarkRunner(self.cassette, iterations=2, alloc_iterations=1).run(['single_search', 'api_fallback'])
+        self.assertIs(requests.get, get)
+        for summary in results.values():
+            self.assertEqual(summary['errors'], 0)
+            self.assertEqual(summary['iterations'], 2)
+            self.assertGreater(summary['peak_kib'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import asyncio
+import time
+import unittest
+
+from search.search_utils.background import BackgroundLoop
+from search.search_utils.bulk_jobs import BulkJobManager, JobNotFound, TooManyJobs
+from search.search_utils.result_cache import LocalCacheBackend
+
+
+def term(query):
+    return {'type': 'search', 'query': query}
+
+
+def key(t):
+    return ('search', t['query'].casefold()), None
+
+
+class FakeSearch:
+    """
+    Stands in for SearchEngine.bulk_search_stream, recording every batch it is given.
+    """
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.batches = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, terms, max_results_per_term, deadline=None, fields=None):
+        self.batches.append([t['query'] for t in terms])
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            for index, t in enumerate(terms):
+                yield {'index': index, 'search_term': t, 'results': [{'title': t['query']}], 'count': 1}
+        finally:
+            self.in_flight -= 1
+
+
+class TestBulkJobManager(unittest.TestCase):
+
+    def setUp(self):
+        self.search = FakeSearch()
+        self.jobs = BulkJobManager(self.search, key, BackgroundLoop('test-jobs'), batch_size=3, concurrency=2)
+
+    def test_job_searches_unique_terms_in_batches(self):
+        terms = [term(q) for q in ['a', 'b', 'A', 'c', 'd', 'e', 'f', 'b']]
+        job = self.jobs.submit(terms)
+        job.future.result(timeout=5)
+
+        self.assertEqual(job.status, 'done')
+        self.assertEqual(sorted(q for batch in self.search.batches for q in batch), ['a', 'b', 'c', 'd', 'e', 'f'])
+        self.assertTrue(all(len(batch) <= 3 for batch in self.search.batches))
+        page = job.page(0, 10)
+        self.assertIsNone(page['next_offset'])
+        self.assertEqual([b['search_term']['query'] for b in page['results']], [t['query'] for t in terms])
+        self.assertEqual(job.summary()['completed'], len(terms))
+
+    def test_batches_per_job_are_limited(self):
+        self.search.delay = 0.05
+        job = self.jobs.submit([term(str(i)) for i in range(12)])
+        job.future.result(timeout=5)
+        self.assertEqual(self.search.max_in_flight, 2)
+
+    def test_pages_mark_pending_terms(self):
+        self.search.delay = 0.5
+        job = self.jobs.submit([term('a'), term('b')])
+        page = job.page(0, 1)
+        self.assertTrue(page['results'][0]['pending'])
+        self.assertEqual(page['next_offset'], 1)
+        self.jobs.cancel(job.id)
+        self.assertEqual(self.jobs.get(job.id).status, 'cancelled')
+
+    def test_too_many_active_jobs_are_refused(self):
+        self.search.delay = 0.5
+        self.jobs.max_active = 1
+        job = self.jobs.submit([term('a')])
+        with self.assertRaises(TooManyJobs):
+            self.jobs.submit([term('b')])
+        self.jobs.cancel(job.id)
+
+    def test_rejects_empty_or_oversized_jobs(self):
+        with self.assertRaises(ValueError):
+            self.jobs.submit([])
+        with self.assertRaises(ValueError):
+            self.jobs.submit([term(str(i)) for i in range(self.jobs.max_terms + 1)])
+
+    def test_finished_jobs_expire(self):
+        job = self.jobs.submit([term('a')])
+        job.future.result(timeout=5)
+        self.jobs.retention_seconds = -1
+        with self.assertRaises(JobNotFound):
+            self.jobs.get(job.id)
+
+
+
+class TestSharedJobs(unittest.TestCase):
+    """
+    Two managers sharing a store, as two gunicorn workers share the "search" cache.
+    """
+
+    def setUp(self):
+        store = LocalCacheBackend()
+        self.search = FakeSearch()
+        self.owner = BulkJobManager(self.search, key, BackgroundLoop('test-jobs-owner'), batch_size=3, store=store, publish_seconds=0.05)
+        self.other = BulkJobManager(FakeSearch(), key, BackgroundLoop('test-jobs-other'), batch_size=3, store=store, publish_seconds=0.05)
+
+    def test_other_workers_follow_the_job(self):
+        self.search.delay = 0.2
+        terms = [term(q) for q in ['a', 'b', 'c', 'd']]
+        job = self.owner.submit(terms)
+        self.assertIn(self.other.get(job.id).status, ('queued', 'running'))
+
+        job.future.result(timeout=5)
+        copy = self.other.get(job.id)
+        self.assertEqual(copy.status, 'done')
+        self.assertEqual(copy.page(0, 10), job.page(0, 10))
+        self.assertEqual(copy.summary()['completed'], 4)
+        with self.assertRaises(JobNotFound):
+            self.other.get('missing')
+
+    def test_cancel_from_another_worker_stops_the_job(self):
+        self.search.delay = 5
+        job = self.owner.submit([term('a')])
+        time.sleep(0.1)
+
+        self.assertEqual(self.other.cancel(job.id).status, 'cancelled')
+        for _ in range(50):
+            if job.finished:
+                break
+            time.sleep(0.02)
+        self.assertEqual(job.status, 'cancelled')
+        self.assertEqual(self.other.get(job.id).status, 'cancelled')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+
+from search.search_utils.circuit_breaker import CircuitBreaker, CircuitOpen, CLOSED, OPEN, HALF_OPEN
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 0.0
+        self.breaker = CircuitBreaker('test', failure_rate=0.5, slow_call_seconds=2, slow_call_rate=0.8,
+                                      min_calls=4, window=10, open_seconds=30, clock=lambda: self.now)
+
+    def call(self, ok=True, elapsed=0.1):
+        self.breaker.allow()
+        if ok:
+            self.breaker.record_success(elapsed)
+        else:
+            self.breaker.record_failure(elapsed)
+
+    def test_opens_on_failure_rate(self):
+        self.call(ok=False)
+        self.call(ok=False)
+        self.call()
+        self.assertEqual(self.breaker.state, CLOSED)  # below min_calls
+        self.call(ok=False)
+        self.assertEqual(self.breaker.state, OPEN)
+        with self.assertRaises(CircuitOpen):
+            self.breaker.allow()
+        self.assertEqual(self.breaker.stats()['rejected'], 1)
+
+    def test_opens_on_slow_calls(self):
+        for _ in range(4):
+            self.call(elapsed=5)
+        self.assertEqual(self.breaker.state, OPEN)
+
+    def test_healthy_traffic_stays_closed(self):
+        for i in range(20):
+            self.call(ok=i % 4 != 0)
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_half_open_probe_success_closes(self):
+        for _ in range(4):
+            self.call(ok=False)
+        self.now += 31
+
+        self.breaker.allow()
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        with self.assertRaises(CircuitOpen):
+            self.breaker.allow()  # only one probe at a time
+        self.breaker.record_success(0.1)
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertEqual(self.breaker.stats()['calls'], 0)
+
+    def test_half_open_probe_failure_reopens(self):
+        for _ in range(4):
+            self.call(ok=False)
+        self.now += 31
+        self.call(ok=False)
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertTrue(self.breaker.is_open)
+        self.assertEqual(self.breaker.stats()['opened'], 2)
+
+    def test_neutral_outcome_frees_probe(self):
+        for _ in range(4):
+            self.call(ok=False)
+        self.now += 31
+        self.breaker.allow()
+        self.breaker.record_neutral()
+        self.breaker.allow()
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+
+    def test_lost_probe_expires(self):
+        for _ in range(4):
+            self.call(ok=False)
+        self.now += 31
+        self.breaker.allow()  # Never reports back
+        with self.assertRaises(CircuitOpen):
+            self.breaker.allow()
+        self.now += self.breaker.probe_timeout
+        self.breaker.allow()
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+
+
+# Use this to run it:    python manage.py test search.tests.test_circuit_breaker
@@ -0,0 +1,155 @@
+import asyncio
+import time
+import unittest
+from unittest.mock import patch, AsyncMock, MagicMock
+
+import requests
+
+from search.search_engine import SearchEngine
+from search.search_utils.deadline import (
+    Deadline, DeadlineExceeded, DEADLINE_ERROR, MAX_CALL_SECONDS, MIN_CALL_SECONDS, call_timeout, deadline_scope, mark_partial,
+)
+
+
+class TestDeadline(unittest.TestCase):
+
+    def test_remaining_and_allows(self):
+        now = [100.0]
+        deadline = Deadline(2, clock=lambda: now[0])
+        self.assertTrue(deadline.allows(2))
+        now[0] += 1.5
+        self.assertFalse(deadline.allows(1))
+        now[0] += 1
+        self.assertTrue(deadline.expired)
+        self.assertEqual(deadline.remaining(), 0)
+
+    def test_child_partial_propagates_up_only(self):
+        parent = Deadline(5)
+        first, second = parent.child(), parent.child()
+        with deadline_scope(first):
+            mark_partial('durations')
+        self.assertTrue(first.partial)
+        self.assertTrue(parent.partial)
+        self.assertFalse(second.partial)
+        self.assertEqual(parent.reasons, ['durations'])
+
+    def test_call_timeout_follows_the_deadline(self):
+        self.assertEqual(call_timeout(), MAX_CALL_SECONDS)
+        self.assertIsNone(call_timeout(None))
+        with deadline_scope(Deadline(2)):
+            self.assertTrue(1.9 < call_timeout() <= 2)
+            self.assertEqual(call_timeout(1), 1)
+        with deadline_scope(Deadline(0)):
+            self.assertEqual(call_timeout(), MIN_CALL_SECONDS)
+
+
+class TestSearchDeadlines(unittest.TestCase):
+
+    @patch('search.search_engine.requests.get')
+    def test_api_retries_stop_when_budget_runs_out(self, mock_get):
+        mock_get.return_value = MagicMock(status_code=500, text='down')
+        eng = SearchEngine()
+
+        async def run():
+            with deadline_scope(Deadline(1.2)):
+                await eng._retry_request('url', {'key': 'k'}, 'foo', retries=5)
+
+        started = time.monotonic()
+        with self.assertRaises(DeadlineExceeded):
+            asyncio.run(run())
+        self.assertLess(time.monotonic() - started, 1.2)
+        self.assertEqual(mock_get.call_count, 1)  # a retry (1s sleep + attempt) wouldn't fit
+
+    @patch('search.search_engine.requests.get')
+    def test_api_call_ends_with_the_deadline(self, mock_get):
+        def hang(url, params=None, timeout=None):
+            time.sleep(timeout)  # a stalled socket, until requests gives up
+            raise requests.Timeout()
+        mock_get.side_effect = hang
+        eng = SearchEngine()
+
+        async def run():
+            with deadline_scope(Deadline(0.8)):
+                await eng._retry_request('url', {'key': 'k'}, 'foo', retries=1)
+
+        started = time.monotonic()
+        with self.assertRaises(DeadlineExceeded):
+            asyncio.run(run())  # also waits for the thread running requests.get
+        self.assertLess(time.monotonic() - started, 1.5)
+        self.assertLessEqual(mock_get.call_args.kwargs['timeout'], 0.8)
+        self.assertEqual(eng.breakers['youtube_api'].state, 'closed')
+
+    @patch.object(SearchEngine, '_api_search', new_callable=AsyncMock)
+    def test_run_with_deadline_cancels_slow_search(self, mock_api):
+        async def slow(*args):
+            await asyncio.sleep(5)
+        mock_api.side_effect = slow
+        eng = SearchEngine()
+        eng.NORMAL_API_KEY = 'key'
+
+        deadline = Deadline(0.1)
+        result = asyncio.run(eng.run_with_deadline(deadline, lambda: eng.regular_search_with_yt_api({'type': 'search', 'query': 'slow deadline'}), {'error': DEADLINE_ERROR}))
+        self.assertEqual(result, {'error': DEADLINE_ERROR})
+        self.assertTrue(deadline.partial)
+
+    @patch.object(SearchEngine, 'regular_search_with_yt_api', new_callable=AsyncMock)
+    def test_bulk_returns_finished_terms_when_deadline_passes(self, mock_api):
+        async def search(term, **kwargs):
+            await asyncio.sleep(5 if term['query'] == 'slow' else 0)
+            return [{'title': term['query']}]
+        mock_api.side_effect = search
+        eng = SearchEngine()
+
+        deadline = Deadline(0.2)
+        bulk = asyncio.run(eng.bulk_search([{'type': 'search', 'query': 'fast'}, {'type': 'search', 'query': 'slow'}], deadline=deadline))
+        self.assertEqual(bulk[0]['results'][0]['title'], 'fast')
+        self.assertEqual(bulk[1]['error'], DEADLINE_ERROR)
+        self.assertTrue(bulk[1]['partial'])
+        self.assertEqual(bulk[1]['search_term']['query'], 'slow')
+        self.assertTrue(deadline.partial)
+
+    @patch.object(SearchEngine, '_scrape_search', new_callable=AsyncMock)
+    def test_partial_results_are_not_cached(self, mock_scrape):
+        async def scrape(*args):
+            mark_partial('durations')
+            return [{'title': 'incomplete'}]
+        mock_scrape.side_effect = scrape
+        eng = SearchEngine()
+
+        async def run():
+            with deadline_scope(Deadline(5)):
+                return await eng.regular_search({'type': 'search', 'query': 'partial deadline'})
+
+        asyncio.run(run())
+        asyncio.run(run())
+        self.assertEqual(mock_scrape.call_count, 2)
+
+    @patch.object(SearchEngine, '_scrape_search', new_callable=AsyncMock)
+    def test_coalesced_caller_does_not_inherit_a_shorter_deadline(self, mock_scrape):
+        async def scrape(*args):
+            await asyncio.sleep(0.05)
+            if mock_scrape.call_count == 1:
+                mark_partial('durations')
+                return [{'title': 'incomplete', 'duration': None}]
+            return [{'title': 'complete', 'duration': 187}]
+        mock_scrape.side_effect = scrape
+        eng = SearchEngine()
+
+        async def search(deadline):
+            with deadline_scope(deadline):
+                return await eng.regular_search({'type': 'search', 'query': 'coalesced deadline'})
+
+        async def run():
+            short, normal = Deadline(0.5), Deadline(15)
+            results = await asyncio.gather(search(short), search(normal))
+            return short, normal, results
+
+        short, normal, (short_result, normal_result) = asyncio.run(run())
+        self.assertEqual(short_result[0]['title'], 'incomplete')
+        self.assertTrue(short.partial)
+        self.assertEqual(normal_result[0]['title'], 'complete')
+        self.assertFalse(normal.partial)
+        self.assertEqual(mock_scrape.call_count, 2)
+
+
+# Use this to run it:    python manage.py test search.tests.test_deadline
@@ -0,0 +1,77 @@
+import asyncio
+import unittest
+from unittest.mock import patch, MagicMock
+
+from search.search_utils.duration_resolver import DurationResolver
+from search.search_utils.result_cache import LocalCacheBackend
+
+
+def fake_videos_response(url, params=None, **kwargs):
+    """
+    Mimics videos.list: every requested ID lasts 1 minute + its position.
+    """
+    ids = params['id'].split(',')
+    resp = MagicMock(status_code=200)
+    resp.json.return_value = {
+        'items': [{'id': vid, 'contentDetails': {'duration': f'PT1M{i}S'}} for i, vid in enumerate(ids)]
+    }
+    return resp
+
+
+def parse(duration):
+    minutes, seconds = duration[2:-1].split('M')
+    return int(minutes) * 60 + int(seconds)
+
+
+class TestDurationResolver(unittest.TestCase):
+
+    def setUp(self):
+        self.resolver = DurationResolver(parse_duration=parse, store=LocalCacheBackend(), memory=LocalCacheBackend())
+
+    @patch('search.search_utils.duration_resolver.requests.get', side_effect=fake_videos_response)
+    def test_ids_are_batched_by_fifty(self, mock_get):
+        ids = [f'vid{i:08d}' for i in range(120)]
+        durations = asyncio.run(self.resolver.resolve(ids, 'key'))
+        self.assertEqual(len(durations), 120)
+        self.assertEqual(mock_get.call_count, 3)
+        self.assertEqual(len(mock_get.call_args_list[0].kwargs['params']['id'].split(',')), 50)
+
+    @patch('search.search_utils.duration_resolver.requests.get', side_effect=fake_videos_response)
+    def test_known_durations_are_never_refetched(self, mock_get):
+        asyncio.run(self.resolver.resolve(['a', 'b'], 'key'))
+        durations = asyncio.run(self.resolver.resolve(['a', 'b'], 'key'))
+        self.assertEqual(durations, {'a': 60, 'b': 61})
+        self.assertEqual(mock_get.call_count, 1)
+
+    @patch('search.search_utils.duration_resolver.requests.get')
+    def test_missing_items_map_to_none_and_are_not_stored(self, mock_get):
+        mock_get.return_value = MagicMock(status_code=200, json=MagicMock(return_value={'items': []}))
+        durations = asyncio.run(self.resolver.resolve(['gone'], 'key'))
+        self.assertEqual(durations, {'gone': None})
+        self.assertEqual(asyncio.run(self.resolver.lookup_cached(['gone'])), {})
+
+    @patch('search.search_utils.duration_resolver.requests.get', side_effect=fake_videos_response)
+    def test_batcher_pools_concurrent_participants(self, mock_get):
+        batcher = self.resolver.batcher(max_wait=5)
+
+        async def participant(ids):
+            batcher.join()
+            try:
+                await asyncio.sleep(0)
+                return await batcher.resolve(ids, 'key')
+            finally:
+                batcher.leave()
+
+        async def run():
+            return await asyncio.gather(participant(['a', 'b']), participant(['c']), participant([]))
+
+        first, second, _ = asyncio.run(run())
+        self.assertEqual(set(first), {'a', 'b'})
+        self.assertEqual(set(second), {'c'})
+        self.assertEqual(mock_get.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+    # Run with :   python manage.py test search.tests.test_duration_resolver
@@ -0,0 +1,126 @@
+import asyncio
+import concurrent.futures
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch, MagicMock
+
+from search.search_utils import extractor_pool
+from search.search_utils.extractor_pool import ExtractorPool, ExtractorPoolBusy, ExtractionError
+
+
+def fake_ydl_factory(created):
+    def factory(opts):
+        ydl = MagicMock()
+        ydl.opts = opts
+        ydl.extract_info.side_effect = lambda url, download=False: {
+            "id": url, "title": f"Title {url}", "formats": ["huge"], "entries": [{"id": "a", "formats": ["huge"]}],
+        }
+        ydl.sanitize_info.side_effect = lambda info: info
+        created.append(ydl)
+        return ydl
+    return factory
+
+
+class TestExtractorPool(unittest.TestCase):
+
+    def setUp(self):
+        extractor_pool._worker_ydls.clear()
+        self.cache_dir = tempfile.mkdtemp()
+        self.created = []
+        patcher = patch("search.search_utils.extractor_pool.yt_dlp.YoutubeDL", side_effect=fake_ydl_factory(self.created))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(extractor_pool._worker_ydls.clear)
+
+    def test_extractors_are_reused_per_option_set(self):
+        pool = ExtractorPool(workers=0, cache_dir=self.cache_dir)
+        pool.extract("one", {"quiet": True})
+        pool.extract("two", {"quiet": True})
+        pool.extract("three", {"quiet": True, "extract_flat": "in_playlist"})
+
+        self.assertEqual(len(self.created), 2)
+        self.assertEqual(self.created[0].opts["cachedir"], self.cache_dir)
+        self.assertEqual(pool.stats()["completed"], 3)
+
+    def test_keys_project_info_and_entries(self):
+        pool = ExtractorPool(workers=0, cache_dir=self.cache_dir)
+        info = pool.extract("one", {}, keys=("id", "title"))
+        self.assertEqual(info, {"id": "one", "title": "Title one", "entries": [{"id": "a"}]})
+
+    def test_failures_are_counted_and_raised(self):
+        pool = ExtractorPool(workers=0, cache_dir=self.cache_dir)
+        with patch("search.search_utils.extractor_pool._worker_extract", side_effect=RuntimeError("boom")):
+            with self.assertRaises(RuntimeError):
+                pool.extract("one", {})
+        self.assertEqual(pool.stats()["failed"], 1)
+        self.assertEqual(pool.stats()["pending"], 0)
+
+    def test_ytdlp_errors_become_picklable(self):
+        pool = ExtractorPool(workers=0, cache_dir=self.cache_dir)
+        pool.extract("warm", {})
+        self.created[0].extract_info.side_effect = ValueError("unavailable video")
+        with self.assertRaises(ExtractionError) as ctx:
+            pool.extract("one", {})
+        self.assertIn("unavailable video", str(ctx.exception))
+
+    def test_full_queue_rejects_new_jobs(self):
+        pool = ExtractorPool(workers=1, max_queue=1, cache_dir=self.cache_dir)
+        blocked = concurrent.futures.Future()
+        executor = MagicMock()
+        executor.submit.return_value = blocked
+        pool._executor = executor
+
+        first = pool.submit("one", {})
+        with self.assertRaises(ExtractorPoolBusy):
+            pool.submit("two", {})
+        self.assertEqual(pool.stats()["rejected"], 1)
+
+        blocked.set_result(({"id": "one"}, 10.0))
+        self.assertEqual(first.result(), {"id": "one"})
+        self.assertEqual(pool.stats()["pending"], 0)
+
+    def test_timed_out_extraction_cancels_its_queued_job(self):
+        pool = ExtractorPool(workers=1, cache_dir=self.cache_dir)
+        queued = concurrent.futures.Future()
+        executor = MagicMock()
+        executor.submit.return_value = queued
+        pool._executor = executor
+
+        with self.assertRaises(TimeoutError):
+            pool.extract("one", {}, timeout=0.01)
+        self.assertTrue(queued.cancelled())
+        self.assertEqual(pool.stats()["pending"], 0)
+
+    def test_memory_growth_recycles_pool(self):
+        pool = ExtractorPool(workers=1, max_worker_memory_mb=100, cache_dir=self.cache_dir)
+        old = MagicMock()
+        job = concurrent.futures.Future()
+        old.submit.return_value = job
+        pool._executor = old
+
+        result = pool.submit("one", {})
+        job.set_result(({"id": "one"}, 250.0))
+
+        self.assertEqual(result.result(), {"id": "one"})
+        old.shutdown.assert_called_once_with(wait=False)
+        self.assertIsNone(pool._executor)
+        self.assertEqual(pool.stats()["recycles"], 1)
+
+    def test_aextract_runs_off_the_event_loop(self):
+        pool = ExtractorPool(workers=0, cache_dir=self.cache_dir)
+        threads = []
+        self.created.clear()
+
+        def record(opts, url, keys=None):
+            threads.append(threading.get_ident())
+            return {"id": url}, None
+
+        with patch("search.search_utils.extractor_pool._worker_extract", side_effect=record):
+            info = asyncio.run(pool.aextract("one", {}))
+
+        self.assertEqual(info, {"id": "one"})
+        self.assertNotEqual(threads[0], threading.get_ident())
+
+
+# Use this to run it:    python manage.py test search.tests.test_extractor_pool
@@ -0,0 +1,79 @@
+import asyncio
+import unittest
+from unittest.mock import patch, AsyncMock
+
+from search.search_engine import SearchEngine
+from search.search_utils.hedging import Hedger
+
+
+def call(value, delay=0.0, error=None):
+    async def run():
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return value
+    return run
+
+
+class TestHedger(unittest.TestCase):
+
+    def setUp(self):
+        self.hedger = Hedger(percentile=90, min_samples=5, min_delay=0.01, max_delay=1)
+        for _ in range(5):
+            self.hedger.record(0.02)
+
+    def test_no_hedging_without_enough_samples(self):
+        hedger = Hedger(min_samples=5)
+        self.assertIsNone(hedger.delay())
+        result = asyncio.run(hedger.run(call('api', 0.05), call('ytdlp')))
+        self.assertEqual(result, 'api')
+        self.assertEqual(hedger.stats()['hedged'], 0)
+
+    def test_slow_primary_loses_to_alternate(self):
+        result = asyncio.run(self.hedger.run(call('api', 0.5), call('ytdlp', 0.05)))
+        self.assertEqual(result, 'ytdlp')
+        stats = self.hedger.stats()
+        self.assertEqual((stats['hedged'], stats['alternate_wins'], stats['primary_wins']), (1, 1, 0))
+        self.assertEqual(stats['hedge_rate'], 1.0)
+
+    def test_primary_can_still_win_after_hedging(self):
+        result = asyncio.run(self.hedger.run(call('api', 0.05), call('ytdlp', 0.5)))
+        self.assertEqual(result, 'api')
+        self.assertEqual(self.hedger.stats()['primary_wins'], 1)
+
+    def test_invalid_alternate_waits_for_primary(self):
+        result = asyncio.run(self.hedger.run(call('api', 0.1), call([], 0.0), is_valid=bool))
+        self.assertEqual(result, 'api')
+
+    def test_primary_failure_after_hedge_returns_alternate(self):
+        result = asyncio.run(self.hedger.run(call(None, 0.05, RuntimeError('boom')), call('ytdlp', 0.1)))
+        self.assertEqual(result, 'ytdlp')
+
+    def test_fast_primary_failure_is_raised(self):
+        with self.assertRaises(RuntimeError):
+            asyncio.run(self.hedger.run(call(None, 0.0, RuntimeError('boom')), call('ytdlp')))
+
+
+class TestHedgedSearch(unittest.TestCase):
+
+    @patch.object(SearchEngine, 'regular_search', new_callable=AsyncMock)
+    @patch.object(SearchEngine, '_api_page', new_callable=AsyncMock)
+    def test_slow_api_search_is_hedged_with_ytdlp(self, mock_page, mock_search):
+        async def slow_page(*args, **kwargs):
+            await asyncio.sleep(1)
+            return {'results': [{'title': 'api'}], 'next_page_token': None}
+        mock_page.side_effect = slow_page
+        mock_search.return_value = [{'title': 'ytdlp'}]
+
+        eng = SearchEngine()
+        eng.NORMAL_API_KEY = 'key'
+        eng.hedging = True
+        eng.hedger = Hedger(min_samples=1, min_delay=0.01)
+        eng.hedger.record(0.05)
+
+        result = asyncio.run(eng.regular_search_with_yt_api({'type': 'search', 'query': 'hedged search'}))
+        self.assertEqual(result, [{'title': 'ytdlp'}])
+        self.assertEqual(eng.get_stats()['hedging']['alternate_wins'], 1)
+
+
+# Use this to run it:    python manage.py test search.tests.test_hedging
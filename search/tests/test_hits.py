@@ -0,0 +1,50 @@
+import pickle
+import unittest
+
+from search.search_utils.hits import SEARCH_FIELDS, SearchHit, serialize_hits
+
+
+THUMBNAILS = [
+    {'url': 'small', 'filesize': 10, 'height': 9, 'width': 9},
+    {'url': 'big', 'filesize': 100, 'height': 90, 'width': 90},
+]
+
+
+class TestSearchHit(unittest.TestCase):
+
+    def test_every_source_has_the_same_shape(self):
+        hits = [
+            SearchHit.from_ytdlp({'title': 'T', 'webpage_url': 'u', 'thumbnails': THUMBNAILS}),
+            SearchHit.from_flat({'title': 'T', 'url': 'u', 'channel': 'C'}),
+            SearchHit.from_api({'snippet': {'title': 'T', 'thumbnails': {'high': {'url': 'h', 'height': 1, 'width': 1}}}}, 'abcdefghijk'),
+        ]
+        for result in serialize_hits(hits):
+            self.assertEqual(tuple(result), SEARCH_FIELDS)
+
+    def test_single_video_gets_both_thumbnail_sizes(self):
+        hit = SearchHit.from_ytdlp({'title': 'T', 'webpage_url': 'u', 'thumbnail': 't', 'thumbnails': THUMBNAILS})
+        self.assertEqual((hit.largest_thumbnail, hit.smallest_thumbnail), ('big', 'small'))
+
+    def test_flat_entry_falls_back_to_url_and_channel(self):
+        hit = SearchHit.from_flat({'title': 'T', 'url': 'u', 'channel': 'C', 'thumbnails': THUMBNAILS})
+        self.assertEqual((hit.webpage_url, hit.uploader, hit.thumbnail), ('u', 'C', 'big'))
+        self.assertIsNone(hit.upload_date)
+
+    def test_api_hit_skips_unrequested_thumbnail_scans(self):
+        item = {'snippet': {'title': 'T', 'thumbnails': {}}}  # Scanning these would raise
+        result = SearchHit.from_api(item, 'abcdefghijk', fields=('title', 'webpage_url')).to_dict(('title', 'webpage_url'))
+        self.assertEqual(result, {'title': 'T', 'webpage_url': 'https://www.youtube.com/watch?v=abcdefghijk'})
+
+    def test_sparse_serialization(self):
+        hit = SearchHit(title='T', duration=3)
+        self.assertEqual(hit.to_dict(('duration',)), {'duration': 3})
+        self.assertEqual(serialize_hits([hit], ['title']), [{'title': 'T'}])
+
+    def test_hits_have_no_instance_dict_and_pickle(self):
+        hit = SearchHit(title='T')
+        self.assertFalse(hasattr(hit, '__dict__'))
+        self.assertEqual(pickle.loads(pickle.dumps(hit)).to_dict(), hit.to_dict())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+
+from search.search_utils.http_cache import bulk_lifetime, content_etag, result_lifetime
+from search.search_utils.result_cache import SearchResultCache
+
+
+class TestHttpCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = SearchResultCache(ttl=300, negative_ttl=30)
+
+    def test_lifetimes_follow_the_result_cache(self):
+        self.assertEqual(result_lifetime([{"title": "Numb"}], self.cache), 300)
+        self.assertEqual(result_lifetime([], self.cache), 30)
+        self.assertEqual(result_lifetime({"error": SearchResultCache.NO_RESULTS_ERROR}, self.cache), 30)
+        self.assertEqual(result_lifetime({"results": [{"title": "Numb"}], "next_cursor": None}, self.cache), 300)
+        self.assertIsNone(result_lifetime({"error": "Search timed out"}, self.cache))
+
+    def test_bulk_lifetime_is_the_shortest_term(self):
+        blocks = [{"results": [{"title": "Numb"}]}, {"results": []}]
+        self.assertEqual(bulk_lifetime(blocks, self.cache), 30)
+        self.assertIsNone(bulk_lifetime(blocks + [{"error": "boom", "count": 0}], self.cache))
+        self.assertIsNone(bulk_lifetime([], self.cache))
+
+    def test_etag_is_strong_and_sensitive_to_order(self):
+        etag = content_etag([{"title": "Numb", "duration": 187}])
+        self.assertTrue(etag.startswith('"') and etag.endswith('"'))
+        self.assertEqual(etag, content_etag([{"title": "Numb", "duration": 187}]))
+        self.assertNotEqual(etag, content_etag([{"duration": 187, "title": "Numb"}]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+import asyncio
+import datetime
+from unittest.mock import patch, MagicMock
+
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+from search.models import QueryResult, VideoMetadata
+from search.search_engine import SearchEngine
+from search.search_utils.metadata_store import DurationStore, MetadataStore, video_id_for
+
+
+def result(i, **overrides):
+    return {
+        'title': f'Song {i}', 'duration': 200 + i, 'uploader': 'Artist', 'thumbnail': f'https://i.ytimg.com/{i}.jpg',
+        'webpage_url': f'https://www.youtube.com/watch?v=video{i:06d}', 'upload_date': '20250101',
+        'largest_thumbnail': None, 'smallest_thumbnail': None, **overrides,
+    }
+
+
+class TestMetadataStore(TransactionTestCase):
+
+    def setUp(self):
+        self.store = MetadataStore(fresh_seconds=60, max_stale_seconds=3600)
+
+    def test_video_id_for(self):
+        self.assertEqual(video_id_for('https://youtu.be/dQw4w9WgXcQ?t=3'), 'dQw4w9WgXcQ')
+        self.assertEqual(video_id_for('https://www.youtube.com/shorts/XU70gQ1GY-I'), 'XU70gQ1GY-I')
+        self.assertTrue(video_id_for('https://example.com/a').startswith('url:'))
+
+    def test_save_and_lookup_keep_order(self):
+        self.store.save('seekbeat:search:ytdlp:abc', 'songs', [result(2), result(1)])
+        results, age = self.store.lookup('seekbeat:search:ytdlp:abc')
+        self.assertEqual([r['title'] for r in results], ['Song 2', 'Song 1'])
+        self.assertLess(age, 60)
+        self.assertEqual(QueryResult.objects.get().hits, 1)
+        self.assertEqual(QueryResult.objects.get().source, 'ytdlp')
+
+    def test_missing_fields_do_not_overwrite_stored_ones(self):
+        self.store.save('seekbeat:search:ytdlp:full', 'songs', [result(1)])
+        self.store.save('seekbeat:search:ytdlp:flat', 'songs', [result(1, upload_date=None, title='Song 1 (new)')])
+        video = VideoMetadata.objects.get()
+        self.assertEqual(video.upload_date, '20250101')
+        self.assertEqual(video.title, 'Song 1 (new)')
+
+    def test_duration_written_between_read_and_insert_is_merged(self):
+        in_bulk = VideoMetadata.objects.in_bulk
+
+        def read_then_race(*args, **kwargs):
+            found = in_bulk(*args, **kwargs)
+            # The duration writer inserts its row after save() has looked
+            store = DurationStore(flush_seconds=60)
+            store.set_many({'video000001': 999})
+            store.flush()
+            return found
+
+        with patch.object(VideoMetadata.objects, 'in_bulk', side_effect=read_then_race):
+            self.store.save('seekbeat:search:ytdlp:race', 'songs', [result(1, duration=None)])
+
+        row = VideoMetadata.objects.get()
+        self.assertEqual((row.title, row.uploader, row.duration), ('Song 1', 'Artist', 999))
+
+    def test_errors_and_empty_results_are_not_stored(self):
+        self.assertFalse(self.store.save('seekbeat:search:ytdlp:e', 'x', {'error': 'boom'}))
+        self.assertFalse(self.store.save('seekbeat:search:ytdlp:e', 'x', []))
+        self.assertIsNone(self.store.lookup('seekbeat:search:ytdlp:e'))
+
+    def test_entries_past_max_stale_are_ignored(self):
+        self.store.save('seekbeat:search:ytdlp:old', 'songs', [result(1)])
+        QueryResult.objects.update(fetched_at=timezone.now() - datetime.timedelta(hours=2))
+        self.assertIsNone(self.store.lookup('seekbeat:search:ytdlp:old'))
+
+    def test_hottest(self):
+        self.store.save('seekbeat:search:ytdlp:a', 'a', [result(1)])
+        self.store.save('seekbeat:search:ytdlp:b', 'b', [result(2)])
+        QueryResult.objects.filter(query='b').update(hits=5)
+        self.assertEqual([key for key, _ in self.store.hottest(1)], ['seekbeat:search:ytdlp:b'])
+
+
+class TestPersistentSearchEngine(TransactionTestCase):
+
+    def setUp(self):
+        patcher = patch('search.search_engine.SearchEngine._warm_start_in_background')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_only_persistent_engines_store_durations(self):
+        self.assertIsInstance(SearchEngine(persistent=True).duration_resolver.store, DurationStore)
+        self.assertIsNone(SearchEngine().duration_resolver.store)
+
+    @patch.object(SearchEngine, '_execute_search')
+    def test_results_survive_restart(self, mock_exec):
+        mock_exec.return_value = {'_type': 'playlist', 'entries': [result(1)]}
+        first = asyncio.run(SearchEngine(persistent=True).regular_search({'type': 'search', 'query': 'foo'}))
+
+        restarted = SearchEngine(persistent=True)
+        second = asyncio.run(restarted.regular_search({'type': 'search', 'query': 'foo'}))
+        self.assertEqual(second[0]['title'], first[0]['title'])
+        self.assertEqual(mock_exec.call_count, 1)
+        self.assertEqual(restarted.get_stats()['store']['hits'], 1)
+
+    @patch.object(SearchEngine, '_execute_search')
+    def test_stale_results_are_served_and_refreshed(self, mock_exec):
+        mock_exec.return_value = {'_type': 'playlist', 'entries': [result(1)]}
+        asyncio.run(SearchEngine(persistent=True).regular_search({'type': 'search', 'query': 'foo'}))
+        QueryResult.objects.update(fetched_at=timezone.now() - datetime.timedelta(days=1))
+
+        eng = SearchEngine(persistent=True)
+        eng.background.spawn = MagicMock()
+        stale = asyncio.run(eng.regular_search({'type': 'search', 'query': 'foo'}))
+        self.assertEqual(stale[0]['title'], 'Song 1')
+        self.assertEqual(mock_exec.call_count, 1)
+        eng.background.spawn.assert_called_once()
+        self.assertTrue(eng.background.spawn.call_args.args[0].startswith('revalidate:'))
+
+    @patch.object(SearchEngine, '_execute_search')
+    def test_warm_start_fills_result_cache(self, mock_exec):
+        mock_exec.return_value = {'_type': 'playlist', 'entries': [result(1)]}
+        asyncio.run(SearchEngine(persistent=True).regular_search({'type': 'search', 'query': 'foo'}))
+
+        eng = SearchEngine(persistent=True)
+        self.assertEqual(eng.warm_start(), 1)
+        asyncio.run(eng.regular_search({'type': 'search', 'query': 'foo'}))
+        self.assertEqual(eng.get_stats()['cache']['hits'], 1)
+        self.assertEqual(eng.get_stats()['store']['hits'], 0)
+
+
+
+class TestDurationStore(TransactionTestCase):
+
+    def test_durations_are_queued_then_written_in_one_batch(self):
+        store = DurationStore(flush_seconds=60)
+        store.set_many({'video000001': 61, 'video000002': 62})
+        self.assertFalse(VideoMetadata.objects.exists())  # Not on the caller's path
+        self.assertEqual(store.get_many(['video000001', 'unknown']), {'video000001': 61})
+
+        self.assertEqual(store.flush(), 2)
+        self.assertEqual(store.get_many(['video000001', 'video000002']), {'video000001': 61, 'video000002': 62})
+        self.assertEqual(store.stats()['queued'], 0)
+
+    def test_writer_thread_flushes_and_stops_when_idle(self):
+        store = DurationStore(flush_seconds=0.05)
+        store.set_many({'video000003': 63})
+        writer = store._writer
+        writer.join(2)
+        self.assertFalse(writer.is_alive())
+        self.assertEqual(VideoMetadata.objects.get(video_id='video000003').duration, 63)
+
+    def test_stored_videos_only_get_their_duration_set(self):
+        MetadataStore().save('seekbeat:search:api:abc', 'song', [result(1, duration=None)])
+        store = DurationStore(flush_seconds=60)
+        store.set_many({'video000001': 201})
+        store.flush()
+        row = VideoMetadata.objects.get(video_id='video000001')
+        self.assertEqual((row.title, row.duration), ('Song 1', 201))
+
+
+# Use this to run it:    python manage.py test search.tests.test_metadata_store
@@ -0,0 +1,78 @@
+import unittest
+from unittest.mock import patch
+
+from search.search_utils.result_cache import LocalCacheBackend, SearchResultCache
+
+
+class TestLocalCacheBackend(unittest.TestCase):
+
+    def test_lru_eviction(self):
+        backend = LocalCacheBackend(max_entries=2)
+        backend.set('a', 1)
+        backend.set('b', 2)
+        backend.get('a')           # 'b' is now least recently used
+        backend.set('c', 3)
+        self.assertIsNone(backend.get('b'))
+        self.assertEqual(backend.get('a'), 1)
+        self.assertEqual(backend.get('c'), 3)
+        self.assertEqual(backend.evictions, 1)
+
+    @patch('search.search_utils.result_cache.time.monotonic')
+    def test_ttl_expiry(self, mock_time):
+        mock_time.return_value = 100.0
+        backend = LocalCacheBackend()
+        backend.set('a', 1, ttl=10)
+        mock_time.return_value = 109.0
+        self.assertEqual(backend.get('a'), 1)
+        mock_time.return_value = 111.0
+        self.assertIsNone(backend.get('a'))
+        self.assertEqual(len(backend), 0)
+
+
+class TestSearchResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = SearchResultCache(backend=LocalCacheBackend())
+
+    def test_make_key_normalizes_search_terms_only(self):
+        k1 = self.cache.make_key('api', {'type': 'search', 'query': 'Adele Hello'}, max_results=10)
+        k2 = self.cache.make_key('api', {'type': 'search', 'query': 'adele hello'}, max_results=10)
+        k3 = self.cache.make_key('api', {'type': 'search', 'query': 'adele hello'}, max_results=5)
+        self.assertEqual(k1, k2)
+        self.assertNotEqual(k2, k3)
+
+        y1 = self.cache.make_key('ytdlp', {'type': 'youtube', 'query': 'https://youtu.be/abcdefghiJK'})
+        y2 = self.cache.make_key('ytdlp', {'type': 'youtube', 'query': 'https://youtu.be/ABCDEFGHIjk'})
+        self.assertNotEqual(y1, y2)
+
+    def test_store_policy(self):
+        self.assertTrue(self.cache.store('pos', [{'title': 'X'}]))
+        self.assertTrue(self.cache.store('neg', {'error': 'No usable results returned'}))
+        self.assertFalse(self.cache.store('err', {'error': 'Some transient failure'}))
+        self.assertIsNone(self.cache.backend.get('err'))
+
+    def test_negative_entries_use_short_ttl(self):
+        cache = SearchResultCache(backend=LocalCacheBackend(), ttl=300, negative_ttl=5)
+        with patch.object(cache.backend, 'set') as mock_set:
+            cache.store('neg', [])
+            cache.store('pos', [{'title': 'X'}])
+        self.assertEqual(mock_set.call_args_list[0].args[2], 5)
+        self.assertEqual(mock_set.call_args_list[1].args[2], 300)
+
+    def test_stats_counters(self):
+        self.cache.store('pos', [{'title': 'X'}])
+        self.cache.store('neg', [])
+        self.cache.get('pos')
+        self.cache.get('neg')
+        self.cache.get('missing')
+        stats = self.cache.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['negative_hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['stores'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+    # Run with :   python manage.py test search.tests.test_result_cache
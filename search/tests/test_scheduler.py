@@ -0,0 +1,135 @@
+import asyncio
+import threading
+import unittest
+
+from search.search_utils.scheduler import SearchScheduler, current_priority, priority_scope
+
+
+LIMITS = {'interactive': 2, 'bulk': 2, 'background': 1}
+WEIGHTS = {'interactive': 4, 'bulk': 1, 'background': 1}
+
+
+class TestSearchScheduler(unittest.TestCase):
+
+    def test_interactive_overtakes_queued_bulk_work(self):
+        scheduler = SearchScheduler(LIMITS, WEIGHTS, capacity=1)
+        order = []
+
+        async def call(priority, name):
+            with priority_scope(priority):
+                async with scheduler:
+                    order.append(name)
+                    await asyncio.sleep(0.01)
+
+        async def run():
+            holder = asyncio.create_task(call('bulk', 'b0'))
+            await asyncio.sleep(0)
+            bulk = [asyncio.create_task(call('bulk', f'b{i}')) for i in range(1, 4)]
+            await asyncio.sleep(0)
+            interactive = asyncio.create_task(call('interactive', 'i1'))
+            await asyncio.gather(holder, interactive, *bulk)
+
+        asyncio.run(run())
+        self.assertEqual(order[0], 'b0')
+        # i1 arrived after three queued bulk calls but its tag is smaller than all but the first
+        self.assertLess(order.index('i1'), order.index('b3'))
+        self.assertEqual(scheduler.stats()['in_use'], 0)
+
+    def test_weights_share_contended_capacity(self):
+        scheduler = SearchScheduler({'interactive': 10, 'bulk': 10, 'background': 10}, WEIGHTS, capacity=1)
+        order = []
+
+        async def call(priority):
+            with priority_scope(priority):
+                async with scheduler:
+                    order.append(priority)
+                    await asyncio.sleep(0)
+
+        async def run():
+            async with scheduler:  # Hold the only slot while both queues fill up
+                tasks = [asyncio.create_task(call(p)) for p in ['bulk'] * 5 + ['interactive'] * 10]
+                await asyncio.sleep(0)
+            await asyncio.gather(*tasks)
+
+        asyncio.run(run())
+        # 4:1 weights: four interactive calls for every bulk one while both are waiting
+        self.assertEqual(order[:10].count('interactive'), 8)
+        self.assertEqual(len(order), 15)
+
+    def test_class_limit_caps_a_class_below_capacity(self):
+        scheduler = SearchScheduler(LIMITS, WEIGHTS, capacity=10)
+        peak = 0
+
+        async def call():
+            nonlocal peak
+            with priority_scope('bulk'):
+                async with scheduler:
+                    peak = max(peak, scheduler.stats()['classes']['bulk']['running'])
+                    await asyncio.sleep(0.005)
+
+        async def run():
+            await asyncio.gather(*(call() for _ in range(6)))
+            # Bulk is at its cap, but interactive still gets in at once
+            with priority_scope('bulk'):
+                held = [asyncio.create_task(scheduler.acquire()) for _ in range(2)]
+                await asyncio.gather(*held)
+            await asyncio.wait_for(scheduler.acquire('interactive'), 0.1)
+            scheduler.release('interactive')
+            for _ in held:
+                scheduler.release('bulk')
+
+        asyncio.run(run())
+        self.assertEqual(peak, 2)
+        stats = scheduler.stats()['classes']['bulk']
+        self.assertEqual(stats['dispatched'], 8)
+        self.assertGreater(stats['wait_ms']['max'], 0)
+
+    def test_cancelled_waiters_leave_the_queue(self):
+        scheduler = SearchScheduler(LIMITS, WEIGHTS, capacity=1)
+
+        async def run():
+            await scheduler.acquire()
+            waiter = asyncio.create_task(scheduler.acquire('bulk'))
+            await asyncio.sleep(0)
+            self.assertEqual(scheduler.stats()['classes']['bulk']['queued'], 1)
+            waiter.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await waiter
+            scheduler.release('interactive')
+
+        asyncio.run(run())
+        stats = scheduler.stats()
+        self.assertEqual((stats['in_use'], stats['classes']['bulk']['queued']), (0, 0))
+
+    def test_slots_are_shared_across_event_loops(self):
+        scheduler = SearchScheduler(LIMITS, WEIGHTS, capacity=1)
+        released = threading.Event()
+
+        async def hold():
+            async with scheduler:
+                await asyncio.to_thread(released.wait, 5)
+
+        async def wait_for_slot():
+            await asyncio.sleep(0.05)
+            self.assertEqual(scheduler.stats()['in_use'], 1)
+            released.set()
+            async with scheduler:
+                return True
+
+        holder = threading.Thread(target=asyncio.run, args=(hold(),))
+        holder.start()
+        self.assertTrue(asyncio.run(wait_for_slot()))
+        holder.join(5)
+
+    def test_priority_scope(self):
+        self.assertEqual(current_priority(), 'interactive')
+        with priority_scope('background'):
+            self.assertEqual(current_priority(), 'background')
+        self.assertEqual(current_priority(), 'interactive')
+        with self.assertRaises(ValueError):
+            with priority_scope('urgent'):
+                pass
+
+
+if __name__ == '__main__':
+    unittest.main()
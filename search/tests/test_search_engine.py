@@ -1,9 +1,13 @@
 import os
+import time
 import unittest
 import asyncio
 from unittest.mock import patch, AsyncMock, MagicMock
 
 from search.search_engine import SearchEngine
+from search.search_utils.duration_resolver import DurationResolver
+from search.search_utils.result_cache import LocalCacheBackend
+from search.search_utils.api_keys import QuotaExceeded
 
 class TestSearchEngine(unittest.TestCase):
     def setUp(self):
@@ -145,6 +149,483 @@ class TestSearchEngine(unittest.TestCase):
         self.assertEqual(result[0]['title'], 'Recovered')
 
 
+    @patch.object(SearchEngine, "_execute_search")
+    def test_regular_search_served_from_cache(self, mock_exec):
+        mock_exec.return_value = {
+            'title': 'T', 'duration': 42, 'uploader': 'U',
+            'thumbnail': 'thumb.jpg', 'webpage_url': 'u',
+            'upload_date': '2025-01-01', 'thumbnails': []
+        }
+        eng = SearchEngine()
+        first = asyncio.run(eng.regular_search({'type': 'search', 'query': 'Foo'}))
+        second = asyncio.run(eng.regular_search({'type': 'search', 'query': 'foo'}))
+        self.assertEqual(first, second)
+        self.assertEqual(mock_exec.call_count, 1)
+        self.assertEqual(eng.get_stats()['cache']['hits'], 1)
+
+    @patch.object(SearchEngine, "_execute_search")
+    def test_regular_search_caches_no_results_negatively(self, mock_exec):
+        mock_exec.return_value = {'_type': 'playlist', 'entries': []}
+        eng = SearchEngine()
+        asyncio.run(eng.regular_search({'type': 'search', 'query': 'nothing'}))
+        asyncio.run(eng.regular_search({'type': 'search', 'query': 'nothing'}))
+        self.assertEqual(mock_exec.call_count, 1)
+        self.assertEqual(eng.get_stats()['cache']['negative_hits'], 1)
+
+
+    @patch.object(SearchEngine, '_retry_request')
+    @patch('search.search_utils.duration_resolver.requests.get')
+    def test_api_search_resolves_durations_in_one_call(self, mock_get, mock_retry):
+        items = [
+            {'id': {'videoId': f'vid{i}'}, 'snippet': {'title': f'T{i}', 'channelTitle': 'C', 'publishedAt': '2025',
+                                                     'thumbnails': {'high': {'url': 'h', 'width': 2, 'height': 2}}}}
+            for i in range(3)
+        ]
+        mock_retry.return_value = MagicMock(json=MagicMock(return_value={'items': items}))
+        mock_get.return_value = MagicMock(status_code=200, json=MagicMock(return_value={
+            'items': [{'id': f'vid{i}', 'contentDetails': {'duration': f'PT{i + 1}M'}} for i in range(3)]
+        }))
+        eng = SearchEngine()
+        eng.duration_resolver = DurationResolver(eng._parse_duration, store=LocalCacheBackend(), memory=LocalCacheBackend())
+        result = asyncio.run(eng.regular_search_with_yt_api({'type': 'search', 'query': 'foo'}, api_key='k'))
+        self.assertEqual([r['duration'] for r in result], [60, 120, 180])
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(mock_get.call_args.kwargs['params']['id'], 'vid0,vid1,vid2')
+
+
+    @patch.object(SearchEngine, '_retry_request')
+    @patch('search.search_utils.duration_resolver.requests.get')
+    def test_api_search_sparse_fields_skip_duration_lookups(self, mock_get, mock_retry):
+        items = [{'id': {'videoId': 'vid0'}, 'snippet': {'title': 'T0', 'thumbnails': {}}}]
+        mock_retry.return_value = MagicMock(json=MagicMock(return_value={'items': items}))
+        eng = SearchEngine()
+        result = asyncio.run(eng.regular_search_with_yt_api({'type': 'search', 'query': 'foo'}, api_key='k', fields=['webpage_url', 'title']))
+        self.assertEqual(result, [{'title': 'T0', 'webpage_url': 'https://www.youtube.com/watch?v=vid0'}])
+        mock_get.assert_not_called()
+
+
+    @patch('search.search_engine.requests.get')
+    def test_api_search_rotates_to_next_key_on_quota_exceeded(self, mock_get):
+        quota_response = MagicMock(status_code=403, text='quota', json=MagicMock(return_value={
+            'error': {'errors': [{'reason': 'quotaExceeded'}]}
+        }))
+        ok_response = MagicMock(status_code=200, json=MagicMock(return_value={'items': [
+            {'id': {'videoId': 'vid0'}, 'snippet': {'title': 'T', 'channelTitle': 'C', 'publishedAt': '2025',
+                                                  'thumbnails': {'high': {'url': 'h', 'width': 2, 'height': 2}}}}
+        ]}))
+        videos_response = MagicMock(status_code=200, json=MagicMock(return_value={'items': []}))
+
+        def fake_get(url, params, **kwargs):
+            if url == DurationResolver.VIDEOS_URL:
+                return videos_response
+            return quota_response if params['key'] == 'key-a' else ok_response
+        mock_get.side_effect = fake_get
+
+        eng = SearchEngine()
+        eng.NORMAL_API_KEY = 'key-a, key-b'
+        eng.duration_resolver = DurationResolver(eng._parse_duration, store=LocalCacheBackend(), memory=LocalCacheBackend())
+        result = asyncio.run(eng.regular_search_with_yt_api({'type': 'search', 'query': 'foo'}))
+
+        self.assertEqual(result[0]['title'], 'T')
+        self.assertEqual(mock_get.call_count, 3)  # no retries on the exhausted key
+        self.assertEqual(mock_get.call_args.kwargs['params']['key'], 'key-b')
+        keys = {k['key']: k for k in eng.get_stats()['api_keys']['keys']}
+        self.assertTrue(keys['…ey-a']['exhausted'])
+        self.assertEqual(keys['…ey-b']['used'], 101)
+
+
+    @patch('search.search_engine.requests.get')
+    def test_unrecoverable_api_error_is_not_retried(self, mock_get):
+        mock_get.return_value = MagicMock(status_code=400, text='bad', json=MagicMock(return_value={}))
+        eng = SearchEngine()
+        with self.assertRaises(Exception):
+            asyncio.run(eng._retry_request('url', {'key': 'k'}, 'foo', retries=5))
+        self.assertEqual(mock_get.call_count, 1)
+
+    @patch.object(SearchEngine, '_execute_search')
+    @patch('search.search_engine.requests.get')
+    def test_open_api_breaker_goes_straight_to_ytdlp(self, mock_get, mock_exec):
+        mock_exec.return_value = {'title': 'T', 'webpage_url': 'u', 'thumbnails': []}
+        eng = SearchEngine()
+        eng.NORMAL_API_KEY = 'k'
+        eng.breakers['youtube_api'].state = 'open'
+        eng.breakers['youtube_api']._opened_at = time.monotonic()
+
+        result = asyncio.run(eng.regular_search_with_yt_api({'type': 'search', 'query': 'foo'}))
+        self.assertEqual(result[0]['title'], 'T')
+        mock_get.assert_not_called()
+
+    @patch.object(SearchEngine, '_execute_search')
+    def test_ytdlp_breaker_opens_and_fails_fast(self, mock_exec):
+        mock_exec.side_effect = Exception("HTTP Error 503")
+        eng = SearchEngine()
+        eng.retries = 1
+        for i in range(10):
+            asyncio.run(eng.regular_search({'type': 'search', 'query': f'down {i}'}))
+        self.assertEqual(eng.get_stats()['breakers']['yt_dlp']['state'], 'open')
+
+        started = time.monotonic()
+        result = asyncio.run(eng.regular_search({'type': 'search', 'query': 'another'}))
+        self.assertIn('circuit open', result['error'])
+        self.assertEqual(mock_exec.call_count, 10)
+        self.assertLess(time.monotonic() - started, 1)
+
+
+    @patch('search.search_engine.requests.get')
+    def test_cancelled_half_open_probe_is_released(self, mock_get):
+        mock_get.side_effect = lambda *a, **kw: time.sleep(0.2)
+        eng = SearchEngine()
+        breaker = eng.breakers['youtube_api']
+        breaker.state = 'open'
+        breaker._opened_at = time.monotonic() - breaker.open_seconds  # Due for a probe
+
+        async def cancel_probe():
+            probe = asyncio.create_task(eng._retry_request('url', {'key': 'k'}, 'foo', retries=1))
+            await asyncio.sleep(0.05)
+            probe.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await probe
+
+        asyncio.run(cancel_probe())
+        self.assertEqual(breaker.state, 'half_open')
+        breaker.allow()  # The cancelled probe no longer holds the only slot
+
+    @patch.object(SearchEngine, '_execute_search')
+    def test_search_page_serves_later_pages_from_cached_window(self, mock_exec):
+        mock_exec.return_value = {'_type': 'playlist', 'entries': [
+            {'title': f'T{i}', 'webpage_url': f'u{i}', 'thumbnails': []} for i in range(8)
+        ]}
+        eng = SearchEngine()
+        eng.prefetch_pages = False
+
+        first = asyncio.run(eng.search_page({'type': 'search', 'query': 'foo'}, page_size=2))
+        second = asyncio.run(eng.search_page(cursor=first['next_cursor']))
+        self.assertEqual([r['title'] for r in first['results']], ['T0', 'T1'])
+        self.assertEqual([r['title'] for r in second['results']], ['T2', 'T3'])
+        self.assertEqual(mock_exec.call_count, 1)
+        self.assertEqual(mock_exec.call_args.args[0], 'ytsearch8:foo')
+
+    @patch.object(SearchEngine, '_api_page', new_callable=AsyncMock)
+    def test_search_page_follows_api_page_tokens(self, mock_page):
+        mock_page.side_effect = [
+            {'results': [{'title': 'A'}], 'next_page_token': 'TOKEN2'},
+            {'results': [{'title': 'B'}], 'next_page_token': None},
+        ]
+        eng = SearchEngine()
+        eng.NORMAL_API_KEY = 'k'
+        eng.background.spawn = MagicMock()
+
+        first = asyncio.run(eng.search_page({'type': 'search', 'query': 'foo'}, page_size=1))
+        eng.background.spawn.assert_called_once()
+        self.assertEqual(eng.background.spawn.call_args.args[0], first['next_cursor'])
+
+        second = asyncio.run(eng.search_page(cursor=first['next_cursor']))
+        self.assertEqual(mock_page.await_args.kwargs['page_token'], 'TOKEN2')
+        self.assertEqual(second, {'results': [{'title': 'B'}], 'next_cursor': None})
+
+    @patch.object(SearchEngine, '_execute_search')
+    def test_full_mode_offset_resolves_only_the_window(self, mock_exec):
+        def fake(query, flat=False):
+            if flat:
+                return {'_type': 'playlist', 'entries': [{'title': f'T{i}', 'url': f'u{i}', 'thumbnails': []} for i in range(4)]}
+            return {'title': 'full', 'webpage_url': query, 'upload_date': '20250101', 'duration': 60, 'uploader': 'C', 'thumbnails': []}
+        mock_exec.side_effect = fake
+        eng = SearchEngine()
+
+        result = asyncio.run(eng.regular_search({'type': 'search', 'query': 'foo'}, max_results=2, offset=2))
+        self.assertEqual([r['webpage_url'] for r in result], ['u2', 'u3'])
+        self.assertEqual(result[0]['upload_date'], '20250101')
+        self.assertEqual(mock_exec.call_count, 3)  # flat listing + the two videos of the window
+
+    def test_search_page_rejects_tampered_cursor(self):
+        from search.search_utils.pagination import InvalidCursor, encode_cursor
+        cursor = encode_cursor({'q': 'foo', 't': 'search', 's': 2, 'src': 'ytdlp', 'off': 2})
+        with self.assertRaises(InvalidCursor):
+            asyncio.run(self.engine.search_page(cursor=cursor[:-2] + 'xx'))
+
+
+    @patch.object(SearchEngine, "_execute_search")
+    def test_concurrent_identical_searches_are_coalesced(self, mock_exec):
+        def slow_result(query):
+            time.sleep(0.1)
+            return {'title': 'T', 'webpage_url': 'u', 'thumbnails': []}
+        mock_exec.side_effect = slow_result
+        eng = SearchEngine()
+
+        async def run():
+            return await asyncio.gather(*(eng.regular_search({'type': 'search', 'query': 'viral'}) for _ in range(5)))
+
+        results = asyncio.run(run())
+        self.assertEqual(len(results), 5)
+        self.assertEqual(mock_exec.call_count, 1)
+        self.assertEqual(eng.get_stats()['single_flight']['coalesced'], 4)
+
+
+    def test_concurrency_limit_shared_by_requests_on_different_loops(self):
+        eng = SearchEngine()
+
+        async def hold():
+            async with eng.scheduler:
+                await asyncio.sleep(0)
+                return eng.scheduler.stats()['classes']['interactive']['running']
+
+        # Each asyncio.run is a fresh loop, like async_to_sync per request.
+        self.assertEqual(asyncio.run(hold()), 1)
+        self.assertEqual(asyncio.run(hold()), 1)
+
+        async def crowd():
+            return await asyncio.gather(*(hold() for _ in range(eng.max_concurrent_searches['interactive'] * 2)))
+
+        self.assertLessEqual(max(asyncio.run(crowd())), eng.max_concurrent_searches['interactive'])
+        self.assertEqual(eng.scheduler.stats()['in_use'], 0)
+
+
+    @patch.object(SearchEngine, "regular_search_with_yt_api", new_callable=AsyncMock)
+    def test_bulk_search_stream_yields_in_completion_order(self, mock_api):
+        async def delayed(term, **kwargs):
+            await asyncio.sleep({'slow': 0.2, 'fast': 0.0, 'mid': 0.1}[term['query']])
+            return [{'title': term['query']}]
+        mock_api.side_effect = delayed
+        eng = SearchEngine()
+
+        async def collect():
+            terms = [{'type': 'search', 'query': q} for q in ('slow', 'fast', 'mid')]
+            return [block async for block in eng.bulk_search_stream(terms)]
+
+        blocks = asyncio.run(collect())
+        self.assertEqual([b['search_term']['query'] for b in blocks], ['fast', 'mid', 'slow'])
+        self.assertEqual([b['index'] for b in blocks], [1, 2, 0])
+        self.assertEqual(blocks[0]['count'], 1)
+
+
+    @patch('search.search_engine.requests.get')
+    @patch.object(SearchEngine, "_api_search", new_callable=AsyncMock)
+    def test_bulk_search_dedupes_terms_and_batches_links(self, mock_api, mock_get):
+        mock_api.return_value = [{'title': 'X'}]
+        snippet = {'title': 'Linked', 'channelTitle': 'C', 'publishedAt': '2025', 'thumbnails': {'high': {'url': 'h', 'width': 2, 'height': 2}}}
+        mock_get.return_value = MagicMock(status_code=200, json=MagicMock(return_value={'items': [
+            {'id': vid, 'snippet': snippet, 'contentDetails': {'duration': 'PT3M'}} for vid in ('bUlKdEdUpAa', 'bUlKdEdUpBb')
+        ]}))
+        eng = SearchEngine()
+        eng.BULK_API_KEY = 'bulk-key'
+        eng.duration_resolver = DurationResolver(eng._parse_duration, store=LocalCacheBackend(), memory=LocalCacheBackend())
+
+        terms = [
+            eng.clean_and_classify_query(q) for q in (
+                'Adele Hello', 'adele hello',
+                'https://youtu.be/bUlKdEdUpAa', 'https://www.youtube.com/watch?v=bUlKdEdUpAa&t=3', 'https://www.youtube.com/shorts/bUlKdEdUpBb',
+            )
+        ]
+        bulk = asyncio.run(eng.bulk_search(terms))
+
+        self.assertEqual(mock_api.call_count, 1)
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(mock_get.call_args.kwargs['params']['id'], 'bUlKdEdUpAa,bUlKdEdUpBb')
+        self.assertEqual([b['search_term'] for b in bulk], terms)
+        self.assertEqual(bulk[3]['results'][0]['webpage_url'], 'https://www.youtube.com/watch?v=bUlKdEdUpAa')
+        self.assertEqual(bulk[4]['results'][0]['duration'], 180)
+        self.assertEqual(eng.get_stats()['bulk']['deduplicated'], 2)
+
+
+    @patch.object(SearchEngine, "_videos_batch", new_callable=AsyncMock)
+    @patch.object(SearchEngine, "regular_search", new_callable=AsyncMock)
+    def test_bulk_links_fall_back_to_ytdlp_when_api_unavailable(self, mock_search, mock_batch):
+        mock_search.return_value = [{'title': 'Scraped'}]
+        mock_batch.side_effect = QuotaExceeded('quotaExceeded')
+        eng = SearchEngine()
+        eng.BULK_API_KEY = 'bulk-key'
+
+        terms = [eng.clean_and_classify_query(q) for q in ('https://youtu.be/fAlLbAcKaAa', 'https://www.youtube.com/watch?v=fAlLbAcKbBb&list=PL123')]
+        bulk = asyncio.run(eng.bulk_search(terms))
+
+        self.assertEqual([b['results'][0]['title'] for b in bulk], ['Scraped', 'Scraped'])
+        self.assertEqual(mock_search.call_count, 2)
+        self.assertEqual(eng.get_stats()['links']['fallbacks'], 1)  # the playlist link never asks the API
+
+
+    @patch.object(SearchEngine, "_execute_search")
+    @patch('search.search_engine.requests.get')
+    def test_single_link_uses_videos_list_instead_of_ytdlp(self, mock_get, mock_exec):
+        snippet = {'title': 'Linked', 'channelTitle': 'C', 'publishedAt': '2025', 'thumbnails': {'high': {'url': 'h', 'width': 2, 'height': 2}}}
+        mock_get.return_value = MagicMock(status_code=200, json=MagicMock(return_value={'items': [
+            {'id': 'fAsTpAtHaAa', 'snippet': snippet, 'contentDetails': {'duration': 'PT1M5S'}}
+        ]}))
+        eng = SearchEngine()
+        eng.NORMAL_API_KEY = 'key'
+        eng.duration_resolver = DurationResolver(eng._parse_duration, store=LocalCacheBackend(), memory=LocalCacheBackend())
+
+        result = asyncio.run(eng.regular_search_with_yt_api(eng.clean_and_classify_query('https://youtu.be/fAsTpAtHaAa?t=42')))
+        self.assertEqual(result[0]['title'], 'Linked')
+        self.assertEqual(result[0]['duration'], 65)
+        self.assertEqual(mock_get.call_args.kwargs['params']['part'], 'snippet,contentDetails')
+        mock_exec.assert_not_called()
+
+        mock_get.return_value = MagicMock(status_code=200, json=MagicMock(return_value={'items': []}))
+        missing = asyncio.run(eng.regular_search_with_yt_api(eng.clean_and_classify_query('https://youtu.be/fAsTpAtHbBb')))
+        self.assertIn('error', missing)
+        mock_exec.assert_not_called()
+        self.assertEqual(eng.get_stats()['links'], {'videos_list_calls': 2, 'resolved': 1, 'not_found': 1, 'fallbacks': 0})
+
+    @patch('search.search_engine.requests.get')
+    def test_concurrent_identical_links_share_one_videos_list_call(self, mock_get):
+        snippet = {'title': 'Linked', 'channelTitle': 'C', 'publishedAt': '2025', 'thumbnails': {'high': {'url': 'h', 'width': 2, 'height': 2}}}
+        def slow_get(*args, **kwargs):
+            time.sleep(0.1)
+            return MagicMock(status_code=200, json=MagicMock(return_value={'items': [
+                {'id': 'cOaLeScEaAa', 'snippet': snippet, 'contentDetails': {'duration': 'PT1M'}}
+            ]}))
+        mock_get.side_effect = slow_get
+        eng = SearchEngine()
+        eng.NORMAL_API_KEY = 'key'
+        eng.duration_resolver = DurationResolver(eng._parse_duration, store=LocalCacheBackend(), memory=LocalCacheBackend())
+        links = ['https://youtu.be/cOaLeScEaAa', 'https://www.youtube.com/watch?v=cOaLeScEaAa&t=3', 'https://youtu.be/cOaLeScEaAa']
+
+        async def run():
+            return await asyncio.gather(*(eng.regular_search_with_yt_api(eng.clean_and_classify_query(link)) for link in links))
+
+        results = asyncio.run(run())
+        self.assertEqual([r[0]['title'] for r in results], ['Linked'] * 3)
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(eng.get_stats()['links']['videos_list_calls'], 1)
+
+
+    @patch('search.search_engine.requests.get')
+    def test_playlist_pages_follow_playlist_items_and_resume_from_cursor(self, mock_get):
+        def item(vid, owner='Owner'):
+            snippet = {'title': vid, 'thumbnails': {'high': {'url': 'h', 'width': 2, 'height': 2}}}
+            if owner:
+                snippet['videoOwnerChannelTitle'] = owner
+            return {'snippet': snippet, 'contentDetails': {'videoId': vid}}
+        pages = {
+            None: {'items': [item('vIdPlAyLsT1'), item('vIdPlAyLsT2', owner=None)], 'nextPageToken': 'p2'},
+            'p2': {'items': [item('vIdPlAyLsT3')]},
+        }
+        mock_get.side_effect = lambda url, params, **kwargs: MagicMock(status_code=200, json=MagicMock(return_value=pages[params.get('pageToken')]))
+        eng = SearchEngine()
+        eng.NORMAL_API_KEY = 'key'
+
+        async def expand(**kwargs):
+            return [page async for page in eng.playlist_pages(**kwargs)]
+        first, second = asyncio.run(expand(playlist_id='PL123', fields=['title', 'uploader']))
+        self.assertEqual(first['results'], [{'index': 0, 'title': 'vIdPlAyLsT1', 'uploader': 'Owner'}])  # the private one is skipped
+        self.assertEqual(second['results'][0]['index'], 2)
+        self.assertIsNone(second['next_cursor'])
+        self.assertEqual(mock_get.call_count, 2)  # no duration lookups without `duration`
+
+        resumed = asyncio.run(expand(cursor=first['next_cursor']))
+        self.assertEqual([r['title'] for page in resumed for r in page['results']], ['vIdPlAyLsT3'])
+
+
+    def test_playlist_pages_use_flat_windows_without_api_key(self):
+        eng = SearchEngine()
+        entries = [{'title': f'T{i}', 'url': f'https://www.youtube.com/watch?v=v{i}'} for i in range(100)]
+        entries[1]['title'] = '[Deleted video]'
+        eng.extractor_pool = MagicMock(aextract=AsyncMock(side_effect=[{'_type': 'playlist', 'entries': entries}, {'_type': 'playlist', 'entries': entries[:3]}]))
+
+        async def expand():
+            return [page async for page in eng.playlist_pages('PL123')]
+        first, second = asyncio.run(expand())
+        self.assertEqual(len(first['results']), 99)
+        self.assertEqual(second['results'][0]['index'], 100)
+        self.assertIsNone(second['next_cursor'])
+        self.assertEqual(eng.extractor_pool.aextract.await_args.args[1]['playlist_items'], '101:200')
+
+
+    @patch.object(SearchEngine, "regular_search_with_yt_api", new_callable=AsyncMock)
+    @patch.object(SearchEngine, "bookmark_search")
+    @patch.object(SearchEngine, "lan_search")
+    def test_federated_search_yields_local_first_and_dedupes(self, mock_lan, mock_bookmarks, mock_remote):
+        mock_lan.return_value = [{'title': 'Numb', 'artist': 'Linkin Park'}]
+        mock_bookmarks.return_value = [{'title': 'Numb', 'webpage_url': 'https://www.youtube.com/watch?v=a'}]
+
+        async def slow_remote(*args, **kwargs):
+            await asyncio.sleep(0.05)
+            return [{'title': 'Numb', 'webpage_url': 'https://www.youtube.com/watch?v=a'},
+                    {'title': 'Numb (Live)', 'webpage_url': 'https://www.youtube.com/watch?v=b'}]
+        mock_remote.side_effect = slow_remote
+
+        async def collect():
+            return [block async for block in self.engine.federated_search({'type': 'search', 'query': 'numb'}, include_lan=True)]
+        blocks = asyncio.run(collect())
+
+        self.assertEqual([b['source'] for b in blocks], ['lan', 'bookmark', 'youtube'])
+        self.assertEqual([r['title'] for r in blocks[2]['results']], ['Numb (Live)'])
+        self.assertEqual(blocks[2]['deduplicated'], 1)
+        self.assertTrue(all(r['source'] == 'youtube' for r in blocks[2]['results']))
+
+
+    @patch.object(SearchEngine, "regular_search_with_yt_api", new_callable=AsyncMock)
+    @patch.object(SearchEngine, "bookmark_search")
+    @patch.object(SearchEngine, "lan_search")
+    def test_federated_search_skips_lan_without_access(self, mock_lan, mock_bookmarks, mock_remote):
+        mock_bookmarks.return_value = []
+        mock_remote.return_value = {'error': 'down'}
+
+        async def collect():
+            return [block async for block in self.engine.federated_search({'type': 'search', 'query': 'numb'})]
+        blocks = asyncio.run(collect())
+
+        mock_lan.assert_not_called()
+        blocks = {b['source']: b for b in blocks}
+        self.assertEqual(set(blocks), {'bookmark', 'youtube'})
+        self.assertEqual(blocks['youtube']['error'], 'down')
+
+
+    @patch.object(SearchEngine, "_execute_search")
+    def test_regular_search_flat_mode(self, mock_exec):
+        def fake(query, flat=False):
+            if flat:
+                return {'_type': 'playlist', 'entries': [
+                    {'title': f'T{i}', 'url': f'https://www.youtube.com/watch?v=vid{i:08d}', 'duration': i,
+                     'channel': 'C', 'thumbnails': [{'url': f'thumb{i}', 'height': 9, 'width': 16}]}
+                    for i in range(5)
+                ]}
+            return {'title': 'full', 'webpage_url': query, 'upload_date': '20250101', 'thumbnails': []}
+        mock_exec.side_effect = fake
+        eng = SearchEngine()
+
+        result = asyncio.run(eng.regular_search({'type': 'search', 'query': 'foo'}, max_results=2, offset=1, mode='flat'))
+        self.assertEqual([r['title'] for r in result], ['T1', 'T2'])
+        self.assertEqual(result[0]['webpage_url'], 'https://www.youtube.com/watch?v=vid00000001')
+        self.assertEqual(result[0]['uploader'], 'C')
+        self.assertIsNone(result[0]['upload_date'])
+        self.assertEqual(mock_exec.call_count, 1)  # no per-video resolution
+
+    @patch.object(SearchEngine, "_execute_search")
+    def test_regular_search_flat_mode_enriches_requested_fields_in_window_only(self, mock_exec):
+        def fake(query, flat=False):
+            if flat:
+                return {'_type': 'playlist', 'entries': [
+                    {'title': f'T{i}', 'url': f'https://www.youtube.com/watch?v=vid{i:08d}', 'duration': i}
+                    for i in range(5)
+                ]}
+            return {'title': 'full', 'webpage_url': query, 'upload_date': '20250101', 'thumbnails': []}
+        mock_exec.side_effect = fake
+        eng = SearchEngine()
+
+        result = asyncio.run(eng.regular_search({'type': 'search', 'query': 'foo'}, max_results=2, offset=1, mode='flat', fields=['upload_date']))
+        self.assertEqual([r['upload_date'] for r in result], ['20250101', '20250101'])
+        self.assertEqual([r['title'] for r in result], ['T1', 'T2'])
+        self.assertEqual(mock_exec.call_count, 3)  # flat search + the two windowed videos
+
+    @patch.object(SearchEngine, "_execute_search")
+    def test_flat_search_page_enriches_only_the_page(self, mock_exec):
+        def fake(query, flat=False):
+            if flat:
+                return {'_type': 'playlist', 'entries': [
+                    {'title': f'T{i}', 'url': f'https://www.youtube.com/watch?v=pAgE{i:07d}', 'duration': i}
+                    for i in range(8)
+                ]}
+            return {'title': 'full', 'webpage_url': query, 'upload_date': '20250101', 'thumbnails': []}
+        mock_exec.side_effect = fake
+        eng = SearchEngine()
+        eng.prefetch_pages = False
+
+        page = asyncio.run(eng.search_page({'type': 'search', 'query': 'flat page'}, page_size=2, ytdlp_mode='flat', fields=['title', 'upload_date']))
+        self.assertEqual(page['results'], [{'title': 'T0', 'upload_date': '20250101'}, {'title': 'T1', 'upload_date': '20250101'}])
+        self.assertEqual(mock_exec.call_count, 3)  # The window listing + the page's two videos
+
+
     def test_lan_search_raises(self):
         eng = SearchEngine()
         with self.assertRaises(NotImplementedError):
@@ -0,0 +1,82 @@
+import asyncio
+import threading
+import unittest
+
+from search.search_utils.single_flight import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def setUp(self):
+        self.flight = SingleFlight()
+        self.calls = 0
+
+    async def slow_call(self, value='result', delay=0.05):
+        self.calls += 1
+        await asyncio.sleep(delay)
+        return value
+
+    def test_concurrent_calls_share_one_execution(self):
+        async def run():
+            return await asyncio.gather(*(self.flight.do('k', self.slow_call) for _ in range(5)))
+
+        results = asyncio.run(run())
+        self.assertEqual(results, ['result'] * 5)
+        self.assertEqual(self.calls, 1)
+        stats = self.flight.stats()
+        self.assertEqual(stats['executions'], 1)
+        self.assertEqual(stats['coalesced'], 4)
+        self.assertEqual(stats['in_flight'], 0)
+
+    def test_different_keys_do_not_coalesce(self):
+        async def run():
+            return await asyncio.gather(self.flight.do('a', self.slow_call), self.flight.do('b', self.slow_call))
+
+        asyncio.run(run())
+        self.assertEqual(self.calls, 2)
+
+    def test_errors_are_shared_with_followers(self):
+        async def failing():
+            self.calls += 1
+            await asyncio.sleep(0.05)
+            raise ValueError("upstream down")
+
+        async def run():
+            return await asyncio.gather(*(self.flight.do('k', failing) for _ in range(3)), return_exceptions=True)
+
+        results = asyncio.run(run())
+        self.assertTrue(all(isinstance(r, ValueError) for r in results))
+        self.assertEqual(self.calls, 1)
+
+    def test_followers_on_other_event_loops(self):
+        results = []
+
+        def worker():
+            results.append(asyncio.run(self.flight.do('k', lambda: self.slow_call(delay=0.2))))
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(results, ['result'] * 4)
+        self.assertEqual(self.calls, 1)
+
+    def test_follower_takes_over_when_leader_is_cancelled(self):
+        async def run():
+            leader = asyncio.create_task(self.flight.do('k', self.slow_call))
+            await asyncio.sleep(0.01)
+            follower = asyncio.create_task(self.flight.do('k', self.slow_call))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            return await follower
+
+        self.assertEqual(asyncio.run(run()), 'result')
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(self.flight.stats()['leader_cancellations'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+    # Run with :   python manage.py test search.tests.test_single_flight
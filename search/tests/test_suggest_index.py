@@ -0,0 +1,112 @@
+from unittest.mock import patch
+
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from chrome_extension.models import BookmarkedVideo
+from desktop_lan_connect.models import SongProfile
+from search.models import QueryResult
+from search.search_utils.suggest_index import PrefixIndex, normalize
+from search.suggestions import Suggestions, suggestions
+
+
+class TestPrefixIndex(TestCase):
+
+    def setUp(self):
+        self.index = PrefixIndex()
+
+    def test_normalize(self):
+        self.assertEqual(normalize("  Beyoncé - HALO (Live) "), "beyonce halo live")
+
+    def test_matches_any_word_prefix(self):
+        self.index.add("Imagine Dragons - Believer", "query")
+        self.assertEqual(self.index.lookup("imag")[0]["text"], "Imagine Dragons - Believer")
+        self.assertEqual(self.index.lookup("BELIEV")[0]["text"], "Imagine Dragons - Believer")
+        self.assertEqual(self.index.lookup("dragons bel")[0]["text"], "Imagine Dragons - Believer")
+        self.assertEqual(self.index.lookup("elieve"), [])
+
+    def test_ranked_by_weight(self):
+        self.index.add("Adele Hello", "query")
+        self.index.add("Adele Skyfall", "query")
+        self.index.add("adele skyfall", "query")
+        results = self.index.lookup("adele")
+        self.assertEqual([r["text"] for r in results], ["Adele Skyfall", "Adele Hello"])
+        self.assertEqual(results[0]["score"], 2)
+        self.assertEqual(len(self.index.lookup("adele", limit=1)), 1)
+
+    def test_common_prefix_ranks_every_match(self):
+        for i in range(30):
+            self.index.add(f"Love Song {i:02d}", "query")
+        self.index.add("Love Story", "query", 2)
+        self.index.add("Lovely", "bookmark", 3)
+        self.index.remove("Lovely", "bookmark", 2)
+        # Matching rows sort after the first ones scanned, past the scan bound
+        with patch("search.search_utils.suggest_index.MAX_SCAN", 10):
+            self.assertEqual([r["text"] for r in self.index.lookup("lov", limit=2)], ["Love Story", "Lovely"])
+            self.assertEqual([r["text"] for r in self.index.lookup("song", limit=2)], ["Love Song 00", "Love Song 01"])
+
+    def test_remove_only_takes_back_its_source(self):
+        self.index.add("Numb", "query")
+        self.index.add("Numb", "bookmark", 3)
+        self.index.remove("Numb", "bookmark")
+        self.assertEqual(self.index.lookup("numb"), [{"text": "Numb", "score": 1, "sources": ["query"]}])
+        self.index.remove("Numb", "query")
+        self.assertEqual(self.index.lookup("numb"), [])
+        self.assertEqual(len(self.index), 0)
+
+
+class TestSuggestions(TestCase):
+
+    def setUp(self):
+        self.addCleanup(suggestions.index.clear)
+        self.addCleanup(setattr, suggestions, "built", False)
+
+    def test_build_from_database(self):
+        QueryResult.objects.create(cache_key="k1", source="ytdlp", query="Coldplay Yellow", hits=4, fetched_at=timezone.now())
+        QueryResult.objects.create(cache_key="k2", source="ytdlp", query="https://youtu.be/dQw4w9WgXcQ", fetched_at=timezone.now())
+        SongProfile.objects.create(title="Yesterday", artist="The Beatles", duration_seconds=120, file_size_kb=1, file_format="mp3")
+
+        service = Suggestions()
+        service.build()
+        self.assertEqual(service.suggest("coldplay")[0]["score"], 4)
+        self.assertEqual(service.suggest("https"), [])
+        self.assertEqual(service.suggest("beatles")[0]["sources"], ["lan"])
+
+    def test_bookmarks_update_the_index(self):
+        suggestions.ensure_built()
+        bookmark = BookmarkedVideo.objects.create(
+            title="Hozier - Take Me To Church", duration=240, uploader="Hozier",
+            thumbnail="https://i.ytimg.com/a.jpg", webpage_url="https://www.youtube.com/watch?v=PVjiKRfKpPI", upload_date="20140101",
+        )
+        self.assertEqual(suggestions.suggest("church")[0]["sources"], ["bookmark"])
+
+        bookmark.title = "Hozier - Cherry Wine"
+        bookmark.save()
+        self.assertEqual(suggestions.suggest("church"), [])
+        self.assertEqual(len(suggestions.suggest("cherry")), 1)
+
+        bookmark.delete()
+        self.assertEqual(suggestions.suggest("cherry"), [])
+
+    def test_recorded_queries_raise_rank(self):
+        suggestions.ensure_built()
+        suggestions.record_query({"type": "search", "query": "Eminem Lose Yourself"})
+        suggestions.record_query({"type": "search", "query": "Eminem Mockingbird"})
+        suggestions.record_query({"type": "search", "query": "eminem mockingbird"})
+        suggestions.record_query({"type": "video", "query": "https://youtu.be/_Yhyp-_hX2s"})
+        self.assertEqual([s["text"] for s in suggestions.suggest("emi")], ["Eminem Mockingbird", "Eminem Lose Yourself"])
+
+
+
+class TestBackgroundBuild(TransactionTestCase):
+
+    def test_suggest_does_not_wait_for_the_build(self):
+        QueryResult.objects.create(cache_key="k1", source="ytdlp", query="Coldplay Yellow", fetched_at=timezone.now())
+        service = Suggestions()
+        self.assertEqual(service.suggest("coldplay"), [])
+        service._builder.join(5)
+        self.assertTrue(service.built)
+        self.assertEqual(service.suggest("coldplay")[0]["text"], "Coldplay Yellow")
+
+
+# Use this to run it:    python manage.py test search.tests.test_suggest_index
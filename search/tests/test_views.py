@@ -1,6 +1,10 @@
+import json
+
 from django.test import TestCase, Client
 from unittest.mock import patch
 
+from search.search_utils.deadline import mark_partial
+
 
 class SearchViewTests(TestCase):
     def setUp(self):
@@ -63,5 +67,193 @@ class SearchViewTests(TestCase):
         self.assertIn("error", response.json())
 
 
+    def test_search_stats(self):
+        response = self.client.get("/api/search/stats/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("cache", response.json())
+        self.assertIn("hits", response.json()["cache"])
+
+
+    @patch("search.views.engine.regular_search_with_yt_api")
+    def test_bulk_search_ndjson_stream(self, mock_search):
+        mock_search.return_value = [{"title": "Test Song"}]
+
+        response = self.client.get("/api/search/bulk/?queries=Adele%20Hello,Numb&stream=ndjson")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        frames = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        self.assertEqual(len(frames), 3)
+        self.assertEqual({f["index"] for f in frames[:2]}, {0, 1})
+        self.assertEqual(frames[-1]["summary"]["terms"], 2)
+
+    def test_bulk_search_unknown_stream_format(self):
+        response = self.client.get("/api/search/bulk/?queries=Adele&stream=xml")
+        self.assertEqual(response.status_code, 400)
+
+    @patch("search.views.engine.search_page")
+    def test_search_page_envelope(self, mock_page):
+        mock_page.return_value = {"results": [{"title": "Test Song"}], "next_cursor": "abc"}
+
+        response = self.client.get("/api/search/?query=Numb&page_size=1")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["next_cursor"], "abc")
+        self.assertEqual(mock_page.call_args.kwargs["page_size"], 1)
+
+    def test_search_page_invalid_cursor(self):
+        response = self.client.get("/api/search/?cursor=forged")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("cursor", response.json()["error"].lower())
+
+    def test_search_page_size_out_of_range(self):
+        response = self.client.get("/api/search/?query=Numb&page_size=500")
+        self.assertEqual(response.status_code, 400)
+
+    @patch("search.views.suggestions.suggest")
+    def test_suggest(self, mock_suggest):
+        mock_suggest.return_value = [{"text": "Numb", "score": 2, "sources": ["query"]}]
+
+        response = self.client.get("/api/search/suggest/?q=nu&limit=5")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]["text"], "Numb")
+        mock_suggest.assert_called_once_with("nu", 5)
+
+    def test_suggest_limit_out_of_range(self):
+        response = self.client.get("/api/search/suggest/?q=nu&limit=0")
+        self.assertEqual(response.status_code, 400)
+
+    @patch("search.views.engine.regular_search_with_yt_api")
+    def test_search_passes_fields(self, mock_search):
+        mock_search.return_value = [{"title": "Numb", "webpage_url": "https://yt.com/numb"}]
+
+        response = self.client.get("/api/search/?query=Numb&fields=title,webpage_url")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mock_search.call_args.kwargs["fields"], ["title", "webpage_url"])
+
+    def test_search_unknown_field(self):
+        response = self.client.get("/api/search/?query=Numb&fields=title,lyrics")
+        self.assertEqual(response.status_code, 400)
+
+    @patch("search.views.engine.jobs.submit")
+    def test_search_job_submitted(self, mock_submit):
+        mock_submit.return_value.id = "abc"
+        mock_submit.return_value.summary.return_value = {"job_id": "abc", "status": "queued", "total": 2}
+
+        response = self.client.post("/api/search/jobs/", {"queries": ["Adele Hello", "Numb"], "fields": ["title"]}, content_type="application/json")
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response["Location"], "/api/search/jobs/abc/")
+        self.assertEqual(len(mock_submit.call_args.args[0]), 2)
+        self.assertEqual(mock_submit.call_args.kwargs["fields"], ["title"])
+
+    def test_search_job_requires_query_list(self):
+        response = self.client.post("/api/search/jobs/", {"queries": "Adele Hello"}, content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_unknown_search_job(self):
+        response = self.client.get("/api/search/jobs/missing/")
+        self.assertEqual(response.status_code, 404)
+
+    def test_playlist_requires_playlist_url(self):
+        response = self.client.get("/api/search/playlist/?url=https://www.youtube.com/watch?v=abcdefghiJK")
+        self.assertEqual(response.status_code, 400)
+
+    @patch("search.views.engine.playlist_pages")
+    def test_playlist_streams_entries_and_cursors(self, mock_pages):
+        async def pages(*args, **kwargs):
+            yield {"results": [{"index": 0, "title": "One"}], "next_cursor": None}
+        mock_pages.side_effect = pages
+
+        response = self.client.get("/api/search/playlist/?url=https://www.youtube.com/playlist?list=PL123")
+        self.assertEqual(response.status_code, 200)
+        frames = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        self.assertEqual(frames[0]["title"], "One")
+        self.assertEqual(frames[1], {"next_cursor": None})
+        self.assertTrue(frames[2]["summary"]["complete"])
+        self.assertEqual(mock_pages.call_args.args[0], "PL123")
+
+    @patch("search.views.engine.federated_search")
+    def test_federated_search_streams_sources(self, mock_federated):
+        async def blocks(*args, **kwargs):
+            yield {"source": "bookmark", "results": [{"title": "Numb", "source": "bookmark"}], "count": 1, "deduplicated": 0, "elapsed_ms": 2}
+            yield {"source": "youtube", "results": [], "count": 0, "deduplicated": 1, "elapsed_ms": 800}
+        mock_federated.side_effect = blocks
+
+        response = self.client.get("/api/search/federated/?query=Numb")
+        self.assertEqual(response.status_code, 200)
+        frames = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        self.assertEqual([f.get("source") for f in frames[:2]], ["bookmark", "youtube"])
+        self.assertEqual(frames[-1]["summary"]["deduplicated"], 1)
+        self.assertFalse(mock_federated.call_args.kwargs["include_lan"])
+
+    def test_federated_search_missing_query(self):
+        response = self.client.get("/api/search/federated/")
+        self.assertEqual(response.status_code, 400)
+
+    def test_timeout_ms_out_of_range(self):
+        response = self.client.get("/api/search/?query=Numb&timeout_ms=0")
+        self.assertEqual(response.status_code, 400)
+
+    @patch("search.views.engine.regular_search_with_yt_api")
+    def test_partial_search_sets_header(self, mock_search):
+        async def cut_short(*args, **kwargs):
+            mark_partial("durations")
+            return [{"title": "Numb", "duration": None}]
+        mock_search.side_effect = cut_short
+
+        response = self.client.get("/api/search/?query=Numb&timeout_ms=500")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Search-Partial"], "true")
+        self.assertEqual(response["Cache-Control"], "no-store")
+        self.assertFalse(response.has_header("ETag"))
+
+    @patch("search.views.engine._execute_search")
+    @patch("search.views.engine._api_page", side_effect=Exception("API down"))
+    @patch("search.views.engine.NORMAL_API_KEY", "test-key")
+    def test_flat_search_enriches_requested_fields(self, mock_api_page, mock_exec):
+        def fake(query, flat=False):
+            if flat:
+                return {'_type': 'playlist', 'entries': [
+                    {'title': f'T{i}', 'url': f'https://www.youtube.com/watch?v=fLaTvIeW{i:03d}', 'duration': i}
+                    for i in range(3)
+                ]}
+            return {'title': 'full', 'webpage_url': query, 'upload_date': '20250101', 'thumbnails': []}
+        mock_exec.side_effect = fake
+
+        response = self.client.get("/api/search/?query=flat%20view%20enrichment&mode=flat&fields=title,duration,upload_date")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r["upload_date"] for r in response.json()], ["20250101"] * 3)
+        self.assertEqual(response.json()[1]["duration"], 1)
+
+    @patch("search.views.engine.regular_search_with_yt_api")
+    def test_search_revalidates_with_etag(self, mock_search):
+        mock_search.return_value = [{"title": "Numb", "webpage_url": "https://yt.com/numb"}]
+
+        response = self.client.get("/api/search/?query=Numb")
+        self.assertEqual(response["Cache-Control"], "public, max-age=300, stale-while-revalidate=300")
+        etag = response["ETag"]
+
+        response = self.client.get("/api/search/?query=Numb", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["ETag"], etag)
+
+        mock_search.return_value = [{"title": "Numb (Live)", "webpage_url": "https://yt.com/numb-live"}]
+        response = self.client.get("/api/search/?query=Numb", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    @patch("search.views.engine.bulk_search")
+    def test_bulk_search_with_failed_term_is_not_cached(self, mock_bulk):
+        mock_bulk.return_value = [
+            {"search_term": {"type": "search", "query": "Numb"}, "results": [], "count": 0},
+            {"search_term": {"type": "search", "query": "Believer"}, "error": "boom", "count": 0},
+        ]
+        response = self.client.get("/api/search/bulk/?queries=Numb,Believer")
+        self.assertEqual(response["Cache-Control"], "no-store")
+
+        mock_bulk.return_value = mock_bulk.return_value[:1]
+        response = self.client.get("/api/search/bulk/?queries=Numb")
+        self.assertEqual(response["Cache-Control"], "public, max-age=30, stale-while-revalidate=30")
+
+
     
 # Use this to run it:    python manage.py test search.tests.test_views
\ No newline at end of file
@@ -1,8 +1,23 @@
 from django.urls import path
+from config import IS_ASGI
 from . import views
 
+# Under ASGI the single and bulk searches are served by the async-native views.
+if IS_ASGI:
+    from . import async_views as search_views
+else:
+    search_views = views
+
 urlpatterns = [
-    path('', views.search_view, name='search'),
-    path("bulk/", views.bulk_search_view, name="bulk_search"),
+    path('', search_views.search_view, name='search'),
+    path("bulk/", search_views.bulk_search_view, name="bulk_search"),
+    path("federated/", views.federated_search_view, name="federated_search"),
+    path("playlist/", views.playlist_view, name="search_playlist"),
+    path("jobs/", views.search_job_create_view, name="search_job_create"),
+    path("jobs/<str:job_id>/", views.search_job_view, name="search_job"),
+    path("jobs/<str:job_id>/results/", views.search_job_results_view, name="search_job_results"),
+    path("jobs/<str:job_id>/stream/", views.search_job_stream_view, name="search_job_stream"),
+    path("suggest/", views.suggest_view, name="search_suggest"),
     path("lan/", views.lan_song_search_view, name="lan_search"),
+    path("stats/", views.search_stats_view, name="search_stats"),
 ]
@@ -2,7 +2,14 @@ from django.http import JsonResponse
 
 from desktop_lan_connect.lan_utils.initialization import LANCreator
 from desktop_lan_connect.lan_utils.song_manager import SongManager
-from .search_engine import SearchEngine
+from .search_engine import SearchEngine, SEARCH_FIELDS, YTDLP_MODES
+from .search_requests import BadRequest, BulkSearchRequest, SearchRequest, engine, parse_deadline, parse_fields, parse_page_size, parse_stream
+from .search_utils.streaming import STREAM_FORMATS, federated_frames, iterate_in_new_loop, job_frames, playlist_frames, streaming_response
+from .search_utils.bulk_jobs import JobNotFound, TooManyJobs
+from .search_utils.links import youtube_playlist_id
+from .search_utils.pagination import MAX_PAGE_SIZE, InvalidCursor, decode_cursor
+from config import SEARCH_DEFAULT_TIMEOUT_MS, SEARCH_MAX_TIMEOUT_MS
+from .suggestions import suggestions
 from django_ratelimit.decorators import ratelimit
 from asgiref.sync import async_to_sync
 import logging
@@ -29,9 +36,74 @@ logger = logging.getLogger('seekbeat')
 # Bulk Search Testing enpoint + parameters = http://127.0.0.1:8000/api/search/bulk/?queries=Adele%20Hello,Coldplay%20Viva%20La%20Vida,Imagine%20Dragons%20Believer,https://www.youtube.com/shorts/XU70gQ1GY-I
 
 
-engine = SearchEngine()
 lan = LANCreator()
 
+DEFAULT_SUGGESTIONS = 8
+MAX_SUGGESTIONS = 20
+
+DEFAULT_JOB_PAGE_SIZE = 50
+
+
+
+def parse_suggest_limit(raw: str | None) -> int:
+    """
+    Validate the suggest endpoint's `limit` parameter.
+
+    Raises:
+        ValueError: If it isn't an integer between 1 and MAX_SUGGESTIONS.
+    """
+    if raw in (None, ''):
+        return DEFAULT_SUGGESTIONS
+    limit = int(raw)
+    if not 1 <= limit <= MAX_SUGGESTIONS:
+        raise ValueError(limit)
+    return limit
+
+
+
+def parse_job_request(data) -> tuple[list[dict], list[str] | None, int]:
+    """
+    Validate a search job submission: {"queries": [...], "fields": ..., "max_results": ...}.
+
+    Returns:
+        tuple: (classified terms, fields, max results per term)
+
+    Raises:
+        ValueError: With a message for the client.
+    """
+    queries = data.get('queries') if isinstance(data, dict) else None
+    if not isinstance(queries, list) or not all(isinstance(q, str) for q in queries):
+        raise ValueError("queries must be a JSON list of search terms or YouTube links.")
+    terms = [engine.clean_and_classify_query(q) for q in queries if q.strip()]
+    if not terms or len(terms) > engine.jobs.max_terms:
+        raise ValueError(f"Submit between 1 and {engine.jobs.max_terms} non-empty queries.")
+
+    fields = data.get('fields')
+    if isinstance(fields, list):
+        fields = ','.join(map(str, fields))
+    fields = parse_fields(fields)
+
+    max_results = data.get('max_results', 10)
+    if not isinstance(max_results, int) or not 1 <= max_results <= MAX_PAGE_SIZE:
+        raise ValueError(f"max_results must be an integer between 1 and {MAX_PAGE_SIZE}.")
+    return terms, fields, max_results
+
+
+
+def has_lan_access(request) -> bool:
+    """
+    Whether the request may see LAN songs: a LAN session is active and the
+    Access-Code header matches it (as for /api/search/lan/).
+    """
+    access_code = request.headers.get("Access-Code")
+    if not access_code:
+        return False
+    try:
+        SongManager.verify_access(access_code)
+    except (PermissionDenied, ValidationError):
+        return False
+    return True
+
 
 
 @extend_schema(
@@ -44,7 +116,43 @@ lan = LANCreator()
             required=True,
             type=OpenApiTypes.STR,
             location=OpenApiParameter.QUERY
-        )
+        ),
+        OpenApiParameter(
+            name='mode',
+            description='yt-dlp fallback mode. `full` (default) resolves every result; `flat` reads the search results page only, which is much faster but may leave `upload_date` empty.',
+            required=False,
+            type=OpenApiTypes.STR,
+            enum=list(YTDLP_MODES),
+            location=OpenApiParameter.QUERY
+        ),
+        OpenApiParameter(
+            name='page_size',
+            description=f'Optional. Results per page (1-{MAX_PAGE_SIZE}). When given, or when `cursor` is, the response is a page: `{{"results": [...], "next_cursor": "..."}}`.',
+            required=False,
+            type=OpenApiTypes.INT,
+            location=OpenApiParameter.QUERY
+        ),
+        OpenApiParameter(
+            name='cursor',
+            description='Optional. The `next_cursor` of the previous page. Replaces `query`, `mode` and `page_size`, which the cursor carries. `next_cursor` is null on the last page.',
+            required=False,
+            type=OpenApiTypes.STR,
+            location=OpenApiParameter.QUERY
+        ),
+        OpenApiParameter(
+            name='fields',
+            description=f'Optional. Comma-separated result fields to return (any of: {", ".join(SEARCH_FIELDS)}). Lookups for fields left out are skipped, e.g. `title,webpage_url` needs no duration calls.',
+            required=False,
+            type=OpenApiTypes.STR,
+            location=OpenApiParameter.QUERY
+        ),
+        OpenApiParameter(
+            name='timeout_ms',
+            description=f'Optional. Time budget for the search in milliseconds (1-{SEARCH_MAX_TIMEOUT_MS}, default {SEARCH_DEFAULT_TIMEOUT_MS}). Retries and fallbacks that can\'t finish in time are skipped; whatever was found by then is returned with an `X-Search-Partial: true` header.',
+            required=False,
+            type=OpenApiTypes.INT,
+            location=OpenApiParameter.QUERY
+        ),
     ],
     examples=[
         OpenApiExample(
@@ -52,6 +160,11 @@ lan = LANCreator()
             value={"query": "Imagine Dragons Believer"},
             summary="Searches YouTube using a song title."
         ),
+        OpenApiExample(
+            name="Titles and links only",
+            value={"query": "Imagine Dragons Believer", "fields": "title,webpage_url"},
+            summary="Returns only each result's title and link, without duration lookups."
+        ),
         OpenApiExample(
             name="Search by link",
             value={"query": "https://www.youtube.com/watch?v=7wtfhZwyrcc"},
@@ -71,6 +184,7 @@ lan = LANCreator()
     methods=["GET"],
     responses={
         200: OpenApiTypes.OBJECT,
+        304: OpenApiResponse(description="Not modified: the results still match the If-None-Match ETag"),
         400: OpenApiResponse(description="Missing or invalid query parameter"),
         429: OpenApiResponse(description="Rate limit exceeded"),
         500: OpenApiResponse(description="Internal server error"),
@@ -82,24 +196,14 @@ lan = LANCreator()
 @ratelimit(key='ip', rate='25/m', block=True)
 def search_view(request):
     logger.info("Received single search request from %s", request.META.get('REMOTE_ADDR'))  # 🔹 LOG HERE
-    
-    query = request.GET.get('query', None)
-    if not query:
-        logger.warning("No query parameter provided")  # 🔹 LOG HERE
-        return Response({"error": "No query parameter provided."}, status=400)
-    
-    classified = engine.clean_and_classify_query(query)
-    logger.debug("Classified query: %s", classified)  # 🔹 LOG HERE
 
     try:
-        result = async_to_sync(engine.regular_search_with_yt_api)(classified)
-        logger.info("Search completed for query=%s, returned %s items", classified['query'], len(result) if isinstance(result, list) else 'error')  # 🔹 LOG HERE
-
-    except Exception as e:
-        logger.exception("Search failed for query=%s", classified['query'])  # 🔹 LOG HERE
-        return Response({"error": f"Internal error: {str(e)}"}, status=500)
+        search = SearchRequest(request.GET)
+    except BadRequest as e:
+        return Response({"error": str(e)}, status=400)
 
-    return Response(result)
+    body, code = async_to_sync(search.run)()
+    return search.respond(request, Response, body, code)
 
 
 
@@ -116,7 +220,29 @@ def search_view(request):
             required=True,
             type=OpenApiTypes.STR,
             location=OpenApiParameter.QUERY
-        )
+        ),
+        OpenApiParameter(
+            name='stream',
+            description='Optional. `ndjson` or `sse` streams each term\'s `{index, search_term, results, count}` block as soon as it resolves (completion order), followed by a summary frame.',
+            required=False,
+            type=OpenApiTypes.STR,
+            enum=list(STREAM_FORMATS),
+            location=OpenApiParameter.QUERY
+        ),
+        OpenApiParameter(
+            name='fields',
+            description=f'Optional. Comma-separated result fields to return (any of: {", ".join(SEARCH_FIELDS)}). Lookups for fields left out are skipped, e.g. `title,webpage_url` needs no duration calls.',
+            required=False,
+            type=OpenApiTypes.STR,
+            location=OpenApiParameter.QUERY
+        ),
+        OpenApiParameter(
+            name='timeout_ms',
+            description=f'Optional. Time budget for the whole call in milliseconds (1-{SEARCH_MAX_TIMEOUT_MS}, default {SEARCH_DEFAULT_TIMEOUT_MS}). Terms still running when it passes are cancelled and returned with an error and `"partial": true`; the response carries an `X-Search-Partial: true` header.',
+            required=False,
+            type=OpenApiTypes.INT,
+            location=OpenApiParameter.QUERY
+        ),
     ],
     examples=[
         OpenApiExample(
@@ -144,6 +270,7 @@ def search_view(request):
     methods=["GET"],
     responses={
         200: OpenApiTypes.OBJECT,
+        304: OpenApiResponse(description="Not modified: the results still match the If-None-Match ETag"),
         400: OpenApiResponse(description="No valid queries provided"),
         429: OpenApiResponse(description="Rate limit exceeded"),
         500: OpenApiResponse(description="Internal server error"),
@@ -154,22 +281,312 @@ def search_view(request):
 def bulk_search_view(request):
     logger.info("Received bulk search request: %s", request.GET.get('queries'))  # 🔹 LOG HERE
 
-    raw = request.GET.get("queries", "")
-    terms = [engine.clean_and_classify_query(q.strip()) for q in raw.split(",") if q.strip()]
-    logger.debug("Classified bulk terms: %s", terms)  # 🔹 LOG HERE
+    try:
+        bulk = BulkSearchRequest(request.GET)
+    except BadRequest as e:
+        return Response({"error": str(e)}, status=400)
+
+    if bulk.stream:
+        return streaming_response(iterate_in_new_loop(bulk.frames()), bulk.stream)
+
+    body, code = async_to_sync(bulk.run)()
+    return bulk.respond(request, Response, body, code)
+
+
 
-    if not terms:
-        logger.warning("Bulk search: no valid queries provided")  # 🔹 LOG HERE
-        return Response({"error": "No valid queries provided."}, status=400)
+
+
+
+@extend_schema(
+    summary="Federated Search: LAN, Bookmarks and YouTube",
+    description="Searches LAN songs, bookmarked videos and YouTube in parallel and streams each source's results as soon as it answers: local hits typically arrive within milliseconds, YouTube's when the remote search finishes. Each frame is `{source, results, count, deduplicated, elapsed_ms}` and every result carries its `source`; a video already returned by an earlier source (same `webpage_url`) is left out of later ones. LAN songs are only searched when the request carries a valid `Access-Code` header for the active LAN session. A summary frame ends the stream.",
+    parameters=[
+        OpenApiParameter(name="query", type=OpenApiTypes.STR, required=True, location=OpenApiParameter.QUERY, description="Search term or YouTube link."),
+        OpenApiParameter(name="fields", type=OpenApiTypes.STR, required=False, location=OpenApiParameter.QUERY, description=f'Optional. Comma-separated fields of bookmark and YouTube results to return (any of: {", ".join(SEARCH_FIELDS)}).'),
+        OpenApiParameter(name="stream", type=OpenApiTypes.STR, required=False, enum=list(STREAM_FORMATS), location=OpenApiParameter.QUERY, description="`ndjson` (default) or `sse`."),
+        OpenApiParameter(name="timeout_ms", type=OpenApiTypes.INT, required=False, location=OpenApiParameter.QUERY, description=f"Optional. Time budget of the YouTube search in milliseconds (1-{SEARCH_MAX_TIMEOUT_MS}, default {SEARCH_DEFAULT_TIMEOUT_MS})."),
+        OpenApiParameter(name="Access-Code", type=OpenApiTypes.STR, required=False, location=OpenApiParameter.HEADER, description="Optional. LAN session access code; includes LAN songs."),
+    ],
+    responses={
+        200: OpenApiTypes.OBJECT,
+        400: OpenApiResponse(description="Missing or invalid query, fields, timeout_ms or stream format"),
+        429: OpenApiResponse(description="Rate limit exceeded"),
+    },
+    methods=["GET"],
+    tags=["Search"]
+)
+@api_view(["GET"])
+@ratelimit(key='ip', rate='25/m', block=True)
+def federated_search_view(request):
+    classified = engine.clean_and_classify_query(request.GET.get('query', ''))
+    if classified['type'] == 'invalid':
+        return Response({"error": classified['reason']}, status=400)
 
     try:
-        results = async_to_sync(engine.bulk_search)(search_terms=terms)
-        logger.info("Bulk search completed with %d terms", len(terms))  # 🔹 LOG HERE
-    except Exception as e:
-        logger.exception("Bulk search failed")  # 🔹 LOG HERE
-        return Response({"error": f"Internal error: {str(e)}"}, status=500)
+        fields = parse_fields(request.GET.get('fields'))
+        deadline = parse_deadline(request.GET.get('timeout_ms'))
+        stream = parse_stream(request.GET.get("stream"), default="ndjson")
+    except BadRequest as e:
+        return Response({"error": str(e)}, status=400)
+
+    suggestions.record_query(classified)
+    blocks = engine.federated_search(classified, fields=fields, include_lan=has_lan_access(request), deadline=deadline)
+    return streaming_response(iterate_in_new_loop(federated_frames(blocks, stream)), stream)
+
+
 
-    return Response(results)
+
+
+
+@extend_schema(
+    summary="Expand a YouTube Playlist",
+    description="Streams the videos of a YouTube playlist as they are read, page by page, so long playlists start rendering at once and are never loaded whole. Pages come from the Data API's playlistItems.list (50 videos, 1 quota unit each) when a key is set, otherwise from flat yt-dlp extraction (100 videos per window). Each video is a frame carrying its `index` in the playlist; after every page a `{\"next_cursor\": ...}` frame (SSE `event: cursor`) gives the position to resume from, and a summary frame ends the stream. Private and deleted videos are skipped.",
+    parameters=[
+        OpenApiParameter(name="url", type=OpenApiTypes.STR, required=False, location=OpenApiParameter.QUERY, description="Playlist link (`playlist?list=…`, or a video link with `list=`)."),
+        OpenApiParameter(name="cursor", type=OpenApiTypes.STR, required=False, location=OpenApiParameter.QUERY, description="Optional. A `next_cursor` from an earlier stream, to resume from there. Replaces `url`."),
+        OpenApiParameter(name="fields", type=OpenApiTypes.STR, required=False, location=OpenApiParameter.QUERY, description=f'Optional. Comma-separated result fields to return (any of: {", ".join(SEARCH_FIELDS)}).'),
+        OpenApiParameter(name="stream", type=OpenApiTypes.STR, required=False, enum=list(STREAM_FORMATS), location=OpenApiParameter.QUERY, description="`ndjson` (default) or `sse`."),
+    ],
+    responses={
+        200: OpenApiTypes.OBJECT,
+        400: OpenApiResponse(description="Missing or invalid url, cursor, fields or stream format"),
+        429: OpenApiResponse(description="Rate limit exceeded"),
+    },
+    methods=["GET"],
+    tags=["Search"]
+)
+@api_view(["GET"])
+@ratelimit(key='ip', rate='25/m', block=True)
+def playlist_view(request):
+    url = request.GET.get('url', '')
+    cursor = request.GET.get('cursor')
+    playlist_id = None if cursor else youtube_playlist_id(url)
+    if not cursor and not playlist_id:
+        return Response({"error": "Provide a YouTube playlist url (with list=) or a cursor."}, status=400)
+
+    try:
+        fields = parse_fields(request.GET.get('fields'))
+        stream = parse_stream(request.GET.get("stream"), default="ndjson")
+    except BadRequest as e:
+        return Response({"error": str(e)}, status=400)
+
+    if cursor:
+        # Checked here, since errors inside the stream can't change its status code
+        try:
+            if decode_cursor(cursor)['t'] != 'playlist':
+                raise InvalidCursor("This cursor doesn't belong to a playlist expansion.")
+        except InvalidCursor as e:
+            return Response({"error": str(e)}, status=400)
+
+    logger.info("Expanding playlist %s (%s)", playlist_id or 'from cursor', stream)
+    pages = engine.playlist_pages(playlist_id, cursor=cursor, fields=fields)
+    return streaming_response(iterate_in_new_loop(playlist_frames(pages, stream)), stream)
+
+
+
+
+
+
+@extend_schema(
+    summary="Submit a Bulk Search Job",
+    description=f"Queues a search of up to {engine.jobs.max_terms} terms (e.g. a whole playlist import) and returns its job ID straight away. The job runs in the background in batches of {engine.max_bulk_search} terms, sharing the result cache, batched lookups and bulk API keys with other searches; repeated terms are searched once. Follow it with the status, results and stream endpoints. Jobs are kept for an hour after they finish.",
+    request={
+        'application/json': {
+            'type': 'object',
+            'properties': {
+                'queries': {'type': 'array', 'items': {'type': 'string'}},
+                'fields': {'type': 'array', 'items': {'type': 'string', 'enum': list(SEARCH_FIELDS)}},
+                'max_results': {'type': 'integer', 'minimum': 1, 'maximum': MAX_PAGE_SIZE, 'default': 10},
+            },
+            'required': ['queries'],
+        }
+    },
+    examples=[
+        OpenApiExample(
+            name="Playlist import",
+            value={"queries": ["Adele Hello", "Numb", "https://youtu.be/3tmd-ClpJxA"], "fields": ["title", "webpage_url"]},
+            request_only=True,
+        ),
+    ],
+    responses={
+        202: OpenApiTypes.OBJECT,
+        400: OpenApiResponse(description="Missing or invalid queries, fields or max_results"),
+        429: OpenApiResponse(description="Rate limit exceeded"),
+        503: OpenApiResponse(description="Too many jobs in progress"),
+    },
+    methods=["POST"],
+    tags=["Search"]
+)
+@api_view(["POST"])
+@ratelimit(key='ip', rate='5/m', block=True)
+def search_job_create_view(request):
+    try:
+        terms, fields, max_results = parse_job_request(request.data)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=400)
+
+    try:
+        job = engine.jobs.submit(terms, fields=fields, max_results_per_term=max_results)
+    except TooManyJobs as e:
+        return Response({"error": str(e)}, status=503)
+
+    response = Response(job.summary(), status=202)
+    response['Location'] = f"{request.path.rstrip('/')}/{job.id}/"
+    return response
+
+
+
+
+
+
+@extend_schema(
+    summary="Bulk Search Job Status",
+    description="`GET` returns the job's progress: `status` (`queued`, `running`, `done`, `failed` or `cancelled`), `total`, `completed`, `succeeded` and `failed` term counts. `DELETE` cancels it; terms already searched stay available.",
+    responses={
+        200: OpenApiTypes.OBJECT,
+        404: OpenApiResponse(description="Unknown or expired job"),
+    },
+    methods=["GET", "DELETE"],
+    tags=["Search"]
+)
+@api_view(["GET", "DELETE"])
+@ratelimit(key='ip', rate='120/m', block=True)
+def search_job_view(request, job_id):
+    try:
+        job = engine.jobs.cancel(job_id) if request.method == "DELETE" else engine.jobs.get(job_id)
+    except JobNotFound:
+        return Response({"error": "Unknown or expired job."}, status=404)
+    return Response(job.summary())
+
+
+
+
+
+
+@extend_schema(
+    summary="Bulk Search Job Results",
+    description="Returns a page of the job's result blocks in submission order, each with its `index`. Terms not searched yet appear as `{index, search_term, pending: true}`. Fetch the next page with `offset=next_offset`; `next_offset` is null on the last page.",
+    parameters=[
+        OpenApiParameter(name="offset", type=OpenApiTypes.INT, required=False, location=OpenApiParameter.QUERY, description="Index of the first block (default 0)."),
+        OpenApiParameter(name="page_size", type=OpenApiTypes.INT, required=False, location=OpenApiParameter.QUERY, description=f"Blocks per page (1-{MAX_PAGE_SIZE}, default {DEFAULT_JOB_PAGE_SIZE})."),
+    ],
+    responses={
+        200: OpenApiTypes.OBJECT,
+        400: OpenApiResponse(description="Invalid offset or page_size"),
+        404: OpenApiResponse(description="Unknown or expired job"),
+    },
+    methods=["GET"],
+    tags=["Search"]
+)
+@api_view(["GET"])
+@ratelimit(key='ip', rate='120/m', block=True)
+def search_job_results_view(request, job_id):
+    try:
+        job = engine.jobs.get(job_id)
+    except JobNotFound:
+        return Response({"error": "Unknown or expired job."}, status=404)
+
+    try:
+        page_size = parse_page_size(request.GET.get('page_size')) or DEFAULT_JOB_PAGE_SIZE
+    except BadRequest as e:
+        return Response({"error": str(e)}, status=400)
+    try:
+        offset = int(request.GET.get('offset') or 0)
+        if offset < 0:
+            raise ValueError(offset)
+    except ValueError:
+        return Response({"error": "offset must be a non-negative integer."}, status=400)
+
+    return Response(job.page(offset, page_size))
+
+
+
+
+
+
+@extend_schema(
+    summary="Stream Bulk Search Job Progress",
+    description="Streams the job's result blocks as they complete (blocks finished before the stream was opened come first), then a summary frame with the job's final status, as in `/api/search/bulk/?stream=`.",
+    parameters=[
+        OpenApiParameter(name="stream", type=OpenApiTypes.STR, required=False, enum=list(STREAM_FORMATS), location=OpenApiParameter.QUERY, description="`ndjson` (default) or `sse`."),
+    ],
+    responses={
+        200: OpenApiTypes.OBJECT,
+        400: OpenApiResponse(description="Unsupported stream format"),
+        404: OpenApiResponse(description="Unknown or expired job"),
+    },
+    methods=["GET"],
+    tags=["Search"]
+)
+@api_view(["GET"])
+@ratelimit(key='ip', rate='120/m', block=True)
+def search_job_stream_view(request, job_id):
+    try:
+        job = engine.jobs.get(job_id)
+    except JobNotFound:
+        return Response({"error": "Unknown or expired job."}, status=404)
+
+    try:
+        stream = parse_stream(request.GET.get("stream"), default="ndjson")
+    except BadRequest as e:
+        return Response({"error": str(e)}, status=400)
+    return streaming_response(iterate_in_new_loop(job_frames(job, stream)), stream)
+
+
+
+
+
+
+@extend_schema(
+    summary="Typeahead Suggestions",
+    description="Suggests completions for a partially typed search, drawn from past searches, bookmarked video titles and LAN song titles/artists. Matches any word that starts with the typed text (case- and accent-insensitive) and ranks by how often each suggestion was searched or saved. Served from an in-memory index, so it is cheap enough to call on every keystroke.",
+    parameters=[
+        OpenApiParameter(name="q", type=OpenApiTypes.STR, required=True, location=OpenApiParameter.QUERY, description="The text typed so far."),
+        OpenApiParameter(name="limit", type=OpenApiTypes.INT, required=False, location=OpenApiParameter.QUERY, description=f"Maximum number of suggestions (1-{MAX_SUGGESTIONS}, default {DEFAULT_SUGGESTIONS})."),
+    ],
+    examples=[
+        OpenApiExample(
+            name="Suggestions",
+            value=[{"text": "Imagine Dragons Believer", "score": 14, "sources": ["bookmark", "query"]}],
+            response_only=True,
+        ),
+    ],
+    responses={
+        200: OpenApiTypes.OBJECT,
+        400: OpenApiResponse(description="Invalid limit"),
+        429: OpenApiResponse(description="Rate limit exceeded"),
+    },
+    methods=["GET"],
+    tags=["Search"]
+)
+@api_view(["GET"])
+@ratelimit(key='ip', rate='300/m', block=True)
+def suggest_view(request):
+    prefix = request.GET.get('q', '')
+    try:
+        limit = parse_suggest_limit(request.GET.get('limit'))
+    except ValueError:
+        return Response({"error": f"limit must be an integer between 1 and {MAX_SUGGESTIONS}."}, status=400)
+    return Response(suggestions.suggest(prefix, limit))
+
+
+
+
+
+
+@extend_schema(
+    summary="Search Engine Statistics",
+    description="Returns runtime counters for the search engine, such as result-cache hits, misses, negative hits and evictions. Useful for sizing the cache and monitoring upstream usage.",
+    responses={
+        200: OpenApiTypes.OBJECT,
+    },
+    methods=["GET"],
+    tags=["Search"]
+)
+@api_view(["GET"])
+def search_stats_view(request):
+    logger.debug("Search stats requested from %s", request.META.get('REMOTE_ADDR'))
+    return Response({**engine.get_stats(), 'suggest': suggestions.stats()})
 
 
 
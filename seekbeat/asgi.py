@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'seekbeat.settings')
+# Route search endpoints to their async-native views (see search/urls.py)
+os.environ.setdefault('SEEKBEAT_ASGI', '1')
 
 application = get_asgi_application()
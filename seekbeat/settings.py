@@ -12,7 +12,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
     
 import os
 from pathlib import Path
-from config import LOG_DIR
+from django.core.exceptions import ImproperlyConfigured
+from config import LOG_DIR, CACHE_DIR, SEARCH_CACHE_REDIS_URL
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -44,6 +45,7 @@ INSTALLED_APPS = [
     'corsheaders',
     'desktop_lan_connect',
     'chrome_extension',
+    'search',
 ]
 
 MIDDLEWARE = [
@@ -94,6 +96,38 @@ DATABASES = {
 }
 
 
+# Caches
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# The "search" alias is shared by every worker in web mode (see search/search_utils/result_cache.py).
+# Redis is optional (web mode only), so its client isn't in requirements.txt.
+
+if SEARCH_CACHE_REDIS_URL:
+    try:
+        import redis  # noqa: F401 (RedisCache's client)
+    except ImportError:
+        raise ImproperlyConfigured(
+            "SEARCH_CACHE_REDIS_URL is set but the redis package isn't installed. "
+            "Install it (pip install redis) or unset SEARCH_CACHE_REDIS_URL to use the file cache."
+        )
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'search': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': SEARCH_CACHE_REDIS_URL,
+    } if SEARCH_CACHE_REDIS_URL else {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_DIR / 'search',
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+        },
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
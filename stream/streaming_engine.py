@@ -22,6 +22,7 @@ from mutagen.id3 import ID3, APIC, WXXX, error
 from config import IS_DESKTOP, FFMPEG_DIR
 from desktop_lan_connect.lan_utils.song_manager import SongManager
 from desktop_lan_connect.models import SongProfile
+from search.search_utils.extractor_pool import get_extractor_pool
 from django.http import StreamingHttpResponse, HttpResponse, FileResponse
 
 
@@ -39,6 +40,9 @@ class StreamingEngine:
     Handles audio extraction, real-time streaming with FFmpeg, and metadata injection.
     """
 
+    # Only these keys come back from the extractor pool (keeps worker IPC small)
+    STREAM_INFO_KEYS = ("url", "title", "duration", "thumbnail")
+
     def __init__(self):
         """
         Initializes yt-dlp options and ensures an FFmpeg binary is available.
@@ -94,15 +98,14 @@ class StreamingEngine:
             dict: {stream_url, title, duration, thumbnail, source}
         """
         try:
-            with yt_dlp.YoutubeDL(self.ytdlp_opts) as ydl:
-                info = ydl.extract_info(video_url, download=False)
-                return {
-                    "stream_url": info["url"],
-                    "title": info.get("title"),
-                    "duration": info.get("duration"),
-                    "thumbnail": info.get("thumbnail"),
-                    "source": "youtube"
-                }
+            info = get_extractor_pool().extract(video_url, self.ytdlp_opts, keys=self.STREAM_INFO_KEYS)
+            return {
+                "stream_url": info["url"],
+                "title": info.get("title"),
+                "duration": info.get("duration"),
+                "thumbnail": info.get("thumbnail"),
+                "source": "youtube"
+            }
         except Exception as e:
             raise RuntimeError(f"Failed to extract stream URL: {str(e)}")
 